@@ -2,5 +2,9 @@
 set -o errexit
 
 pip install -r requirements.txt
+# Generate the OpenAPI schema before collectstatic so it gets hashed + compressed
+python manage.py build_schema
 python manage.py collectstatic --noinput
 python manage.py migrate
+# Shared cache table (replica pins) unless REDIS_URL is set
+python manage.py createcachetable
@@ -1,15 +1,111 @@
+import hashlib
+import json
+
+from django.conf import settings
 from django.contrib import admin
-from .models import Event, Alert
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+from .models import Source, Event, Alert
+
+
+def estimate_count(queryset) -> int:
+    """
+    Row count for admin pagination without a full COUNT(*) on big tables.
+
+    - PostgreSQL: the planner's row estimate (EXPLAIN), exact only when small
+    - Other backends: exact COUNT(*) cached for ADMIN_COUNT_CACHE_SECONDS
+    """
+    threshold = getattr(settings, "ADMIN_EXACT_COUNT_THRESHOLD", 10000)
+    sql, params = queryset.query.sql_with_params()
+    conn = connections[queryset.db]
+
+    if conn.vendor == "postgresql":
+        with conn.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = int(plan[0]["Plan"]["Plan Rows"])
+        return queryset.count() if estimate < threshold else estimate
+
+    key = "admin-count:" + hashlib.md5(f"{sql}|{params}".encode()).hexdigest()
+    return cache.get_or_set(
+        key, queryset.count, getattr(settings, "ADMIN_COUNT_CACHE_SECONDS", 60)
+    )
+
+
+class EstimatedCountPaginator(Paginator):
+    @cached_property
+    def count(self):
+        return estimate_count(self.object_list)
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Changelist settings for million-row tables: estimated pagination count,
+    no "x of y total" COUNT(*), no per-filter facet counts, raw-id widgets.
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
+    list_per_page = 50
+
+    def matching_source_ids(self, term: str):
+        # Exact match on the unique Source.name index (no icontains scan)
+        return Source.objects.filter(name=term).values("id")
+
+
+@admin.register(Source)
+class SourceAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "source_type", "site", "owner", "criticality")
+    list_filter = ("source_type", "criticality")
+    search_fields = ("name", "site", "owner")
 
 
 @admin.register(Event)
-class EventAdmin(admin.ModelAdmin):
-    list_display = ("id", "source_name", "event_type", "severity", "timestamp")
+class EventAdmin(LargeTableAdmin):
+    list_display = ("id", "source", "event_type", "severity", "timestamp")
     list_filter = ("event_type", "severity")
-    search_fields = ("source_name", "description")
+    list_select_related = ("source",)
+    date_hierarchy = "timestamp"
+    raw_id_fields = ("source", "description_ref", "created_by")
+    search_fields = ("source__name",)
+    search_help_text = "Exact source name or event id."
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        if term.isdigit():
+            return queryset.filter(pk=int(term)), False
+        return queryset.filter(source_id__in=self.matching_source_ids(term)), False
 
 
 @admin.register(Alert)
-class AlertAdmin(admin.ModelAdmin):
+class AlertAdmin(LargeTableAdmin):
     list_display = ("id", "event", "status", "created_at")
     list_filter = ("status",)
+    # Event.__str__ reads event.source.name
+    list_select_related = ("event", "event__source")
+    date_hierarchy = "created_at"
+    raw_id_fields = ("event",)
+    search_fields = ("event__source__name",)
+    search_help_text = "Exact source name, alert id or event id."
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        if term.isdigit():
+            return (
+                queryset.filter(pk=int(term)) | queryset.filter(event_id=int(term)),
+                False,
+            )
+        return (
+            queryset.filter(event__source_id__in=self.matching_source_ids(term)),
+            False,
+        )
@@ -0,0 +1,145 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from rest_framework.exceptions import Throttled
+from rest_framework.throttling import UserRateThrottle
+
+from .rules import alert_severities
+
+# Latency samples older than this no longer count: with LOW/MEDIUM shed and
+# nothing else arriving, the average would otherwise never come back down.
+LATENCY_STALE_AFTER = 10.0
+
+
+def queue_ms(meta, now=None) -> float:
+    """
+    How long the request waited before a worker picked it up, from the
+    `X-Request-Start` header set by the proxy in front of gunicorn
+    ("t=<epoch>" in seconds, milliseconds or microseconds). 0 without one.
+    """
+    raw = meta.get("HTTP_X_REQUEST_START", "").strip().removeprefix("t=")
+    try:
+        started = float(raw)
+    except ValueError:
+        return 0.0
+    if started > 1e14:
+        started /= 1e6
+    elif started > 1e11:
+        started /= 1e3
+    if started <= 0:
+        return 0.0
+    # Clock skew between proxy and worker must not read as a negative wait
+    return max(((now or time.time()) - started) * 1000, 0.0)
+
+
+class AdmissionController:
+    """
+    Per-process admission control for event ingestion.
+
+    Tracks ingest requests in flight and an EWMA of their latency, counted
+    from when the proxy received them (see queue_ms). While either is over
+    budget, events below the alerting severities are refused (429 +
+    Retry-After); alerting events (HIGH/CRITICAL by default) are always
+    admitted so they never queue behind a flood of LOW noise.
+
+    In-flight only exceeds 1 with threaded workers (gthread, see
+    render.yaml), so `max_in_flight` must be below the thread count. Queue
+    time is what sees load across worker processes: a request waiting for
+    a busy worker, sync or threaded, arrives late and says so.
+    """
+
+    def __init__(self, max_in_flight=32, latency_budget_ms=250.0, retry_after=2):
+        self.max_in_flight = max_in_flight
+        self.latency_budget_ms = latency_budget_ms
+        self.retry_after = retry_after
+        self.alpha = 0.2
+        self.in_flight = 0
+        self.latency_ms = 0.0
+        self._latency_at = 0.0
+        self.admitted = {}
+        self.shed = {}
+        self._lock = threading.Lock()
+
+    def _recent_latency(self) -> float:
+        if time.monotonic() - self._latency_at > LATENCY_STALE_AFTER:
+            return 0.0
+        return self.latency_ms
+
+    def overloaded(self, queued_ms: float = 0.0) -> bool:
+        return (
+            self.in_flight >= self.max_in_flight
+            or queued_ms > self.latency_budget_ms
+            or self._recent_latency() > self.latency_budget_ms
+        )
+
+    def retry_after_seconds(self) -> int:
+        # Roughly the time to drain what is queued at the current latency
+        drain = self.in_flight * self._recent_latency() / 1000
+        return max(self.retry_after, math.ceil(drain))
+
+    @contextmanager
+    def ticket(self, severity: str, queued_ms: float = 0.0):
+        """
+        Admit or raise Throttled; times the admitted block, plus the
+        `queued_ms` the request spent waiting for a worker.
+        """
+        severity = (severity or "").upper()
+        with self._lock:
+            if severity not in alert_severities() and self.overloaded(queued_ms):
+                self.shed[severity] = self.shed.get(severity, 0) + 1
+                wait = self.retry_after_seconds()
+                admitted = False
+            else:
+                self.admitted[severity] = self.admitted.get(severity, 0) + 1
+                self.in_flight += 1
+                admitted = True
+        if not admitted:
+            raise Throttled(
+                wait=wait, detail="Ingestion overloaded; retry low-priority events."
+            )
+
+        began = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = queued_ms + (time.perf_counter() - began) * 1000
+            with self._lock:
+                self.in_flight -= 1
+                self.latency_ms = self.alpha * elapsed + (1 - self.alpha) * (
+                    self._recent_latency() or elapsed
+                )
+                self._latency_at = time.monotonic()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "latency_ms": round(self._recent_latency(), 3),
+                "latency_budget_ms": self.latency_budget_ms,
+                "overloaded": self.overloaded(),
+                "admitted": dict(self.admitted),
+                "shed": dict(self.shed),
+            }
+
+
+class PriorityUserRateThrottle(UserRateThrottle):
+    """UserRateThrottle that never throttles ingestion of alerting events."""
+
+    def allow_request(self, request, view):
+        if getattr(view, "action", None) == "create":
+            data = request.data
+            severity = str(data.get("severity", "")) if hasattr(data, "get") else ""
+            if severity.upper() in alert_severities():
+                return True
+        return super().allow_request(request, view)
+
+
+admission = AdmissionController(
+    max_in_flight=getattr(settings, "ADMISSION_MAX_IN_FLIGHT", 32),
+    latency_budget_ms=getattr(settings, "ADMISSION_LATENCY_BUDGET_MS", 250.0),
+    retry_after=getattr(settings, "ADMISSION_RETRY_AFTER", 2),
+)
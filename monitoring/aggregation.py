@@ -0,0 +1,223 @@
+import atexit
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone as dt_timezone
+from fnmatch import fnmatchcase
+
+from django.conf import settings
+from django.db.models import Max, Min, Q, Sum
+from django.utils import timezone
+
+from .heartbeat import BackgroundFlush
+from .models import EventAggregate
+from .rules import alert_severities
+
+logger = logging.getLogger("monitoring")
+
+
+def aggregated(source_name: str, event_type: str, severity: str) -> bool:
+    """
+    Whether an incoming event is folded into an EventAggregate instead of
+    being stored as an Event: its severity is in EVENT_AGGREGATE_SEVERITIES
+    and (source, event_type) matches an EVENT_AGGREGATE_SCOPE entry
+    ("fw-*:ANOMALY", "*:*", ...). Alerting severities are never aggregated.
+    """
+    severity = (severity or "").upper()
+    if severity not in getattr(settings, "EVENT_AGGREGATE_SEVERITIES", ()):
+        return False
+    if severity in alert_severities():
+        return False
+    for entry in getattr(settings, "EVENT_AGGREGATE_SCOPE", ("*:*",)):
+        source_glob, _, type_glob = entry.partition(":")
+        if fnmatchcase(source_name, source_glob or "*") and fnmatchcase(
+            event_type, (type_glob or "*").upper()
+        ):
+            return True
+    return False
+
+
+class EventAggregator:
+    """
+    Per-process counters per (source, event_type, severity, bucket).
+
+    Ingestion calls `record()` (in memory). Every `flush_interval` seconds,
+    from a background thread or the next record(), the changed buckets are
+    upserted as this worker's rows in EventAggregate, one query for all of
+    them, so N events in a bucket cost one row and one write per flush
+    instead of N inserts. A failed flush keeps the buckets dirty; each row
+    holds the worker's full total, so writing it again is safe.
+
+    Counts already answered with 202 live only in memory until then: a
+    worker killed without running atexit (SIGKILL, OOM) loses at most its
+    last `flush_interval` seconds of them, plus whatever failed to flush
+    while the database was unreachable.
+    """
+
+    def __init__(self, bucket_seconds=300, max_samples=3, flush_interval=5.0):
+        self.bucket_seconds = bucket_seconds
+        self.max_samples = max_samples
+        self.flush_interval = flush_interval
+        self._buckets = {}
+        self._dirty = set()
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._pid = None
+        self._worker = ""
+        self._timer = BackgroundFlush(
+            self.flush, flush_interval, "event-aggregate-flush"
+        )
+
+    @property
+    def worker(self) -> str:
+        # The row is this process's running total: a restarted (or forked)
+        # worker with a reused pid must not overwrite the previous one's rows
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._worker = (
+                f"{socket.gethostname()[:40]}:{self._pid}:{uuid.uuid4().hex[:8]}"
+            )
+        return self._worker
+
+    def bucket_for(self, dt):
+        ts = int(dt.timestamp())
+        return datetime.fromtimestamp(ts - ts % self.bucket_seconds, tz=dt_timezone.utc)
+
+    def record(
+        self, source_id, event_type, severity, description="", seen_at=None
+    ) -> dict:
+        seen_at = seen_at or timezone.now()
+        key = (source_id, event_type, severity, self.bucket_for(seen_at))
+        self._timer.ensure_started()
+        with self._lock:
+            state = self._buckets.get(key)
+            if state is None:
+                state = self._buckets[key] = {
+                    "count": 0,
+                    "first_seen": seen_at,
+                    "last_seen": seen_at,
+                    "samples": [],
+                }
+            state["count"] += 1
+            state["first_seen"] = min(state["first_seen"], seen_at)
+            state["last_seen"] = max(state["last_seen"], seen_at)
+            samples = state["samples"]
+            if (
+                description
+                and len(samples) < self.max_samples
+                and description not in samples
+            ):
+                samples.append(description)
+            self._dirty.add(key)
+            due = time.monotonic() - self._last_flush >= self.flush_interval
+
+        if due:
+            self.flush()
+        return {"bucket": key[3], "bucket_seconds": self.bucket_seconds}
+
+    def flush(self) -> int:
+        with self._lock:
+            keys = list(self._dirty)
+            rows = []
+            for key in keys:
+                source_id, event_type, severity, bucket = key
+                state = self._buckets[key]
+                rows.append(
+                    EventAggregate(
+                        source_id=source_id,
+                        event_type=event_type,
+                        severity=severity,
+                        bucket=bucket,
+                        worker=self.worker,
+                        count=state["count"],
+                        first_seen=state["first_seen"],
+                        last_seen=state["last_seen"],
+                        samples=list(state["samples"]),
+                    )
+                )
+            self._dirty.clear()
+            self._last_flush = time.monotonic()
+
+        if rows:
+            try:
+                EventAggregate.objects.bulk_create(
+                    rows,
+                    update_conflicts=True,
+                    unique_fields=[
+                        "source",
+                        "event_type",
+                        "severity",
+                        "bucket",
+                        "worker",
+                    ],
+                    update_fields=["count", "first_seen", "last_seen", "samples"],
+                )
+            except Exception:
+                logger.exception("Event aggregate flush failed")
+                with self._lock:
+                    self._dirty.update(keys)
+                return 0
+
+        # Persisted buckets older than the previous one are closed; the
+        # previous bucket stays in memory so a late record adds to it
+        keep_from = self.bucket_for(timezone.now()) - timedelta(
+            seconds=self.bucket_seconds
+        )
+        with self._lock:
+            for key in [
+                k for k in self._buckets if k[3] < keep_from and k not in self._dirty
+            ]:
+                del self._buckets[key]
+        return len(rows)
+
+
+def merged_aggregates(queryset):
+    """One row per (source, event_type, severity, bucket), summed over workers."""
+    return (
+        queryset.values("source", "source__name", "event_type", "severity", "bucket")
+        .annotate(
+            total=Sum("count"),
+            first=Min("first_seen"),
+            last=Max("last_seen"),
+        )
+        .order_by("-bucket", "source__name", "event_type", "severity")
+    )
+
+
+def attach_samples(groups, max_samples: int) -> list:
+    """Merge the per-worker sample descriptions into a page of merged rows."""
+    groups = list(groups)
+    if not groups:
+        return groups
+    match = Q()
+    for g in groups:
+        match |= Q(
+            source_id=g["source"],
+            event_type=g["event_type"],
+            severity=g["severity"],
+            bucket=g["bucket"],
+        )
+    samples = {}
+    for row in EventAggregate.objects.filter(match).values(
+        "source", "event_type", "severity", "bucket", "samples"
+    ):
+        key = (row["source"], row["event_type"], row["severity"], row["bucket"])
+        merged = samples.setdefault(key, [])
+        for description in row["samples"]:
+            if len(merged) < max_samples and description not in merged:
+                merged.append(description)
+    for g in groups:
+        key = (g["source"], g["event_type"], g["severity"], g["bucket"])
+        g["samples"] = samples.get(key, [])
+    return groups
+
+
+event_aggregates = EventAggregator(
+    bucket_seconds=getattr(settings, "EVENT_AGGREGATE_BUCKET_SECONDS", 300),
+    max_samples=getattr(settings, "EVENT_AGGREGATE_SAMPLES", 3),
+    flush_interval=getattr(settings, "EVENT_AGGREGATE_FLUSH_INTERVAL", 5.0),
+)
+atexit.register(event_aggregates.flush)
@@ -0,0 +1,68 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .changes import log_alert_changes
+from .models import Alert, AlertChange
+
+# CRITICAL first, then oldest: the (status, severity_rank, created_at, id)
+# index order, so a claim reads the first rows of the index, not the backlog
+QUEUE_ORDER = ("severity_rank", "created_at", "id")
+
+
+def claimable(now):
+    """OPEN alerts that nobody holds, or whose holder's lease has run out."""
+    return Alert.objects.filter(status=Alert.Status.OPEN).filter(
+        Q(assigned_to__isnull=True) | Q(lease_expires_at__lt=now)
+    )
+
+
+def claim_alerts(user, count: int, lease_seconds: int = None) -> list:
+    """
+    Assign up to `count` of the most severe, oldest claimable alerts to
+    `user` and return them.
+
+    - PostgreSQL: SELECT ... FOR UPDATE SKIP LOCKED, then UPDATE, in one
+      transaction. Concurrent claimers skip each other's rows instead of
+      waiting on them.
+    - Other backends: one UPDATE ... WHERE id IN (SELECT ... LIMIT n) that
+      re-checks claimability. SQLite runs each write statement under its
+      database lock, so two claimers can never take the same row.
+
+    The claimed alerts are appended to the change feed in the same
+    transaction.
+    """
+    now = timezone.now()
+    expires = now + timedelta(
+        seconds=lease_seconds or settings.ALERT_CLAIM_LEASE_SECONDS
+    )
+    changes = {"assigned_to": user, "lease_expires_at": expires, "updated_at": now}
+    queue = claimable(now).order_by(*QUEUE_ORDER)
+
+    with transaction.atomic():
+        if connection.features.has_select_for_update_skip_locked:
+            ids = list(
+                queue.select_for_update(skip_locked=True, of=("self",)).values_list(
+                    "id", flat=True
+                )[:count]
+            )
+            Alert.objects.filter(id__in=ids).update(**changes)
+        else:
+            claimable(now).filter(id__in=queue.values("id")[:count]).update(**changes)
+            # The lease timestamp identifies this claim's rows
+            ids = Alert.objects.filter(
+                assigned_to=user, lease_expires_at=expires
+            ).values_list("id", flat=True)
+
+        alerts = list(
+            Alert.objects.select_related(
+                "event", "event__source", "event__description_ref"
+            )
+            .filter(id__in=list(ids))
+            .order_by(*QUEUE_ORDER)
+        )
+        log_alert_changes(alerts, AlertChange.Kind.ASSIGNED)
+    return alerts
@@ -0,0 +1,83 @@
+import json
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models.fields.json import KeyTransform
+
+from .models import EventAttribute
+
+MAX_KEYS = 64
+MAX_VALUE_LENGTH = 255
+# Plain identifiers only: keys arrive straight from ?attr=key:value
+ATTRIBUTE_KEY = re.compile(r"^(?!.*__)\w{1,64}$")
+
+
+def indexed_keys() -> tuple:
+    return tuple(getattr(settings, "EVENT_INDEXED_ATTRIBUTES", ()))
+
+
+def normalize(value) -> str:
+    # IPs, hostnames and hashes compare case-insensitively
+    return str(value).strip().lower()[:MAX_VALUE_LENGTH]
+
+
+def valid_key(key) -> bool:
+    return bool(ATTRIBUTE_KEY.match(key))
+
+
+def indexed_values(attributes, keys=None) -> list:
+    """(key, normalized value) pairs of `attributes` that get lookup rows."""
+    pairs = []
+    for key in keys or indexed_keys():
+        value = (attributes or {}).get(key)
+        values = value if isinstance(value, list) else [value]
+        pairs += [
+            (key, v) for v in {normalize(v) for v in values if v not in (None, "")}
+        ]
+    return pairs
+
+
+def attribute_rows(event) -> list:
+    return [
+        EventAttribute(event=event, key=key, value=v, timestamp=event.timestamp)
+        for key, v in indexed_values(event.attributes)
+    ]
+
+
+def index_attributes(events) -> int:
+    """
+    Write lookup rows for saved events. post_save does this for single
+    saves; callers of Event.objects.bulk_create must call it themselves.
+    """
+    rows = [row for event in events for row in attribute_rows(event)]
+    EventAttribute.objects.bulk_create(rows)
+    return len(rows)
+
+
+def events_with_attribute(queryset, key, value, start=None, end=None):
+    """
+    Filter an Event queryset on attributes[key] == value.
+
+    - Indexed keys: IN over an EventAttribute (key, value, timestamp) range scan
+    - Other keys, PostgreSQL: JSON containment, served by the GIN index
+    - Other keys elsewhere: JSON extraction (a scan; fine for small tables)
+    """
+    if key in indexed_keys():
+        matches = EventAttribute.objects.filter(key=key, value=normalize(value))
+        if start:
+            matches = matches.filter(timestamp__gte=start)
+        if end:
+            matches = matches.filter(timestamp__lte=end)
+        return queryset.filter(id__in=matches.values("event_id"))
+    try:
+        # ?attr=port:443 should match the number 443
+        value = json.loads(value)
+    except ValueError:
+        pass
+    if connection.vendor == "postgresql":
+        return queryset.filter(attributes__contains={key: value})
+    # A transform on one literal key: `key` can never become a lookup
+    return queryset.alias(attribute_value=KeyTransform(key, "attributes")).filter(
+        attribute_value=value
+    )
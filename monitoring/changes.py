@@ -0,0 +1,162 @@
+import logging
+
+from django.db import connections, router, transaction
+from django.db.models import Exists, OuterRef
+
+from .models import AlertChange, Generation
+
+logger = logging.getLogger("monitoring")
+
+# Generation rows marking compaction progress: rows below COMPACTED have
+# been compacted, DELETED tombstones below TOMBSTONES_DROPPED are gone
+COMPACTED = "alert_changes_compacted"
+TOMBSTONES_DROPPED = "alert_changes_tombstones"
+
+# Alert fields copied into each entry; .only() these when logging a queryset
+SNAPSHOT_FIELDS = ("id", "status", "version", "assigned_to", "lease_expires_at")
+
+# pg_advisory_xact_lock key serializing appends to the change log ("alch")
+APPEND_LOCK_KEY = 0x616C6368
+
+
+def _serialize_appends(db) -> None:
+    """
+    A client that has read seq N must never find a lower seq committed
+    later. A sequence hands numbers out in call order, not commit order,
+    so on PostgreSQL appends take a transaction-level advisory lock and
+    the next writer only draws its seq once this transaction is done.
+    SQLite already runs one write transaction at a time. Callers append
+    last in their transaction, so the lock is held just for the commit.
+    """
+    conn = connections[db]
+    if conn.vendor == "postgresql":
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", [APPEND_LOCK_KEY])
+
+
+def log_alert_changes(alerts, kind: str, using: str = None) -> int:
+    """
+    Append one AlertChange per alert, carrying its state after the change
+    (alerts need id, status, version, assigned_to_id and lease_expires_at
+    loaded; see SNAPSHOT_FIELDS). Joins the
+    caller's transaction; paths that bypass post_save (bulk_create,
+    .update()) call this themselves.
+    """
+    db = using or router.db_for_write(AlertChange)
+    rows = [
+        AlertChange(
+            alert_id=alert.id,
+            kind=kind,
+            status=alert.status,
+            version=alert.version,
+            assigned_to_id=alert.assigned_to_id,
+            lease_expires_at=alert.lease_expires_at,
+        )
+        for alert in alerts
+    ]
+    if not rows:
+        return 0
+    with transaction.atomic(using=db, savepoint=False):
+        _serialize_appends(db)
+        AlertChange.objects.using(db).bulk_create(rows)
+    return len(rows)
+
+
+def changes_since(since: int, limit: int):
+    """
+    Up to `limit` changes after `since`, oldest first, and whether more
+    are waiting. A range scan of the primary key: a client catching up
+    costs O(changes since its cursor), not a rescan of the alert table.
+    """
+    rows = list(
+        AlertChange.objects.select_related("alert__event__source")
+        .filter(seq__gt=since)
+        .order_by("seq")[: limit + 1]
+    )
+    return rows[:limit], len(rows) > limit
+
+
+def _mark(name: str) -> int:
+    return (
+        Generation.objects.filter(name=name).values_list("value", flat=True).first()
+        or 0
+    )
+
+
+def _set_mark(name: str, value: int) -> None:
+    Generation.objects.update_or_create(name=name, defaults={"value": value})
+
+
+def tombstones_dropped_below() -> int:
+    """Seq below which DELETED entries may be gone; older cursors must reload."""
+    return _mark(TOMBSTONES_DROPPED)
+
+
+def compact_changes(
+    horizon: int, chunk_size: int = 5000, tombstone_horizon: int = None
+) -> int:
+    """
+    Delete rows below seq `horizon` that a later row of the same alert
+    supersedes. Each alert keeps its newest row, so a client resuming from
+    any cursor still ends up at every alert's current state; it only skips
+    intermediate states that were compacted. One short transaction per
+    chunk of `chunk_size` sequence numbers.
+
+    Runs resume where the previous one stopped (a Generation mark) instead
+    of rescanning from seq 0. Below that mark each alert has at most one
+    row, so a chunk only needs to reach back for the older rows of the
+    alerts it contains; a row superseded from above `horizon` goes once
+    the superseding row is itself compacted.
+
+    DELETED tombstones are the newest row of their alert and never
+    superseded: below `tombstone_horizon` (at most `horizon`) they are
+    dropped too, and cursors older than that get a 410 (see the feed).
+    """
+    newer = AlertChange.objects.filter(alert=OuterRef("alert"), seq__gt=OuterRef("seq"))
+    removed = 0
+    start = _mark(COMPACTED)
+    while start < horizon:
+        seqs = list(
+            AlertChange.objects.filter(seq__gte=start, seq__lt=horizon)
+            .order_by("seq")
+            .values_list("seq", flat=True)[:chunk_size]
+        )
+        if not seqs:
+            break
+        chunk = AlertChange.objects.filter(seq__gte=seqs[0], seq__lte=seqs[-1])
+        with transaction.atomic():
+            removed += (
+                AlertChange.objects.filter(
+                    seq__lte=seqs[-1], alert__in=chunk.values("alert")
+                )
+                .filter(Exists(newer))
+                .delete()[0]
+            )
+            start = seqs[-1] + 1
+            _set_mark(COMPACTED, start)
+    if start < horizon:
+        _set_mark(COMPACTED, horizon)
+
+    if tombstone_horizon is not None:
+        tombstone_horizon = min(tombstone_horizon, horizon)
+        start = _mark(TOMBSTONES_DROPPED)
+        while start < tombstone_horizon:
+            seqs = list(
+                AlertChange.objects.filter(seq__gte=start, seq__lt=tombstone_horizon)
+                .order_by("seq")
+                .values_list("seq", flat=True)[:chunk_size]
+            )
+            end = seqs[-1] + 1 if seqs else tombstone_horizon
+            with transaction.atomic():
+                # The mark commits with the deletion: no reader sees one alone
+                _set_mark(TOMBSTONES_DROPPED, end)
+                removed += AlertChange.objects.filter(
+                    seq__gte=start, seq__lt=end, kind=AlertChange.Kind.DELETED
+                ).delete()[0]
+            start = end
+
+    if removed:
+        logger.info(
+            "Alert change log compacted", extra={"removed": removed, "horizon": horizon}
+        )
+    return removed
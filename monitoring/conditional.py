@@ -0,0 +1,48 @@
+import hashlib
+from urllib.parse import urlencode
+
+from django.db.models import Max, Subquery
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+
+from .models import AlertChange, Generation
+from .sources import GENERATION
+
+
+def alerts_marker(request, *args, **kwargs):
+    """
+    (newest change-feed seq, source generation), in one query. Every alert
+    creation, status change, claim, event edit and deletion appends to the
+    feed, and seqs become visible in commit order (changes.py), so unlike
+    MAX(Alert.updated_at) it moves on deletes and on transactions that
+    commit after a newer-stamped one. Source renames change the embedded
+    source_name without a feed entry; they bump the generation instead.
+    Memoized on the request.
+    """
+    if not hasattr(request, "_alerts_marker"):
+        newest = AlertChange.objects.order_by("-seq").values("seq")[:1]
+        marker = (
+            Generation.objects.filter(name=GENERATION)
+            .annotate(seq=Subquery(newest))
+            .values_list("seq", "value")
+            .first()
+        )
+        if marker is None:
+            # No generation row (seeded by migration 0018; created on bump)
+            marker = (AlertChange.objects.aggregate(m=Max("seq"))["m"], 0)
+        request._alerts_marker = marker
+    return request._alerts_marker
+
+
+def alerts_etag(request, *args, **kwargs):
+    # Filters, ordering and page all live in the query string
+    params = urlencode(sorted(request.GET.lists()), doseq=True)
+    seq, generation = alerts_marker(request)
+    raw = f"{request.path}?{params}|{seq or 0}.{generation}"
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+# For APIView / ViewSet handler methods. Runs after DRF auth + permissions,
+# and answers 304 before the list query or serialization happens. ETag only:
+# no timestamp marks alert changes reliably enough for If-Modified-Since.
+alert_list_conditional = method_decorator(condition(etag_func=alerts_etag))
@@ -11,6 +11,9 @@ from rest_framework.pagination import PageNumberPagination
 
 from .models import Event, Alert
 from .serializers import EventSerializer, AlertSerializer
+from .conditional import alert_list_conditional
+from .db_routing import ReplicaReadMixin
+from .transitions import transition_alert
 
 
 class IsAdminRole(BasePermission):
@@ -34,20 +37,28 @@ class DashboardAlertPagination(PageNumberPagination):
     max_page_size = 100
 
 
-class DashboardAlertListView(APIView):
+class DashboardAlertListView(ReplicaReadMixin, APIView):
     """
     Authenticated users (Admin + Analyst):
     List alerts with filters:
       /api/dashboard/alerts/?severity=CRITICAL&status=OPEN&page=1&page_size=10
+    Supports If-None-Match (304 without running the list query).
     """
 
     permission_classes = [IsAuthenticated]
 
+    @alert_list_conditional
     def get(self, request):
         severity = (request.query_params.get("severity") or "").strip().upper()
         alert_status = (request.query_params.get("status") or "").strip().upper()
 
-        qs = Alert.objects.select_related("event").all().order_by("-created_at")
+        qs = (
+            Alert.objects.select_related(
+                "event", "event__source", "event__description_ref"
+            )
+            .all()
+            .order_by("-created_at")
+        )
 
         if severity:
             qs = qs.filter(event__severity=severity)
@@ -65,7 +76,10 @@ class DashboardAlertListView(APIView):
                 {
                     "id": a.id,
                     "status": a.status,
+                    "version": a.version,
                     "created_at": a.created_at,
+                    "acknowledged_at": a.acknowledged_at,
+                    "resolved_at": a.resolved_at,
                     "event": {
                         "id": a.event_id,
                         "source_name": a.event.source_name,
@@ -112,16 +126,29 @@ class DashboardUpdateAlertStatusView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        alert = Alert.objects.select_related("event").filter(pk=pk).first()
-        if not alert:
+        # Optional compare-and-set: the update is a 409 if the alert moved on
+        expected_status = (request.data.get("expected_status") or "").strip().upper()
+        if expected_status and expected_status not in valid_statuses:
             return Response(
-                {"detail": "Alert not found"}, status=status.HTTP_404_NOT_FOUND
+                {"detail": "Invalid expected_status."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        version = request.data.get("version")
+        if version is not None and not str(version).isdigit():
+            return Response(
+                {"detail": "version must be a non-negative integer."},
+                status=status.HTTP_400_BAD_REQUEST,
             )
 
-        alert.status = new_status
-        alert.save(update_fields=["status"])
-
-        # Return your normal serializer (good for APIs)
+        # Raises NotFound (404) / AlertConflict (409). The returned row
+        # already carries the event fields the serializer embeds.
+        alert = transition_alert(
+            pk,
+            new_status,
+            user=request.user,
+            expected_status=expected_status or None,
+            expected_version=int(version) if version is not None else None,
+        )
         return Response(AlertSerializer(alert).data, status=status.HTTP_200_OK)
 
 
@@ -195,7 +222,9 @@ class TestApiView(APIView):
 
         alert = Alert.objects.filter(event=event).first()
         if not alert:
-            alert = Alert.objects.create(event=event, status="OPEN")
+            # Alert, outbox rows and change-log entry commit together
+            with transaction.atomic():
+                alert = Alert.objects.create(event=event, status="OPEN")
 
         return Response(
             {
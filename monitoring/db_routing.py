@@ -0,0 +1,108 @@
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from rest_framework.permissions import SAFE_METHODS
+
+REPLICA = "replica"
+PIN_COOKIE = "db_pin"
+
+# Alias reads should use for the current request; None -> default
+_read_alias: ContextVar = ContextVar("read_alias", default=None)
+
+
+def replica_configured() -> bool:
+    return REPLICA in connections.settings
+
+
+class ReplicaRouter:
+    """
+    Reads go to the replica only inside views that opt in (ReplicaReadMixin);
+    everything else, and every write, uses the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Same data on both aliases
+        return True
+
+
+def _client_key(request):
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return f"db-pin:user:{user.pk}"
+    return f"db-pin:ip:{request.META.get('REMOTE_ADDR', '')}"
+
+
+def _pins():
+    # Shared by every worker: the write and the next read of a cookie-less
+    # client usually land on different processes
+    return caches[settings.REPLICA_PIN_CACHE]
+
+
+def pin_to_primary(request, response) -> None:
+    """
+    After a write, read this client's data from the primary for
+    REPLICA_PIN_SECONDS so it never sees pre-write state from a lagging replica.
+    Cookie for browsers, shared-cache key (user / IP) for API clients.
+    """
+    seconds = settings.REPLICA_PIN_SECONDS
+    _pins().set(_client_key(request), 1, seconds)
+    response.set_cookie(PIN_COOKIE, "1", max_age=seconds, httponly=True, samesite="Lax")
+
+
+def is_pinned(request) -> bool:
+    if PIN_COOKIE in request.COOKIES:
+        return True
+    return bool(_pins().get(_client_key(request)))
+
+
+class PrimaryPinMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            request.method not in SAFE_METHODS
+            and response.status_code < 400
+            and replica_configured()
+        ):
+            pin_to_primary(request, response)
+        return response
+
+
+class ReplicaReadMixin:
+    """
+    For read-only DRF views: after authentication, route this request's
+    reads to the replica unless the client is pinned to the primary.
+    ViewSets may restrict it with `replica_actions`.
+    """
+
+    replica_actions = None
+
+    def uses_replica(self, request) -> bool:
+        if request.method not in SAFE_METHODS or not replica_configured():
+            return False
+        if self.replica_actions is not None:
+            if getattr(self, "action", None) not in self.replica_actions:
+                return False
+        return not is_pinned(request)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.uses_replica(request):
+            self._replica_token = _read_alias.set(REPLICA)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, "_replica_token", None)
+        if token is not None:
+            _read_alias.reset(token)
+            self._replica_token = None
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -0,0 +1,110 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from .models import EventDescription
+
+
+def digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class DescriptionRegistry:
+    """
+    In-process LRU cache: SHA-256 of a description -> EventDescription id.
+
+    Ingestion resolves `description` through this so that repeated texts
+    cost a hash and no query per event. Unknown texts are stored on first
+    sight. As with the source registry, ids are only cached once the
+    creating transaction has committed.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._cache: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            pk = self._cache.get(key)
+            if pk is not None:
+                self._cache.move_to_end(key)
+            return pk
+
+    def put(self, key: str, pk: int) -> None:
+        with self._lock:
+            self._cache[key] = pk
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def resolve(self, text: str) -> EventDescription:
+        """An EventDescription for `text`, built from the cache when hot."""
+        text = text or ""
+        key = digest(text)
+        pk = self.get(key)
+        if pk is not None:
+            return EventDescription(id=pk, digest=key, text=text)
+
+        try:
+            with transaction.atomic():
+                row, _ = EventDescription.objects.get_or_create(
+                    digest=key, defaults={"text": text}
+                )
+        except IntegrityError:
+            # Another worker stored it between our SELECT and INSERT.
+            row = EventDescription.objects.get(digest=key)
+
+        transaction.on_commit(lambda: self.put(key, row.id))
+        return row
+
+    def resolve_many(self, texts) -> dict:
+        """
+        text -> EventDescription id for a batch, with at most three queries
+        for the misses (SELECT, bulk INSERT, SELECT). Used by bulk paths.
+        """
+        resolved, missing = {}, {}
+        for text in set(texts):
+            key = digest(text)
+            pk = self.get(key)
+            if pk is None:
+                missing[key] = text
+            else:
+                resolved[text] = pk
+
+        if missing:
+            found = dict(
+                EventDescription.objects.filter(digest__in=missing).values_list(
+                    "digest", "id"
+                )
+            )
+            new = [
+                EventDescription(digest=key, text=text)
+                for key, text in missing.items()
+                if key not in found
+            ]
+            if new:
+                EventDescription.objects.bulk_create(new, ignore_conflicts=True)
+                found.update(
+                    EventDescription.objects.filter(
+                        digest__in=[row.digest for row in new]
+                    ).values_list("digest", "id")
+                )
+            resolved.update({missing[key]: pk for key, pk in found.items()})
+            transaction.on_commit(
+                lambda: [self.put(key, pk) for key, pk in found.items()]
+            )
+
+        return resolved
+
+
+descriptions = DescriptionRegistry(
+    maxsize=getattr(settings, "EVENT_DESCRIPTION_CACHE_SIZE", 4096)
+)
@@ -1,5 +1,8 @@
 import django_filters
-from .models import Alert
+from rest_framework.exceptions import ValidationError
+
+from .models import Source, Event, Alert, EventAggregate
+from .attributes import events_with_attribute, valid_key
 
 
 class AlertFilter(django_filters.FilterSet):
@@ -7,7 +10,111 @@ class AlertFilter(django_filters.FilterSet):
         field_name="event__severity", lookup_expr="iexact"
     )
     status = django_filters.CharFilter(field_name="status", lookup_expr="iexact")
+    assigned_to = django_filters.NumberFilter(field_name="assigned_to_id")
 
     class Meta:
         model = Alert
-        fields = ["severity", "status"]
+        fields = ["severity", "status", "assigned_to"]
+
+
+class EventFilter(django_filters.FilterSet):
+    """
+    /api/events/?severity=CRITICAL&source=fw-*&timestamp_after=...&timestamp_before=...
+
+    Every filter is an equality / IN on the leading column of an index
+    ((severity, timestamp), (event_type, timestamp), (source, timestamp),
+    created_by) plus a timestamp range, so no combination needs a scan.
+    Values are upper-cased in Python rather than with iexact, which would
+    wrap the column in UPPER() and defeat the index.
+    """
+
+    timestamp = django_filters.IsoDateTimeFromToRangeFilter()
+    severity = django_filters.CharFilter(method="filter_choice")
+    event_type = django_filters.CharFilter(method="filter_choice")
+    source = django_filters.CharFilter(
+        method="filter_source", help_text="Exact source name, or a prefix ending in *"
+    )
+    created_by = django_filters.NumberFilter(field_name="created_by_id")
+    src_ip = django_filters.CharFilter(method="filter_attribute")
+    dst_ip = django_filters.CharFilter(method="filter_attribute")
+    host = django_filters.CharFilter(method="filter_attribute")
+    user = django_filters.CharFilter(method="filter_attribute")
+    file_hash = django_filters.CharFilter(method="filter_attribute")
+    attr = django_filters.CharFilter(
+        method="filter_any_attribute", help_text="Any attribute as key:value"
+    )
+
+    class Meta:
+        model = Event
+        fields = [
+            "timestamp",
+            "severity",
+            "event_type",
+            "source",
+            "created_by",
+            "src_ip",
+            "dst_ip",
+            "host",
+            "user",
+            "file_hash",
+            "attr",
+        ]
+
+    def filter_choice(self, queryset, name, value):
+        # Accepts a single value or a comma-separated list: severity=HIGH,CRITICAL
+        values = [v.strip().upper() for v in value.split(",") if v.strip()]
+        if not values:
+            return queryset
+        if len(values) == 1:
+            return queryset.filter(**{name: values[0]})
+        return queryset.filter(**{f"{name}__in": values})
+
+    def filter_source(self, queryset, name, value):
+        value = value.strip()
+        if value.endswith("*"):
+            sources = Source.objects.filter(name__startswith=value[:-1])
+        else:
+            sources = Source.objects.filter(name=value)
+        # Source is small; the Event side is an IN on the (source, timestamp) index
+        return queryset.filter(source_id__in=sources.values("id"))
+
+    def filter_attribute(self, queryset, name, value):
+        window = self.form.cleaned_data.get("timestamp")
+        return events_with_attribute(
+            queryset,
+            name,
+            value.strip(),
+            start=window.start if window else None,
+            end=window.stop if window else None,
+        )
+
+    def filter_any_attribute(self, queryset, name, value):
+        key, sep, val = value.partition(":")
+        if not sep or not key.strip():
+            raise ValidationError({"attr": "Use key:value."})
+        if not valid_key(key.strip()):
+            raise ValidationError(
+                {"attr": "Keys are letters, digits and single underscores."}
+            )
+        return self.filter_attribute(queryset, key.strip(), val)
+
+
+class EventAggregateFilter(django_filters.FilterSet):
+    """
+    /api/events/aggregates/?severity=LOW&source=fw-*&bucket_after=...&bucket_before=...
+    Same value handling as EventFilter, on the bucket start instead of timestamp.
+    """
+
+    bucket = django_filters.IsoDateTimeFromToRangeFilter()
+    severity = django_filters.CharFilter(method="filter_choice")
+    event_type = django_filters.CharFilter(method="filter_choice")
+    source = django_filters.CharFilter(
+        method="filter_source", help_text="Exact source name, or a prefix ending in *"
+    )
+
+    filter_choice = EventFilter.filter_choice
+    filter_source = EventFilter.filter_source
+
+    class Meta:
+        model = EventAggregate
+        fields = ["bucket", "severity", "event_type", "source"]
@@ -0,0 +1,195 @@
+import atexit
+import logging
+import os
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import (
+    Case,
+    CharField,
+    DateTimeField,
+    F,
+    IntegerField,
+    Value,
+    When,
+)
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import SourceHeartbeat
+
+logger = logging.getLogger("monitoring")
+
+
+class BackgroundFlush:
+    """
+    Daemon thread calling `flush` every `interval` seconds, so buffered
+    state reaches the database even when the worker receives nothing else
+    (idle workers, health checks served elsewhere). Started lazily by the
+    buffer's first record() in each process: a thread started before a
+    fork does not survive it.
+    """
+
+    def __init__(self, flush, interval: float, name: str):
+        self.flush = flush
+        self.interval = interval
+        self.name = name
+        self._pid = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def ensure_started(self) -> None:
+        if self._pid == os.getpid() or self.interval <= 0:
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            threading.Thread(target=self._run, name=self.name, daemon=True).start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Background flush failed", extra={"name": self.name})
+            finally:
+                close_old_connections()
+
+
+class HeartbeatBuffer:
+    """
+    Coalesces per-source last-seen / count / severity updates in memory.
+
+    Ingestion calls `record()` (no query). Every `flush_interval` seconds,
+    from a background thread or the next record(), the pending state is
+    written with one INSERT of placeholder rows for never-seen sources
+    (conflicts ignored) and one batched UPDATE (CASE ... WHEN) adding the
+    counts, so concurrent workers never lose each other's updates. A
+    failed write is merged back into the buffer and retried next flush.
+    """
+
+    def __init__(self, flush_interval: float = 5.0):
+        self.flush_interval = flush_interval
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._timer = BackgroundFlush(self.flush, flush_interval, "heartbeat-flush")
+
+    def record(self, source_id: int, severity: str, seen_at=None) -> None:
+        seen_at = seen_at or timezone.now()
+        self._timer.ensure_started()
+        with self._lock:
+            self._merge(source_id, 1, seen_at, severity)
+            due = time.monotonic() - self._last_flush >= self.flush_interval
+
+        if due:
+            self.flush()
+
+    def _merge(self, source_id, count, seen_at, severity) -> None:
+        entry = self._pending.get(source_id)
+        if entry is None:
+            self._pending[source_id] = [count, seen_at, severity]
+        else:
+            entry[0] += count
+            if seen_at >= entry[1]:
+                entry[1] = seen_at
+                entry[2] = severity
+
+    def flush(self) -> int:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+
+        if not pending:
+            return 0
+
+        try:
+            self._write(pending)
+        except Exception:
+            logger.exception("Heartbeat flush failed", extra={"sources": len(pending)})
+            with self._lock:
+                for source_id, entry in pending.items():
+                    self._merge(source_id, *entry)
+            return 0
+        return len(pending)
+
+    def _write(self, pending: dict) -> None:
+        # Counts go into the wall-clock minute of the write; every worker
+        # adds to the same per-minute counters, and SourceHeartbeat.rate_at()
+        # turns them into the source's events/minute when read
+        minute = timezone.now().replace(second=0, microsecond=0)
+        previous = minute - timedelta(minutes=1)
+
+        # Placeholders make the UPDATE below apply to every pending source:
+        # rows another worker inserted first are kept and added to
+        SourceHeartbeat.objects.bulk_create(
+            [
+                SourceHeartbeat(
+                    source_id=sid,
+                    last_seen=seen,
+                    last_severity=severity,
+                    event_count=0,
+                    rate_minute=minute,
+                )
+                for sid, (_, seen, severity) in pending.items()
+            ],
+            ignore_conflicts=True,
+        )
+
+        def case(values, output_field):
+            return Case(
+                *[When(source_id=sid, then=Value(v)) for sid, v in values.items()],
+                output_field=output_field,
+            )
+
+        counts = case({sid: e[0] for sid, e in pending.items()}, IntegerField())
+        # Every SET expression sees the old row, so last_severity compares
+        # against the stored last_seen and the rate counters against the
+        # stored rate_minute
+        SourceHeartbeat.objects.filter(source_id__in=pending).update(
+            last_seen=Greatest(
+                F("last_seen"),
+                case({sid: e[1] for sid, e in pending.items()}, DateTimeField()),
+            ),
+            last_severity=Case(
+                *[
+                    When(source_id=sid, last_seen__lte=seen, then=Value(severity))
+                    for sid, (_, seen, severity) in pending.items()
+                ],
+                default=F("last_severity"),
+                output_field=CharField(),
+            ),
+            event_count=F("event_count") + counts,
+            # Rolled forward when this minute is newer than the row's; a
+            # worker that is behind another's clock adds to the newer minute
+            rate_minute=Case(
+                When(rate_minute__gt=minute, then=F("rate_minute")),
+                default=Value(minute),
+                output_field=DateTimeField(),
+            ),
+            rate_count=Case(
+                When(rate_minute__gte=minute, then=F("rate_count")),
+                default=Value(0),
+                output_field=IntegerField(),
+            )
+            + counts,
+            rate_prev_count=Case(
+                When(rate_minute__gte=minute, then=F("rate_prev_count")),
+                When(rate_minute=previous, then=F("rate_count")),
+                default=Value(0),
+                output_field=IntegerField(),
+            ),
+        )
+
+
+heartbeats = HeartbeatBuffer(
+    flush_interval=getattr(settings, "HEARTBEAT_FLUSH_INTERVAL", 5.0)
+)
+atexit.register(heartbeats.flush)
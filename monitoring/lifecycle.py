@@ -0,0 +1,113 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .changes import SNAPSHOT_FIELDS, log_alert_changes
+from .models import Alert, AlertChange, AlertStatusChange
+
+logger = logging.getLogger("monitoring")
+
+
+class LifecyclePolicy:
+    """
+    One auto-transition rule, e.g.
+      {"name": "stale-acknowledged", "status": "ACKNOWLEDGED",
+       "to": "RESOLVED", "older_than_hours": 168}
+    Optional "severities": ["LOW"] restricts it to alerts from those events.
+    """
+
+    def __init__(self, name, status, to, older_than_hours, severities=None):
+        valid = set(Alert.Status.values)
+        if status not in valid or to not in valid:
+            raise ValueError(f"Policy {name!r}: statuses must be in {sorted(valid)}")
+        if status == to:
+            raise ValueError(f"Policy {name!r}: status and to must differ")
+        self.name = name
+        self.status = status
+        self.to = to
+        self.older_than = timedelta(hours=older_than_hours)
+        self.severities = [s.upper() for s in severities or []]
+
+    @classmethod
+    def configured(cls) -> list:
+        return [cls(**p) for p in getattr(settings, "ALERT_LIFECYCLE_POLICIES", [])]
+
+    def candidates(self, now):
+        # Walks the (status, created_at) index from the oldest end
+        qs = Alert.objects.filter(
+            status=self.status, created_at__lt=now - self.older_than
+        )
+        if self.severities:
+            qs = qs.filter(event__severity__in=self.severities)
+        return qs.order_by("created_at", "id")
+
+    def apply(self, now=None, batch_size=500, dry_run=False, pause=0.0) -> int:
+        """
+        Transition matching alerts in batches of `batch_size`, one short
+        transaction per batch, writing an AlertStatusChange row and a
+        change-feed entry per alert. No MTTA / MTTR samples: a policy closing
+        an alert after `older_than` says nothing about how fast analysts
+        respond, and would drag the rollups towards the policy age.
+        """
+        now = now or timezone.now()
+        if dry_run:
+            return self.candidates(now).count()
+
+        changed = 0
+        while True:
+            with transaction.atomic():
+                qs = self.candidates(now)
+                if connection.features.has_select_for_update_skip_locked:
+                    # Rows an admin is updating right now are skipped, not waited on
+                    qs = qs.select_for_update(skip_locked=True, of=("self",))
+                ids = list(qs.values_list("id", flat=True)[:batch_size])
+                if not ids:
+                    break
+                stamp = timezone.now()
+                changes = {
+                    "status": self.to,
+                    "version": F("version") + 1,
+                    "updated_at": stamp,
+                }
+                if self.to == Alert.Status.ACKNOWLEDGED:
+                    changes["acknowledged_at"] = Coalesce(
+                        "acknowledged_at", Value(stamp)
+                    )
+                if self.to == Alert.Status.RESOLVED:
+                    changes["resolved_at"] = Coalesce("resolved_at", Value(stamp))
+                Alert.objects.filter(id__in=ids, status=self.status).update(**changes)
+                AlertStatusChange.objects.bulk_create(
+                    [
+                        AlertStatusChange(
+                            alert_id=alert_id,
+                            from_status=self.status,
+                            to_status=self.to,
+                            reason=f"policy:{self.name}",
+                        )
+                        for alert_id in ids
+                    ]
+                )
+                log_alert_changes(
+                    Alert.objects.filter(id__in=ids)
+                    .only(*SNAPSHOT_FIELDS)
+                    .order_by("id"),
+                    AlertChange.Kind.STATUS,
+                )
+            changed += len(ids)
+            if len(ids) < batch_size:
+                break
+            if pause:
+                time.sleep(pause)
+
+        if changed:
+            logger.info(
+                "Lifecycle policy applied",
+                extra={"policy": self.name, "changed": changed},
+            )
+        return changed
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from monitoring.lifecycle import LifecyclePolicy
+
+
+class Command(BaseCommand):
+    help = (
+        "Apply ALERT_LIFECYCLE_POLICIES (e.g. auto-resolve stale ACKNOWLEDGED "
+        "alerts) in small index-ordered batches with short transactions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true")
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.05,
+            help="Seconds to sleep between batches (gives ingestion room).",
+        )
+        parser.add_argument(
+            "--policy", action="append", help="Only run these policy names."
+        )
+
+    def handle(self, *args, **options):
+        try:
+            policies = LifecyclePolicy.configured()
+        except (TypeError, ValueError) as exc:
+            raise CommandError(f"Invalid ALERT_LIFECYCLE_POLICIES: {exc}")
+        if options["policy"]:
+            policies = [p for p in policies if p.name in options["policy"]]
+
+        verb = "would transition" if options["dry_run"] else "transitioned"
+        for policy in policies:
+            count = policy.apply(
+                batch_size=max(1, options["batch_size"]),
+                dry_run=options["dry_run"],
+                pause=options["pause"],
+            )
+            self.stdout.write(
+                f"{policy.name}: {verb} {count} alerts "
+                f"{policy.status} -> {policy.to}"
+            )
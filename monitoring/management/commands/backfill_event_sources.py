@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max, Min
+
+from monitoring.models import Event
+from monitoring.sources import registry
+
+
+class Command(BaseCommand):
+    help = (
+        "Convert legacy Event.source_name strings into Source foreign keys, "
+        "in primary-key chunks (one short transaction per chunk)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        chunk_size = max(1, options["chunk_size"])
+        pending = Event.objects.filter(source__isnull=True).exclude(
+            legacy_source_name=""
+        )
+        bounds = pending.aggregate(lo=Min("id"), hi=Max("id"))
+        if bounds["lo"] is None:
+            self.stdout.write("Nothing to convert.")
+            return
+
+        converted = 0
+        for start in range(bounds["lo"], bounds["hi"] + 1, chunk_size):
+            chunk = pending.filter(id__gte=start, id__lt=start + chunk_size)
+            with transaction.atomic():
+                names = set(
+                    chunk.values_list("legacy_source_name", flat=True).distinct()
+                )
+                if not names:
+                    continue
+                sources = registry.resolve_many(names)
+                # One UPDATE per distinct name in the chunk, not per row
+                for name in names:
+                    source = sources.get(name.strip())
+                    if source is None:
+                        continue
+                    converted += chunk.filter(legacy_source_name=name).update(
+                        source=source, legacy_source_name=""
+                    )
+            self.stdout.write(f"  ids {start}..{start + chunk_size - 1}: {converted}")
+
+        self.stdout.write(self.style.SUCCESS(f"Converted {converted} events."))
@@ -0,0 +1,102 @@
+import threading
+import time
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection
+
+from monitoring.assignment import claim_alerts
+from monitoring.models import Alert, Event, Source
+from monitoring.sources import registry
+
+BENCH_PREFIX = "bench-claim-"
+
+
+class Command(BaseCommand):
+    help = (
+        "Run many concurrent claimers against a synthetic OPEN queue and check "
+        "that no alert is claimed twice; reports claim latency and throughput. "
+        "Bench rows are deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--alerts", type=int, default=2000)
+        parser.add_argument("--claimers", type=int, default=16)
+        parser.add_argument("--batch", type=int, default=5)
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        users = [
+            User.objects.create(username=f"{BENCH_PREFIX}{i}")
+            for i in range(options["claimers"])
+        ]
+        try:
+            self.seed(options["alerts"])
+            claimed, latencies, errors, wall = self.run(users, options["batch"])
+            self.report(claimed, latencies, errors, wall, options["alerts"])
+        finally:
+            Alert.objects.filter(event__source__name=f"{BENCH_PREFIX}src").delete()
+            Event.objects.filter(source__name=f"{BENCH_PREFIX}src").delete()
+            Source.objects.filter(name=f"{BENCH_PREFIX}src").delete()
+            registry.clear()
+            User.objects.filter(id__in=[u.id for u in users]).delete()
+
+    def seed(self, n):
+        source = registry.resolve(f"{BENCH_PREFIX}src")
+        severities = Event.Severity.values
+        events = Event.objects.bulk_create(
+            Event(
+                source=source,
+                event_type="INTRUSION",
+                severity=severities[i % len(severities)],
+                description="claim bench",
+            )
+            for i in range(n)
+        )
+        # bulk_create skips post_save: no notifications for bench alerts
+        Alert.objects.bulk_create(
+            Alert(event=e, severity_rank=Alert.rank_for(e.severity)) for e in events
+        )
+
+    def run(self, users, batch):
+        claimed, latencies = [], []
+        errors = Counter()
+        lock = threading.Lock()
+
+        def claimer(user):
+            try:
+                while True:
+                    began = time.perf_counter()
+                    try:
+                        alerts = claim_alerts(user, batch)
+                    except OperationalError as exc:
+                        errors[str(exc)] += 1
+                        continue
+                    ms = (time.perf_counter() - began) * 1000
+                    with lock:
+                        claimed.extend(a.id for a in alerts)
+                        latencies.append(ms)
+                    if not alerts:
+                        return
+            finally:
+                connection.close()
+
+        began = time.perf_counter()
+        threads = [threading.Thread(target=claimer, args=(u,)) for u in users]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return claimed, latencies, errors, time.perf_counter() - began
+
+    def report(self, claimed, latencies, errors, wall, total):
+        latencies.sort()
+        duplicates = [i for i, c in Counter(claimed).items() if c > 1]
+        self.stdout.write(
+            f"[{connection.vendor}] {len(claimed)}/{total} alerts claimed in "
+            f"{wall:.2f}s ({len(claimed) / wall:,.0f}/s) | claim p50 "
+            f"{latencies[len(latencies) // 2]:.1f} ms, p99 "
+            f"{latencies[int(0.99 * (len(latencies) - 1))]:.1f} ms | "
+            f"double-claimed {len(duplicates)} | errors {dict(errors) or 0}"
+        )
@@ -0,0 +1,146 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from monitoring.descriptions import descriptions
+from monitoring.models import Event, EventDescription
+from monitoring.sources import registry
+
+BENCH_SOURCE = "bench-desc-src"
+TEMPLATES = (
+    "Unauthorized entry detected at perimeter gate {i}: badge rejected",
+    "Suspicious activity near loading dock {i}, motion outside schedule",
+    "Repeated failed logins from workstation WS-{i:04d} to domain controller",
+)
+
+
+def table_bytes(*models):
+    """On-disk size of the models' tables and indexes, where measurable."""
+    tables = [m._meta.db_table for m in models]
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            marks = ", ".join(["%s"] * len(tables))
+            cursor.execute(
+                "SELECT SUM(pgsize) FROM dbstat WHERE name IN (SELECT name FROM "
+                f"sqlite_master WHERE tbl_name IN ({marks}))",
+                tables,
+            )
+        elif connection.vendor == "postgresql":
+            cursor.execute(
+                "SELECT SUM(pg_total_relation_size(t::regclass)) "
+                "FROM unnest(%s::text[]) AS t",
+                [tables],
+            )
+        else:
+            return None
+        return int(cursor.fetchone()[0] or 0)
+
+
+class Command(BaseCommand):
+    help = (
+        "Insert the same synthetic events with the description stored inline "
+        "(pre-dedup layout) and content-addressed, and report bytes per event "
+        "and insert throughput for bulk and single-row writes. Bench rows are "
+        "deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--events", type=int, default=50000)
+        parser.add_argument("--distinct", type=int, default=30)
+        parser.add_argument("--single", type=int, default=2000)
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        source = registry.resolve(BENCH_SOURCE)
+        texts = [
+            TEMPLATES[i % len(TEMPLATES)].format(i=i)
+            for i in range(options["distinct"])
+        ]
+        n, batch = options["events"], options["batch_size"]
+        try:
+            results = {}
+            for layout in ("inline", "content-addressed"):
+                results[layout] = self.measure(layout, source, texts, n, batch, options)
+            self.report(results, n)
+        finally:
+            Event.objects.filter(source=source).delete()
+            EventDescription.objects.filter(text__in=texts).delete()
+            descriptions.clear()
+
+    def rows(self, layout, source, texts, n, start=0):
+        if layout == "inline":
+            return [
+                Event(
+                    source=source,
+                    event_type="INTRUSION",
+                    severity="LOW",
+                    legacy_description=texts[i % len(texts)],
+                )
+                for i in range(start, start + n)
+            ]
+        ids = descriptions.resolve_many(texts)
+        return [
+            Event(
+                source=source,
+                event_type="INTRUSION",
+                severity="LOW",
+                description_ref_id=ids[texts[i % len(texts)]],
+            )
+            for i in range(start, start + n)
+        ]
+
+    def measure(self, layout, source, texts, n, batch, options):
+        Event.objects.filter(source=source).delete()
+        before = table_bytes(Event, EventDescription)
+
+        began = time.perf_counter()
+        for start in range(0, n, batch):
+            rows = self.rows(layout, source, texts, min(batch, n - start), start)
+            Event.objects.bulk_create(rows)
+        bulk_rate = n / (time.perf_counter() - began)
+        after = table_bytes(Event, EventDescription)
+
+        # Single-row creates, the POST /api/events/ path (cache warm)
+        began = time.perf_counter()
+        for i in range(options["single"]):
+            text = texts[i % len(texts)]
+            if layout == "inline":
+                Event.objects.create(
+                    source=source,
+                    event_type="INTRUSION",
+                    severity="LOW",
+                    legacy_description=text,
+                )
+            else:
+                Event.objects.create(
+                    source=source,
+                    event_type="INTRUSION",
+                    severity="LOW",
+                    description=text,
+                )
+        single_rate = options["single"] / (time.perf_counter() - began)
+        return {
+            "bulk_rate": bulk_rate,
+            "single_rate": single_rate,
+            "bytes": None if before is None else after - before,
+        }
+
+    def report(self, results, n):
+        for layout, r in results.items():
+            size = (
+                f"{r['bytes'] / n:.1f} bytes/event ({r['bytes'] / 2**20:.1f} MiB)"
+                if r["bytes"] is not None
+                else "size n/a on this backend"
+            )
+            self.stdout.write(
+                f"[{connection.vendor}] {layout:>17}: {size} | bulk "
+                f"{r['bulk_rate']:,.0f} events/s | single {r['single_rate']:,.0f} "
+                f"events/s"
+            )
+        inline, dedup = (
+            results["inline"]["bytes"],
+            results["content-addressed"]["bytes"],
+        )
+        if inline and dedup is not None:
+            self.stdout.write(f"storage saved: {100 * (1 - dedup / inline):.0f}%")
@@ -0,0 +1,173 @@
+import queue
+import random
+import statistics
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from monitoring.admission import AdmissionController
+from monitoring.heartbeat import heartbeats
+from monitoring.models import Alert, Event, Source
+from monitoring.sources import registry
+from monitoring.top_talkers import top_talkers
+from monitoring.views import EventViewSet
+
+BENCH_USER = "bench-ingest"
+BENCH_PREFIX = "bench-src-"
+SOURCES = 20
+
+
+class Command(BaseCommand):
+    help = (
+        "Offer POST /api/events/ more load than it can take (open loop: a LOW "
+        "flood plus a trickle of CRITICAL at a fixed arrival rate), with and "
+        "without admission control, and report CRITICAL latency (from arrival, "
+        "so queueing counts) and how many LOW events were shed. Requests carry "
+        "X-Request-Start stamped at arrival, as a proxy in front of gunicorn "
+        "would, so the controller sees the queue like a deployed worker does "
+        "rather than only this process's in-flight count. Bench rows are "
+        "deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--threads", type=int, default=16, help="Server worker threads."
+        )
+        parser.add_argument("--rate", type=float, default=600, help="Arrivals/s.")
+        parser.add_argument("--seconds", type=float, default=5)
+        parser.add_argument("--critical-ratio", type=float, default=0.05)
+        parser.add_argument(
+            "--write-delay-ms",
+            type=float,
+            default=20.0,
+            help="Added to every Event INSERT to simulate a slow primary.",
+        )
+        parser.add_argument("--max-in-flight", type=int, default=8)
+        parser.add_argument("--latency-budget-ms", type=float, default=100.0)
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        user, created = User.objects.get_or_create(username=BENCH_USER)
+        # Sources exist up front so the run measures event writes only
+        registry.resolve_many([f"{BENCH_PREFIX}{i}" for i in range(SOURCES)])
+        rng = random.Random(7)
+        severities = [
+            "CRITICAL" if rng.random() < options["critical_ratio"] else "LOW"
+            for _ in range(int(options["rate"] * options["seconds"]))
+        ]
+        modes = (
+            (
+                "no shedding",
+                AdmissionController(
+                    max_in_flight=10**9, latency_budget_ms=float("inf")
+                ),
+            ),
+            (
+                "shedding",
+                AdmissionController(
+                    max_in_flight=options["max_in_flight"],
+                    latency_budget_ms=options["latency_budget_ms"],
+                ),
+            ),
+        )
+        try:
+            for label, controller in modes:
+                view = EventViewSet.as_view(
+                    {"post": "create"}, admission=controller, throttle_classes=[]
+                )
+                results, wall = self.run(view, user, severities, options)
+                self.report(label, results, wall, controller)
+        finally:
+            self.cleanup(user, created)
+
+    def run(self, view, user, severities, options):
+        factory = APIRequestFactory()
+        delay = options["write_delay_ms"] / 1000
+        table = Event._meta.db_table
+        todo = queue.Queue()
+        results = []
+        lock = threading.Lock()
+
+        def slow_primary(execute, sql, params, many, context):
+            if sql.startswith(f'INSERT INTO "{table}"'):
+                time.sleep(delay)
+            return execute(sql, params, many, context)
+
+        # Arrival as wall-clock time, for the X-Request-Start header
+        offset = time.time() - time.perf_counter()
+
+        def worker():
+            try:
+                with connection.execute_wrapper(slow_primary):
+                    while True:
+                        item = todo.get()
+                        if item is None:
+                            return
+                        i, severity, arrival = item
+                        request = factory.post(
+                            "/api/events/",
+                            {
+                                "source_name": f"{BENCH_PREFIX}{i % SOURCES}",
+                                "event_type": "ANOMALY",
+                                "severity": severity,
+                                "description": "load test",
+                            },
+                            format="json",
+                            HTTP_X_REQUEST_START=f"t={(arrival + offset) * 1e6:.0f}",
+                        )
+                        force_authenticate(request, user)
+                        try:
+                            code = view(request).status_code
+                        except Exception:
+                            code = 500  # e.g. SQLite "database is locked"
+                        ms = (time.perf_counter() - arrival) * 1000
+                        with lock:
+                            results.append((severity, code, ms))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(options["threads"])]
+        for t in threads:
+            t.start()
+        began = time.perf_counter()
+        for i, severity in enumerate(severities):
+            arrival = began + i / options["rate"]
+            time.sleep(max(arrival - time.perf_counter(), 0))
+            todo.put((i, severity, arrival))
+        for _ in threads:
+            todo.put(None)
+        for t in threads:
+            t.join()
+        return results, time.perf_counter() - began
+
+    def report(self, label, results, wall, controller):
+        def percentile(values, q):
+            values = sorted(values)
+            return values[int(q * (len(values) - 1))] if values else 0.0
+
+        critical = [ms for sev, code, ms in results if sev == "CRITICAL"]
+        low = [code for sev, code, _ in results if sev == "LOW"]
+        errors = sum(1 for _, code, _ in results if code >= 500)
+        self.stdout.write(
+            f"[{label}] {len(results)} requests in {wall:.1f}s | CRITICAL "
+            f"n={len(critical)} p50 {percentile(critical, 0.5):.0f} ms, "
+            f"p99 {percentile(critical, 0.99):.0f} ms, "
+            f"max {max(critical, default=0):.0f} ms, "
+            f"mean {statistics.fmean(critical) if critical else 0:.0f} ms | LOW "
+            f"admitted {low.count(201)}, shed {low.count(429)} | 5xx {errors} "
+            f"| shed counters {controller.stats()['shed']}"
+        )
+
+    def cleanup(self, user, created):
+        heartbeats.flush()
+        top_talkers.flush()
+        Alert.objects.filter(event__created_by=user).delete()
+        Event.objects.filter(created_by=user).delete()
+        Source.objects.filter(name__startswith=BENCH_PREFIX).delete()
+        registry.clear()
+        if created:
+            user.delete()
@@ -0,0 +1,131 @@
+import random
+import socket
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from monitoring.models import Alert, Event, EventAggregate, EventAttribute, Source
+
+BENCH_PREFIX = "bench-syslog-"
+SOURCES = 20
+CHUNK_SECONDS = 0.01
+
+
+class Command(BaseCommand):
+    help = (
+        "Local syslog client for a running `run_syslog_listener`: send RFC 5424 "
+        "(or 3164) messages over UDP or TCP at a fixed rate, then wait for the "
+        "events to be stored and report send and end-to-end rates. Bench rows "
+        "are deleted afterwards unless --keep is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=None)
+        parser.add_argument("--transport", choices=("udp", "tcp"), default="tcp")
+        parser.add_argument("--format", choices=("5424", "3164"), default="5424")
+        parser.add_argument("--messages", type=int, default=250000)
+        parser.add_argument("--rate", type=float, default=50000, help="Msgs/s.")
+        parser.add_argument(
+            "--wait", type=float, default=30.0, help="Max seconds to wait for rows."
+        )
+        parser.add_argument("--keep", action="store_true")
+
+    def handle(self, *args, **options):
+        port = options["port"] or (
+            settings.SYSLOG_UDP_PORT
+            if options["transport"] == "udp"
+            else settings.SYSLOG_TCP_PORT
+        )
+        frames = self.build(options["messages"], options["format"])
+        before = Event.objects.filter(source__name__startswith=BENCH_PREFIX).count()
+        try:
+            sent, wall = self.send(
+                frames, options["host"], port, options["transport"], options["rate"]
+            )
+            self.stdout.write(
+                f"[{options['transport']} rfc{options['format']}] sent {sent} "
+                f"messages in {wall:.2f}s ({sent / wall:,.0f}/s)"
+            )
+            stored, e2e = self.wait_stored(before, sent, options["wait"], wall)
+            self.stdout.write(
+                f"stored {stored}/{sent} events, end to end {e2e:.2f}s "
+                f"({stored / e2e:,.0f}/s); see the listener's counters for "
+                f"drops and parse errors"
+            )
+        finally:
+            if not options["keep"]:
+                self.cleanup()
+
+    def build(self, n, fmt):
+        rng = random.Random(7)
+        words = ("login denied", "port scan", "malware blocked", "config change")
+        frames = []
+        for i in range(n):
+            # Mostly info/notice, a few errors and criticals
+            severity = rng.choice((6, 6, 6, 5, 5, 4, 3, 2))
+            pri = 4 * 8 + severity  # facility auth
+            host = f"{BENCH_PREFIX}{i % SOURCES}"
+            text = f"{words[i % len(words)]} seq={i}"
+            if fmt == "5424":
+                msg = (
+                    f"<{pri}>1 2026-01-01T00:00:00Z {host} sshd 42 - "
+                    f'[origin ip="10.0.{i % 250}.{i % 200}"] {text}'
+                )
+            else:
+                msg = f"<{pri}>Jan  1 00:00:00 {host} sshd[42]: {text}"
+            frames.append(msg.encode())
+        return frames
+
+    def send(self, frames, host, port, transport, rate):
+        per_chunk = max(1, int(rate * CHUNK_SECONDS))
+        if transport == "tcp":
+            sock = socket.create_connection((host, port))
+            chunks = [
+                b"".join(b"%d %s" % (len(f), f) for f in frames[i : i + per_chunk])
+                for i in range(0, len(frames), per_chunk)
+            ]
+            send = sock.sendall
+        else:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            chunks = [
+                frames[i : i + per_chunk] for i in range(0, len(frames), per_chunk)
+            ]
+
+            def send(chunk):
+                for frame in chunk:
+                    sock.sendto(frame, (host, port))
+
+        began = time.perf_counter()
+        try:
+            for i, chunk in enumerate(chunks):
+                time.sleep(max(began + i * CHUNK_SECONDS - time.perf_counter(), 0))
+                send(chunk)
+        finally:
+            sock.close()
+        return len(frames), time.perf_counter() - began
+
+    def wait_stored(self, before, sent, wait, send_wall):
+        began = time.perf_counter()
+        stored, last_change = 0, began
+        while time.perf_counter() - began < wait:
+            count = (
+                Event.objects.filter(source__name__startswith=BENCH_PREFIX).count()
+                - before
+            )
+            if count != stored:
+                stored, last_change = count, time.perf_counter()
+            if stored >= sent or time.perf_counter() - last_change > 3:
+                break
+            time.sleep(0.1)
+        return stored, send_wall + (last_change - began)
+
+    def cleanup(self):
+        # Source rows stay: the running listener has them cached
+        sources = Source.objects.filter(name__startswith=BENCH_PREFIX)
+        events = Event.objects.filter(source__in=sources)
+        Alert.objects.filter(event__in=events).delete()
+        EventAttribute.objects.filter(event__in=events).delete()
+        EventAggregate.objects.filter(source__in=sources).delete()
+        events.delete()
@@ -0,0 +1,80 @@
+import random
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from django.utils import timezone
+
+from monitoring.models import Event
+from monitoring.sketches import SpaceSaving
+from monitoring.top_talkers import WINDOWS, top_talkers
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare top-N sources from the heavy-hitter sketches against the exact "
+        "GROUP BY query over Event (latency + agreement), and measure sketch "
+        "accuracy/throughput on a synthetic Zipf stream."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--window", default="1h", choices=sorted(WINDOWS))
+        parser.add_argument("--n", type=int, default=10)
+        parser.add_argument("--synthetic", type=int, default=1_000_000)
+        parser.add_argument("--sources", type=int, default=5000)
+        parser.add_argument("--k", type=int, default=top_talkers.k)
+
+    def handle(self, *args, **options):
+        n = options["n"]
+        self.compare_with_sql(options["window"], n)
+        if options["synthetic"]:
+            self.synthetic(options["synthetic"], options["sources"], options["k"], n)
+
+    def timed(self, fn):
+        began = time.perf_counter()
+        result = fn()
+        return result, (time.perf_counter() - began) * 1000
+
+    def compare_with_sql(self, window, n):
+        since = timezone.now() - timedelta(minutes=WINDOWS[window])
+        exact, sql_ms = self.timed(
+            lambda: list(
+                Event.objects.filter(timestamp__gte=since)
+                .values("source__name")
+                .annotate(c=Count("id"))
+                .order_by("-c")[:n]
+            )
+        )
+        top_talkers.flush()
+        sketch, sketch_ms = self.timed(lambda: top_talkers.query("source", window, n))
+
+        exact_names = {row["source__name"] for row in exact}
+        sketch_names = {row["item"] for row in sketch["results"]}
+        overlap = len(exact_names & sketch_names)
+        self.stdout.write(
+            f"[{window}] exact GROUP BY: {sql_ms:.1f} ms | sketch: {sketch_ms:.1f} ms "
+            f"| top-{n} agreement {overlap}/{len(exact_names) or 0} "
+            f"| sketch total {sketch['total']}, max error {sketch['max_error']}"
+        )
+
+    def synthetic(self, events, sources, k, n):
+        rng = random.Random(42)
+        names = [f"src-{i}" for i in range(sources)]
+        weights = [1 / (i + 1) ** 1.1 for i in range(sources)]  # Zipf-like
+        stream = rng.choices(names, weights=weights, k=events)
+
+        sketch = SpaceSaving(k)
+        _, ms = self.timed(lambda: [sketch.add(x) for x in stream])
+        truth = Counter(stream)
+
+        exact_top = [name for name, _ in truth.most_common(n)]
+        sketch_top = [row["item"] for row in sketch.top(n)]
+        worst = max(abs(sketch.counts[x] - truth[x]) for x in sketch_top)
+        self.stdout.write(
+            f"[synthetic] {events:,} events, {sources} sources, k={k}: "
+            f"{events / (ms / 1000):,.0f} updates/s, "
+            f"top-{n} agreement {len(set(exact_top) & set(sketch_top))}/{n}, "
+            f"worst overcount {worst} (bound {events // k})"
+        )
@@ -0,0 +1,54 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate the OpenAPI schema once (deploy time) into OPENAPI_SCHEMA_FILE "
+        "so `collectstatic` + whitenoise can serve it as a static file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--file",
+            default=str(settings.OPENAPI_SCHEMA_FILE),
+            help="Output path (default: settings.OPENAPI_SCHEMA_FILE).",
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options["file"])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if apps.is_installed("drf_spectacular"):
+            call_command(
+                "spectacular",
+                format="openapi-json",
+                file=str(path),
+                fail_on_warn=False,
+            )
+        else:
+            # Outside DEBUG the generator is not installed (settings.py);
+            # run again in a process that loads it
+            done = subprocess.run(
+                [
+                    sys.executable,
+                    str(settings.BASE_DIR / "manage.py"),
+                    "build_schema",
+                    "--file",
+                    str(path),
+                ],
+                env={**os.environ, "OPENAPI_SCHEMA_BUILD": "1"},
+                capture_output=True,
+                text=True,
+            )
+            if done.returncode:
+                raise CommandError(f"Schema generation failed:\n{done.stderr}")
+        self.stdout.write(
+            self.style.SUCCESS(f"Wrote {path} ({path.stat().st_size} bytes)")
+        )
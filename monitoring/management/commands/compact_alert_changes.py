@@ -0,0 +1,58 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from monitoring.changes import compact_changes
+from monitoring.models import AlertChange
+
+
+class Command(BaseCommand):
+    help = (
+        "Compact the alert change feed: entries older than --keep-hours that a "
+        "later entry of the same alert supersedes are deleted, in seq chunks "
+        "with short transactions. Every alert keeps its newest entry, except "
+        "DELETED entries older than --tombstone-hours, which are dropped. Each "
+        "run resumes where the previous one stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--keep-hours", type=int, default=settings.ALERT_CHANGES_RETENTION_HOURS
+        )
+        parser.add_argument(
+            "--tombstone-hours",
+            type=int,
+            default=settings.ALERT_CHANGES_TOMBSTONE_HOURS,
+        )
+        parser.add_argument("--chunk-size", type=int, default=5000)
+
+    def horizon(self, hours: int) -> int:
+        cutoff = timezone.now() - timedelta(hours=hours)
+        # First recent entry; the older ones precede it in seq order
+        horizon = (
+            AlertChange.objects.filter(changed_at__gte=cutoff)
+            .order_by("seq")
+            .values_list("seq", flat=True)
+            .first()
+        )
+        if horizon is None:
+            last = AlertChange.objects.order_by("-seq").values_list("seq", flat=True)
+            horizon = (last.first() or 0) + 1
+        return horizon
+
+    def handle(self, *args, **options):
+        horizon = self.horizon(options["keep_hours"])
+        tombstones = self.horizon(
+            max(options["tombstone_hours"], options["keep_hours"])
+        )
+        removed = compact_changes(
+            horizon,
+            chunk_size=max(1, options["chunk_size"]),
+            tombstone_horizon=tombstones,
+        )
+        self.stdout.write(
+            f"Removed {removed} superseded alert changes below seq {horizon} "
+            f"(deletions below {tombstones}); {AlertChange.objects.count()} remain."
+        )
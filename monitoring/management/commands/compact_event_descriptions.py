@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import Length
+
+from monitoring.descriptions import descriptions
+from monitoring.models import Event, EventDescription
+
+
+class Command(BaseCommand):
+    help = (
+        "Move legacy Event.description text onto shared EventDescription rows "
+        "(one per distinct text), in primary-key chunks (one short transaction "
+        "per chunk). Reports how much text was taken out of the event table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        chunk_size = max(1, options["chunk_size"])
+        pending = Event.objects.filter(description_ref__isnull=True).exclude(
+            legacy_description=""
+        )
+        bounds = pending.aggregate(lo=Min("id"), hi=Max("id"))
+        if bounds["lo"] is None:
+            self.stdout.write("Nothing to compact.")
+            return
+
+        compacted = moved = 0
+        for start in range(bounds["lo"], bounds["hi"] + 1, chunk_size):
+            chunk = pending.filter(id__gte=start, id__lt=start + chunk_size)
+            with transaction.atomic():
+                sizes = dict(
+                    chunk.values_list("legacy_description")
+                    .annotate(bytes=Sum(Length("legacy_description")))
+                    .values_list("legacy_description", "bytes")
+                )
+                if not sizes:
+                    continue
+                ids = descriptions.resolve_many(sizes)
+                # One UPDATE per distinct text in the chunk, not per row
+                for text, pk in ids.items():
+                    compacted += chunk.filter(legacy_description=text).update(
+                        description_ref_id=pk, legacy_description=""
+                    )
+                moved += sum(sizes.values())
+            self.stdout.write(f"  ids {start}..{start + chunk_size - 1}: {compacted}")
+
+        stored = EventDescription.objects.aggregate(
+            n=Count("id"), bytes=Sum(Length("text"))
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Compacted {compacted} events: {moved:,} characters of text moved "
+                f"out of the event table; {stored['n'] or 0} distinct descriptions "
+                f"hold {stored['bytes'] or 0:,}."
+            )
+        )
@@ -0,0 +1,51 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from monitoring.notifications import Dispatcher
+
+logger = logging.getLogger("monitoring")
+
+
+class Command(BaseCommand):
+    help = (
+        "Deliver queued alert notifications (webhook/email) as per-destination "
+        "digests, with retries and per-destination rate limits."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true", help="Run a single cycle and exit."
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=settings.NOTIFIER_POLL_INTERVAL,
+            help="Seconds to sleep after a cycle that sent nothing.",
+        )
+        parser.add_argument("--workers", type=int, default=None)
+
+    def handle(self, *args, **options):
+        dispatcher = Dispatcher(workers=options["workers"])
+        self.stdout.write(
+            f"Notifier started ({dispatcher.workers} workers, "
+            f"{dispatcher.rate_per_minute:g}/min per destination)"
+        )
+        try:
+            while True:
+                stats = dispatcher.run_once()
+                if stats["claimed"]:
+                    logger.info("Notifier cycle", extra=stats)
+                if options["once"]:
+                    self.stdout.write(str(stats))
+                    return
+                # Nothing due, or everything throttled / failing: the rows
+                # are deferred in the DB, so polling again at once is waste
+                if not stats["sent"]:
+                    time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            dispatcher.close()
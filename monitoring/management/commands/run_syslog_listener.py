@@ -0,0 +1,92 @@
+import asyncio
+import logging
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from monitoring.syslog_ingest import SyslogListener
+
+logger = logging.getLogger("monitoring")
+
+
+class Command(BaseCommand):
+    help = (
+        "Receive RFC 5424 / 3164 syslog over UDP and TCP and store the events "
+        "in batches (bulk inserts, attribute index, alerts + notifications). "
+        "Reports received / parse-error / dropped / written counters."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default=settings.SYSLOG_HOST)
+        parser.add_argument("--udp-port", type=int, default=settings.SYSLOG_UDP_PORT)
+        parser.add_argument("--tcp-port", type=int, default=settings.SYSLOG_TCP_PORT)
+        parser.add_argument("--no-udp", action="store_true")
+        parser.add_argument("--no-tcp", action="store_true")
+        parser.add_argument(
+            "--batch-size", type=int, default=settings.SYSLOG_BATCH_SIZE
+        )
+        parser.add_argument(
+            "--flush-interval", type=float, default=settings.SYSLOG_FLUSH_INTERVAL
+        )
+        parser.add_argument(
+            "--queue-size", type=int, default=settings.SYSLOG_QUEUE_SIZE
+        )
+        parser.add_argument(
+            "--reuse-port",
+            action="store_true",
+            help="SO_REUSEPORT: run several listeners on the same ports.",
+        )
+        parser.add_argument(
+            "--stats-interval",
+            type=float,
+            default=10.0,
+            help="Seconds between counter reports; 0 disables them.",
+        )
+
+    def handle(self, *args, **options):
+        listener = SyslogListener(
+            batch_size=options["batch_size"],
+            flush_interval=options["flush_interval"],
+            queue_size=options["queue_size"],
+        )
+        try:
+            asyncio.run(self.serve(listener, options))
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(f"Syslog listener stopped: {listener.stats()}")
+
+    async def serve(self, listener, options):
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+
+        udp_port = None if options["no_udp"] else options["udp_port"]
+        tcp_port = None if options["no_tcp"] else options["tcp_port"]
+        task = asyncio.create_task(
+            listener.serve(
+                options["host"],
+                udp_port=udp_port,
+                tcp_port=tcp_port,
+                stop=stop,
+                stats_interval=options["stats_interval"],
+                report=self.report,
+                reuse_port=options["reuse_port"],
+            )
+        )
+        disabled = (udp_port, tcp_port).count(None)
+        while len(listener.addresses) < 2 - disabled and not task.done():
+            await asyncio.sleep(0.05)
+        self.stdout.write(
+            "Syslog listener on "
+            + ", ".join(
+                f"{proto} {host}:{port}"
+                for proto, (host, port) in listener.addresses.items()
+            )
+        )
+        await task
+
+    def report(self, stats):
+        logger.info("Syslog listener", extra=stats)
+        self.stdout.write(str(stats))
@@ -0,0 +1,95 @@
+# Generated by Django 5.2.9 on 2026-10-19 14:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitoring", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Source",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=120, unique=True)),
+                (
+                    "source_type",
+                    models.CharField(
+                        choices=[
+                            ("CAMERA", "Camera"),
+                            ("FIREWALL", "Firewall"),
+                            ("IDS", "IDS/IPS"),
+                            ("SIEM", "SIEM"),
+                            ("ENDPOINT", "Endpoint"),
+                            ("OTHER", "Other"),
+                        ],
+                        default="OTHER",
+                        max_length=20,
+                    ),
+                ),
+                ("site", models.CharField(blank=True, default="", max_length=120)),
+                ("owner", models.CharField(blank=True, default="", max_length=120)),
+                (
+                    "criticality",
+                    models.CharField(
+                        choices=[
+                            ("LOW", "Low"),
+                            ("MEDIUM", "Medium"),
+                            ("HIGH", "High"),
+                            ("CRITICAL", "Critical"),
+                        ],
+                        default="MEDIUM",
+                        max_length=20,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "ordering": ["name"],
+            },
+        ),
+        # Keep existing strings in place; backfill_event_sources moves them
+        # onto Source rows in chunks after deploy.
+        migrations.RenameField(
+            model_name="event",
+            old_name="source_name",
+            new_name="legacy_source_name",
+        ),
+        migrations.AlterField(
+            model_name="event",
+            name="legacy_source_name",
+            field=models.CharField(blank=True, default="", max_length=120),
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="source",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="events",
+                to="monitoring.source",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="event",
+            index=models.Index(
+                fields=["source", "timestamp"], name="monitoring__source__831c9a_idx"
+            ),
+        ),
+    ]
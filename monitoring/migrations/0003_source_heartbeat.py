@@ -0,0 +1,36 @@
+# Generated by Django 5.2.9 on 2026-10-19 14:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitoring", "0002_source_registry"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SourceHeartbeat",
+            fields=[
+                (
+                    "source",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="heartbeat",
+                        serialize=False,
+                        to="monitoring.source",
+                    ),
+                ),
+                ("last_seen", models.DateTimeField(db_index=True)),
+                ("last_severity", models.CharField(max_length=20)),
+                ("event_count", models.BigIntegerField(default=0)),
+                ("event_rate", models.FloatField(default=0.0)),
+            ],
+            options={
+                "ordering": ["last_seen"],
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.9 on 2026-10-19 14:20
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitoring", "0004_notification_outbox"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="alert",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True, db_index=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+    ]
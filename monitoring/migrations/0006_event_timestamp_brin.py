@@ -0,0 +1,31 @@
+from django.db import migrations
+
+BRIN_INDEX = "monitoring_event_timestamp_brin"
+
+
+def create_brin(apps, schema_editor):
+    # Event rows are appended in timestamp order, so a BRIN index stays tiny
+    # (a few pages per million rows) and keeps wide time-range scans cheap.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {BRIN_INDEX} "
+        'ON monitoring_event USING brin ("timestamp") WITH (pages_per_range = 32)'
+    )
+
+
+def drop_brin(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"DROP INDEX IF EXISTS {BRIN_INDEX}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitoring", "0005_alert_updated_at"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_brin, drop_brin),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.9 on 2026-10-19 14:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitoring", "0006_event_timestamp_brin"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TopTalkersBucket",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("dimension", models.CharField(max_length=20)),
+                ("minute", models.DateTimeField(db_index=True)),
+                ("worker", models.CharField(max_length=64)),
+                ("sketch", models.JSONField()),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("dimension", "minute", "worker"),
+                        name="uniq_top_talkers_bucket",
+                    )
+                ],
+            },
+        ),
+    ]
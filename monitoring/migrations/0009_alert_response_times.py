@@ -0,0 +1,97 @@
+# Generated by Django 5.2.9 on 2026-10-19 14:15
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitoring", "0008_alert_status_change"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="alert",
+            name="acknowledged_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="alert",
+            name="acknowledged_by",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="alerts_acknowledged",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddField(
+            model_name="alert",
+            name="resolved_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="alert",
+            name="resolved_by",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="alerts_resolved",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.CreateModel(
+            name="AlertResponseRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                (
+                    "severity",
+                    models.CharField(
+                        choices=[
+                            ("LOW", "Low"),
+                            ("MEDIUM", "Medium"),
+                            ("HIGH", "High"),
+                            ("CRITICAL", "Critical"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "metric",
+                    models.CharField(
+                        choices=[
+                            ("MTTA", "Time to acknowledge"),
+                            ("MTTR", "Time to resolve"),
+                        ],
+                        max_length=4,
+                    ),
+                ),
+                ("count", models.PositiveIntegerField(default=0)),
+                ("total_seconds", models.FloatField(default=0.0)),
+                ("sketch", models.JSONField(default=dict)),
+            ],
+            options={
+                "ordering": ["-day", "metric", "severity"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("day", "metric", "severity"),
+                        name="uniq_alert_response_rollup",
+                    )
+                ],
+            },
+        ),
+    ]
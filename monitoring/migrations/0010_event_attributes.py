@@ -0,0 +1,71 @@
+# Generated by Django 5.2.9 on 2026-10-19 14:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+GIN_INDEX = "monitoring_event_attributes_gin"
+
+
+def create_gin(apps, schema_editor):
+    # Containment queries on non-promoted keys (attributes @> '{"k": "v"}')
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {GIN_INDEX} "
+        "ON monitoring_event USING gin (attributes jsonb_path_ops)"
+    )
+
+
+def drop_gin(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"DROP INDEX IF EXISTS {GIN_INDEX}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitoring", "0009_alert_response_times"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="attributes",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.CreateModel(
+            name="EventAttribute",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("key", models.CharField(max_length=32)),
+                ("value", models.CharField(max_length=255)),
+                ("timestamp", models.DateTimeField()),
+                (
+                    "event",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="indexed_attributes",
+                        to="monitoring.event",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["key", "value", "timestamp"],
+                        name="monitoring__key_c44129_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(create_gin, drop_gin),
+    ]
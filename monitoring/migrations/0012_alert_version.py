@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-19 14:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitoring", "0011_alert_assignment"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="alert",
+            name="version",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
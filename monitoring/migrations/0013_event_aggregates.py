@@ -0,0 +1,80 @@
+# Generated by Django 5.2.9 on 2026-10-19 14:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitoring", "0012_alert_version"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EventAggregate",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "event_type",
+                    models.CharField(
+                        choices=[
+                            ("INTRUSION", "Intrusion"),
+                            ("MALWARE", "Malware"),
+                            ("ANOMALY", "Anomaly"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "severity",
+                    models.CharField(
+                        choices=[
+                            ("LOW", "Low"),
+                            ("MEDIUM", "Medium"),
+                            ("HIGH", "High"),
+                            ("CRITICAL", "Critical"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("bucket", models.DateTimeField(db_index=True)),
+                ("worker", models.CharField(max_length=64)),
+                ("count", models.PositiveIntegerField(default=0)),
+                ("first_seen", models.DateTimeField()),
+                ("last_seen", models.DateTimeField()),
+                ("samples", models.JSONField(blank=True, default=list)),
+                (
+                    "source",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="event_aggregates",
+                        to="monitoring.source",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-bucket"],
+                "indexes": [
+                    models.Index(
+                        fields=["severity", "bucket"],
+                        name="monitoring__severit_482fc9_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("source", "event_type", "severity", "bucket", "worker"),
+                        name="uniq_event_aggregate_bucket",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitoring", "0013_event_aggregates"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EventDescription",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("digest", models.CharField(max_length=64, unique=True)),
+                ("text", models.TextField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        # Keep existing text in place; compact_event_descriptions moves it
+        # onto EventDescription rows in chunks after deploy.
+        migrations.RenameField(
+            model_name="event",
+            old_name="description",
+            new_name="legacy_description",
+        ),
+        migrations.AlterField(
+            model_name="event",
+            name="legacy_description",
+            field=models.TextField(blank=True, default=""),
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="description_ref",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="events",
+                to="monitoring.eventdescription",
+            ),
+        ),
+    ]
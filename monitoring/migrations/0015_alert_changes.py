@@ -0,0 +1,105 @@
+# Generated by Django 5.2.9 on 2026-10-19 15:05
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def seed_changes(apps, schema_editor):
+    # One entry per existing alert, so a feed read from seq 0 includes them
+    Alert = apps.get_model("monitoring", "Alert")
+    AlertChange = apps.get_model("monitoring", "AlertChange")
+    db = schema_editor.connection.alias
+    rows = []
+    for alert in (
+        Alert.objects.using(db)
+        .order_by("id")
+        .values("id", "status", "version", "assigned_to_id", "updated_at")
+        .iterator(chunk_size=5000)
+    ):
+        rows.append(
+            AlertChange(
+                alert_id=alert["id"],
+                kind="CREATED",
+                status=alert["status"],
+                version=alert["version"],
+                assigned_to_id=alert["assigned_to_id"],
+                changed_at=alert["updated_at"],
+            )
+        )
+        if len(rows) >= 5000:
+            AlertChange.objects.using(db).bulk_create(rows)
+            rows = []
+    AlertChange.objects.using(db).bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitoring", "0014_event_descriptions"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AlertChange",
+            fields=[
+                ("seq", models.BigAutoField(primary_key=True, serialize=False)),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("CREATED", "Created"),
+                            ("STATUS", "Status changed"),
+                            ("ASSIGNED", "Assigned"),
+                            ("EVENT", "Event updated"),
+                            ("UPDATED", "Updated"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("OPEN", "Open"),
+                            ("ACKNOWLEDGED", "Acknowledged"),
+                            ("RESOLVED", "Resolved"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("version", models.PositiveIntegerField()),
+                ("changed_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "alert",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="changes",
+                        to="monitoring.alert",
+                    ),
+                ),
+                (
+                    "assigned_to",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["seq"],
+                "indexes": [
+                    models.Index(
+                        fields=["alert", "seq"], name="monitoring__alert_i_9e5e20_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(seed_changes, migrations.RunPython.noop),
+    ]
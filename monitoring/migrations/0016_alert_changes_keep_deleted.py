@@ -0,0 +1,46 @@
+# Generated by Django 5.2.9 on 2026-10-19 15:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitoring", "0015_alert_changes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="alertchange",
+            name="lease_expires_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="alertchange",
+            name="alert",
+            field=models.ForeignKey(
+                db_constraint=False,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.DO_NOTHING,
+                related_name="changes",
+                to="monitoring.alert",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="alertchange",
+            name="kind",
+            field=models.CharField(
+                choices=[
+                    ("CREATED", "Created"),
+                    ("STATUS", "Status changed"),
+                    ("ASSIGNED", "Assigned"),
+                    ("EVENT", "Event updated"),
+                    ("UPDATED", "Updated"),
+                    ("DELETED", "Deleted"),
+                ],
+                max_length=10,
+            ),
+        ),
+    ]
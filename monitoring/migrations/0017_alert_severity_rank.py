@@ -0,0 +1,40 @@
+# Generated by Django 5.2.9 on 2026-10-19 15:37
+
+from django.conf import settings
+from django.db import migrations, models
+
+# Event.Severity values, most severe first (rank 0)
+RANKED = ("CRITICAL", "HIGH", "MEDIUM", "LOW")
+
+
+def copy_ranks(apps, schema_editor):
+    Alert = apps.get_model("monitoring", "Alert")
+    db = schema_editor.connection.alias
+    for rank, severity in enumerate(RANKED):
+        Alert.objects.using(db).filter(event__severity=severity).update(
+            severity_rank=rank
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitoring", "0016_alert_changes_keep_deleted"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="alert",
+            name="severity_rank",
+            field=models.PositiveSmallIntegerField(default=4),
+        ),
+        migrations.RunPython(copy_ranks, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="alert",
+            index=models.Index(
+                fields=["status", "severity_rank", "created_at", "id"],
+                name="monitoring__status_7b6c85_idx",
+            ),
+        ),
+    ]
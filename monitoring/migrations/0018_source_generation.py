@@ -0,0 +1,31 @@
+# Generated by Django 5.2.9 on 2026-10-19 15:47
+
+from django.db import migrations, models
+
+
+def seed_generation(apps, schema_editor):
+    Generation = apps.get_model("monitoring", "Generation")
+    Generation.objects.using(schema_editor.connection.alias).get_or_create(
+        name="sources"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitoring", "0017_alert_severity_rank"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Generation",
+            fields=[
+                (
+                    "name",
+                    models.CharField(max_length=40, primary_key=True, serialize=False),
+                ),
+                ("value", models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(seed_generation, migrations.RunPython.noop),
+    ]
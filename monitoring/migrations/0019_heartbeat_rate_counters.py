@@ -0,0 +1,32 @@
+# Generated by Django 5.2.9 on 2026-10-19 15:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitoring", "0018_source_generation"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="sourceheartbeat",
+            name="event_rate",
+        ),
+        migrations.AddField(
+            model_name="sourceheartbeat",
+            name="rate_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="sourceheartbeat",
+            name="rate_minute",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="sourceheartbeat",
+            name="rate_prev_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
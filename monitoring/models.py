@@ -1,5 +1,116 @@
+from datetime import timedelta
+
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
+
+
+class Source(models.Model):
+    """
+    A sensor / device that emits events (camera, firewall, SIEM, ...).
+    Events reference a Source row instead of repeating the name string.
+    """
+
+    class SourceTypes(models.TextChoices):
+        CAMERA = "CAMERA", "Camera"
+        FIREWALL = "FIREWALL", "Firewall"
+        IDS = "IDS", "IDS/IPS"
+        SIEM = "SIEM", "SIEM"
+        ENDPOINT = "ENDPOINT", "Endpoint"
+        OTHER = "OTHER", "Other"
+
+    class Criticality(models.TextChoices):
+        LOW = "LOW", "Low"
+        MEDIUM = "MEDIUM", "Medium"
+        HIGH = "HIGH", "High"
+        CRITICAL = "CRITICAL", "Critical"
+
+    name = models.CharField(max_length=120, unique=True)
+    source_type = models.CharField(
+        max_length=20, choices=SourceTypes.choices, default=SourceTypes.OTHER
+    )
+    site = models.CharField(max_length=120, blank=True, default="")
+    owner = models.CharField(max_length=120, blank=True, default="")
+    criticality = models.CharField(
+        max_length=20, choices=Criticality.choices, default=Criticality.MEDIUM
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["name"]
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class Generation(models.Model):
+    """
+    Named change counter, bumped in the transaction of a change that
+    per-process caches must notice (source renames, see sources.py), or
+    a progress mark (change-feed compaction, see changes.py). Reading one
+    is a primary-key probe.
+    """
+
+    name = models.CharField(max_length=40, primary_key=True)
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f"{self.name}@{self.value}"
+
+
+class SourceHeartbeat(models.Model):
+    """
+    Per-source liveness, maintained from the ingestion path by coalesced
+    batched writes (see monitoring/heartbeat.py).
+    """
+
+    source = models.OneToOneField(
+        Source, on_delete=models.CASCADE, primary_key=True, related_name="heartbeat"
+    )
+    last_seen = models.DateTimeField(db_index=True)
+    last_severity = models.CharField(max_length=20)
+    event_count = models.BigIntegerField(default=0)
+    # Events counted in the wall-clock minute starting at rate_minute and in
+    # the minute before it, summed over all workers; see rate_at()
+    rate_minute = models.DateTimeField(null=True, blank=True)
+    rate_count = models.PositiveIntegerField(default=0)
+    rate_prev_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["last_seen"]
+
+    def rate_at(self, now) -> float:
+        """
+        Events/minute over the last 60 seconds (sliding window estimate):
+        the current minute's count plus the unexpired share of the previous
+        one. Computed at read time, so a silent source decays to 0.
+        """
+        if self.rate_minute is None:
+            return 0.0
+        current = now.replace(second=0, microsecond=0)
+        remaining = 1 - (now - current).total_seconds() / 60
+        if self.rate_minute >= current:
+            return self.rate_count + self.rate_prev_count * remaining
+        if self.rate_minute == current - timedelta(minutes=1):
+            return self.rate_count * remaining
+        return 0.0
+
+    def __str__(self) -> str:
+        return f"Heartbeat({self.source_id}) {self.last_seen}"
+
+
+class EventDescription(models.Model):
+    """
+    One row per distinct event description text, addressed by its SHA-256.
+    Events reference it instead of repeating the same text millions of times.
+    """
+
+    digest = models.CharField(max_length=64, unique=True)
+    text = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return self.text[:80]
 
 
 class Event(models.Model):
@@ -14,10 +125,32 @@ class Event(models.Model):
         HIGH = "HIGH", "High"
         CRITICAL = "CRITICAL", "Critical"
 
-    source_name = models.CharField(max_length=120)
+    # Covered by the (source, timestamp) index below.
+    source = models.ForeignKey(
+        Source,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name="events",
+        db_index=False,
+    )
+    # Pre-normalization rows only; emptied by `manage.py backfill_event_sources`.
+    legacy_source_name = models.CharField(max_length=120, blank=True, default="")
     event_type = models.CharField(max_length=20, choices=EventTypes.choices)
     severity = models.CharField(max_length=20, choices=Severity.choices, db_index=True)
-    description = models.TextField()
+    # Deduplicated text; `description` below reads / writes through it.
+    description_ref = models.ForeignKey(
+        EventDescription,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name="events",
+    )
+    # Pre-deduplication rows only; emptied by `manage.py compact_event_descriptions`.
+    legacy_description = models.TextField(blank=True, default="")
+    # Structured sensor fields (src_ip, host, file_hash, ...). The keys in
+    # settings.EVENT_INDEXED_ATTRIBUTES are also copied into EventAttribute.
+    attributes = models.JSONField(default=dict, blank=True)
     timestamp = models.DateTimeField(auto_now_add=True, db_index=True)
 
     created_by = models.ForeignKey(
@@ -32,13 +165,63 @@ class Event(models.Model):
         indexes = [
             models.Index(fields=["severity", "timestamp"]),
             models.Index(fields=["event_type", "timestamp"]),
+            models.Index(fields=["source", "timestamp"]),
         ]
         ordering = ["-timestamp"]
 
+    @property
+    def source_name(self) -> str:
+        if self.source_id:
+            return self.source.name
+        return self.legacy_source_name
+
+    @source_name.setter
+    def source_name(self, value: str) -> None:
+        # Lets Event(source_name="Camera-01") keep working: the name is
+        # resolved through the in-process registry (no query when cached).
+        from .sources import registry
+
+        self.source = registry.resolve(value)
+
+    @property
+    def description(self) -> str:
+        if self.description_ref_id:
+            return self.description_ref.text
+        return self.legacy_description
+
+    @description.setter
+    def description(self, value: str) -> None:
+        # Event(description="...") stores a reference to the shared text row,
+        # resolved by hash through the in-process cache (no query when hot).
+        from .descriptions import descriptions
+
+        self.description_ref = descriptions.resolve(value)
+
     def __str__(self) -> str:
         return f"{self.source_name} {self.event_type} {self.severity}"
 
 
+class EventAttribute(models.Model):
+    """
+    Lookup row for one hot attribute of an Event (see attributes.py).
+    `timestamp` is copied from the event so "src_ip=X in the last hour" is a
+    single range scan on the (key, value, timestamp) index.
+    """
+
+    event = models.ForeignKey(
+        Event, on_delete=models.CASCADE, related_name="indexed_attributes"
+    )
+    key = models.CharField(max_length=32)
+    value = models.CharField(max_length=255)
+    timestamp = models.DateTimeField()
+
+    class Meta:
+        indexes = [models.Index(fields=["key", "value", "timestamp"])]
+
+    def __str__(self) -> str:
+        return f"{self.key}={self.value}"
+
+
 class Alert(models.Model):
     class Status(models.TextChoices):
         OPEN = "OPEN", "Open"
@@ -50,10 +233,262 @@ class Alert(models.Model):
         max_length=20, choices=Status.choices, default=Status.OPEN, db_index=True
     )
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    # Bulk .update() calls must set it explicitly.
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    # Bumped on every status change; clients send it back for compare-and-set
+    version = models.PositiveIntegerField(default=0)
+    # First acknowledgement / resolution (MTTA / MTTR), see transitions.py
+    acknowledged_at = models.DateTimeField(null=True, blank=True)
+    acknowledged_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="alerts_acknowledged",
+    )
+    resolved_at = models.DateTimeField(null=True, blank=True)
+    resolved_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="alerts_resolved",
+    )
+    # Work queue (see assignment.py): the claim is void once the lease expires
+    assigned_to = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="alerts_assigned",
+    )
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+    # Claim order, 0 = CRITICAL: copied from the event so the work queue is
+    # read in index order instead of sorting the OPEN backlog through a join.
+    # Set by save() on creation; bulk_create callers use Alert.rank_for().
+    severity_rank = models.PositiveSmallIntegerField(default=len(Event.Severity.values))
 
     class Meta:
-        indexes = [models.Index(fields=["status", "created_at"])]
+        indexes = [
+            models.Index(fields=["status", "created_at"]),
+            # Claim queue order (see assignment.py); id breaks ties
+            models.Index(fields=["status", "severity_rank", "created_at", "id"]),
+        ]
         ordering = ["-created_at"]
 
+    @staticmethod
+    def rank_for(severity: str) -> int:
+        # The choice values do not sort by severity alphabetically
+        values = Event.Severity.values
+        if severity not in values:
+            return len(values)
+        return len(values) - 1 - values.index(severity)
+
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            self.severity_rank = self.rank_for(self.event.severity)
+        super().save(*args, **kwargs)
+
     def __str__(self) -> str:
         return f"Alert({self.event_id}) {self.status}"
+
+
+class AlertStatusChange(models.Model):
+    """
+    Audit trail of alert status transitions (by a user or by a lifecycle policy).
+    """
+
+    alert = models.ForeignKey(
+        Alert, on_delete=models.CASCADE, related_name="status_changes"
+    )
+    from_status = models.CharField(max_length=20, choices=Alert.Status.choices)
+    to_status = models.CharField(max_length=20, choices=Alert.Status.choices)
+    changed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="alert_status_changes",
+    )
+    reason = models.CharField(max_length=120, blank=True, default="")
+    changed_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ["-changed_at"]
+
+    def __str__(self) -> str:
+        return f"Alert({self.alert_id}) {self.from_status} -> {self.to_status}"
+
+
+class AlertChange(models.Model):
+    """
+    Sequenced change feed behind GET /api/alerts/changes/?since=<seq>.
+    One row per alert creation, status transition, claim, event edit or
+    deletion, written in the transaction that made the change (see
+    changes.py). Each row carries the alert's state after the change, so
+    older rows of the same alert can be compacted away.
+    """
+
+    class Kind(models.TextChoices):
+        CREATED = "CREATED", "Created"
+        STATUS = "STATUS", "Status changed"
+        ASSIGNED = "ASSIGNED", "Assigned"
+        EVENT = "EVENT", "Event updated"
+        UPDATED = "UPDATED", "Updated"
+        DELETED = "DELETED", "Deleted"
+
+    seq = models.BigAutoField(primary_key=True)
+    # Rows outlive their alert (the DELETED entry must reach clients): no
+    # cascade and no constraint. Nullable only so reads LEFT JOIN the alert.
+    # Covered by the (alert, seq) index used by compaction.
+    alert = models.ForeignKey(
+        Alert,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        null=True,
+        related_name="changes",
+    )
+    kind = models.CharField(max_length=10, choices=Kind.choices)
+    status = models.CharField(max_length=20, choices=Alert.Status.choices)
+    version = models.PositiveIntegerField()
+    assigned_to = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    # The claim is void after this; clients expire `assigned_to` themselves
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [models.Index(fields=["alert", "seq"])]
+        ordering = ["seq"]
+
+    def __str__(self) -> str:
+        return f"#{self.seq} Alert({self.alert_id}) {self.kind}"
+
+
+class AlertResponseRollup(models.Model):
+    """
+    Daily per-severity time-to-acknowledge / time-to-resolve aggregate,
+    updated incrementally on each transition. `sketch` is a LogHistogram
+    (monitoring/sketches.py) so percentiles merge across days.
+    """
+
+    class Metrics(models.TextChoices):
+        MTTA = "MTTA", "Time to acknowledge"
+        MTTR = "MTTR", "Time to resolve"
+
+    day = models.DateField()
+    severity = models.CharField(max_length=20, choices=Event.Severity.choices)
+    metric = models.CharField(max_length=4, choices=Metrics.choices)
+    count = models.PositiveIntegerField(default=0)
+    total_seconds = models.FloatField(default=0.0)
+    sketch = models.JSONField(default=dict)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "metric", "severity"], name="uniq_alert_response_rollup"
+            )
+        ]
+        ordering = ["-day", "metric", "severity"]
+
+    def __str__(self) -> str:
+        return f"{self.metric} {self.severity} {self.day}"
+
+
+class NotificationOutbox(models.Model):
+    """
+    Transactional outbox: one row per (alert, destination), written in the
+    alert-creation transaction and drained by `manage.py run_notifier`.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "PENDING", "Pending"
+        SENT = "SENT", "Sent"
+        FAILED = "FAILED", "Failed"
+
+    alert = models.ForeignKey(
+        Alert, on_delete=models.CASCADE, related_name="notifications"
+    )
+    destination = models.CharField(max_length=255)
+    status = models.CharField(
+        max_length=20, choices=Status.choices, default=Status.PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"]),
+            models.Index(fields=["status", "sent_at"]),
+        ]
+        ordering = ["id"]
+
+    def __str__(self) -> str:
+        return f"Notification({self.alert_id} -> {self.destination}) {self.status}"
+
+
+class TopTalkersBucket(models.Model):
+    """
+    One worker's Space-Saving sketch for one minute of one dimension
+    (source / event_type). Merged at read time; pruned after an hour.
+    """
+
+    dimension = models.CharField(max_length=20)
+    minute = models.DateTimeField(db_index=True)
+    worker = models.CharField(max_length=64)
+    sketch = models.JSONField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["dimension", "minute", "worker"],
+                name="uniq_top_talkers_bucket",
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.dimension}@{self.minute:%H:%M} ({self.worker})"
+
+
+class EventAggregate(models.Model):
+    """
+    Low-value events folded into one row per (source, event_type, severity,
+    time bucket) instead of one Event row each; see monitoring/aggregation.py.
+    Like TopTalkersBucket, every worker upserts its own row for a bucket, and
+    readers sum the rows of all workers.
+    """
+
+    source = models.ForeignKey(
+        Source, on_delete=models.PROTECT, related_name="event_aggregates"
+    )
+    event_type = models.CharField(max_length=20, choices=Event.EventTypes.choices)
+    severity = models.CharField(max_length=20, choices=Event.Severity.choices)
+    bucket = models.DateTimeField(db_index=True)
+    worker = models.CharField(max_length=64)
+    count = models.PositiveIntegerField(default=0)
+    first_seen = models.DateTimeField()
+    last_seen = models.DateTimeField()
+    # Up to EVENT_AGGREGATE_SAMPLES distinct descriptions seen in the bucket
+    samples = models.JSONField(default=list, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["source", "event_type", "severity", "bucket", "worker"],
+                name="uniq_event_aggregate_bucket",
+            )
+        ]
+        indexes = [models.Index(fields=["severity", "bucket"])]
+        ordering = ["-bucket"]
+
+    def __str__(self) -> str:
+        return f"{self.event_type}/{self.severity} x{self.count} @{self.bucket:%H:%M}"
@@ -0,0 +1,303 @@
+import json
+import logging
+import random
+import threading
+import time
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db import connection, transaction
+from django.db.models import Avg, Count, F, Max, Min
+from django.utils import timezone
+
+from .models import Alert, NotificationOutbox
+
+logger = logging.getLogger("monitoring")
+
+
+def configured_destinations() -> list:
+    """
+    Destinations are "webhook:<url>" / "email:<address>" strings built from
+    NOTIFY_WEBHOOK_URLS and NOTIFY_EMAILS.
+    """
+    return [f"webhook:{u}" for u in getattr(settings, "NOTIFY_WEBHOOK_URLS", [])] + [
+        f"email:{e}" for e in getattr(settings, "NOTIFY_EMAILS", [])
+    ]
+
+
+def enqueue_alert_notifications(alert: Alert) -> int:
+    """
+    Write one outbox row per destination. Called from the alert post_save
+    signal, i.e. inside the transaction that created the alert.
+    """
+    return enqueue_notifications([alert])
+
+
+def enqueue_notifications(alerts) -> int:
+    """
+    Same, for many alerts in one INSERT; callers of Alert.objects.bulk_create
+    (which skips post_save) use this in their transaction.
+    """
+    destinations = configured_destinations()
+    rows = [
+        NotificationOutbox(alert=alert, destination=d)
+        for alert in alerts
+        for d in destinations
+    ]
+    NotificationOutbox.objects.bulk_create(rows)
+    return len(rows)
+
+
+def send_webhook(url: str, payload: dict, timeout: float = 5.0) -> None:
+    req = urllib.request.Request(
+        url,
+        data=json.dumps(payload, default=str).encode(),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    with urllib.request.urlopen(req, timeout=timeout) as res:
+        if res.status >= 300:
+            raise RuntimeError(f"webhook returned HTTP {res.status}")
+
+
+def send_email(address: str, payload: dict) -> None:
+    lines = [
+        f"[{a['severity']}] {a['source_name']} {a['event_type']}: {a['description']}"
+        for a in payload["alerts"]
+    ]
+    send_mail(
+        subject=f"{payload['count']} new threat alert(s)",
+        message="\n".join(lines),
+        from_email=None,
+        recipient_list=[address],
+    )
+
+
+def deliver(destination: str, payload: dict) -> None:
+    kind, _, target = destination.partition(":")
+    if kind == "webhook":
+        send_webhook(target, payload)
+    elif kind == "email":
+        send_email(target, payload)
+    else:
+        raise ValueError(f"Unknown destination type: {kind}")
+
+
+class TokenBucket:
+    """Per-destination rate limiter (refills `rate_per_minute` tokens/min)."""
+
+    def __init__(self, rate_per_minute: float, burst: int = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = burst or max(1, int(rate_per_minute))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+    def wait_seconds(self) -> float:
+        """Time until take() can next succeed (0 when a token is available)."""
+        with self._lock:
+            tokens = self.tokens + (time.monotonic() - self.updated) * self.rate
+            return max(0.0, (1 - tokens) / self.rate) if self.rate else 3600.0
+
+
+def alert_payload(alert: Alert) -> dict:
+    return {
+        "id": alert.id,
+        "status": alert.status,
+        "severity": alert.event.severity,
+        "event_type": alert.event.event_type,
+        "source_name": alert.event.source_name,
+        "description": alert.event.description,
+        "created_at": alert.created_at.isoformat(),
+    }
+
+
+class Dispatcher:
+    """
+    Drains the outbox: claims due rows, groups them into one digest per
+    destination, delivers digests on a bounded thread pool and records
+    the outcome with exponential backoff for failures.
+    """
+
+    def __init__(
+        self,
+        workers: int = None,
+        batch_size: int = None,
+        digest_size: int = None,
+        max_attempts: int = None,
+        rate_per_minute: float = None,
+        backoff_base: float = None,
+        lease_seconds: int = 60,
+        deliver_fn=deliver,
+    ):
+        self.workers = workers or settings.NOTIFIER_WORKERS
+        self.batch_size = batch_size or settings.NOTIFIER_BATCH_SIZE
+        self.digest_size = digest_size or settings.NOTIFIER_DIGEST_SIZE
+        self.max_attempts = max_attempts or settings.NOTIFIER_MAX_ATTEMPTS
+        self.rate_per_minute = rate_per_minute or settings.NOTIFIER_RATE_PER_MINUTE
+        self.backoff_base = backoff_base or settings.NOTIFIER_BACKOFF_BASE
+        self.lease_seconds = lease_seconds
+        self.deliver_fn = deliver_fn
+        self.buckets = defaultdict(lambda: TokenBucket(self.rate_per_minute))
+        self.pool = ThreadPoolExecutor(max_workers=self.workers)
+
+    def close(self):
+        self.pool.shutdown(wait=True)
+
+    def backoff(self, attempts: int) -> timedelta:
+        # base * 2^(n-1), capped at 1h, with +/-20% jitter
+        delay = min(self.backoff_base * 2 ** (attempts - 1), 3600)
+        return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+    def claim(self) -> list:
+        """
+        Lease a batch of due rows by pushing next_attempt_at forward, in one
+        short transaction. SKIP LOCKED lets several notifiers run side by side.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            qs = NotificationOutbox.objects.filter(
+                status=NotificationOutbox.Status.PENDING, next_attempt_at__lte=now
+            ).order_by("next_attempt_at")
+            if connection.features.has_select_for_update_skip_locked:
+                qs = qs.select_for_update(skip_locked=True)
+            ids = list(qs.values_list("id", flat=True)[: self.batch_size])
+            if ids:
+                NotificationOutbox.objects.filter(id__in=ids).update(
+                    next_attempt_at=now + timedelta(seconds=self.lease_seconds)
+                )
+
+        return list(
+            NotificationOutbox.objects.filter(id__in=ids)
+            .select_related("alert__event__source", "alert__event__description_ref")
+            .order_by("id")
+        )
+
+    def digests(self, rows: list):
+        by_dest = defaultdict(list)
+        for row in rows:
+            by_dest[row.destination].append(row)
+        for dest, dest_rows in by_dest.items():
+            for i in range(0, len(dest_rows), self.digest_size):
+                yield dest, dest_rows[i : i + self.digest_size]
+
+    def _send(self, destination: str, rows: list):
+        payload = {
+            "type": "alert_digest",
+            "count": len(rows),
+            "alerts": [alert_payload(r.alert) for r in rows],
+        }
+        try:
+            self.deliver_fn(destination, payload)
+            return None
+        except Exception as exc:  # network errors, HTTP errors, SMTP errors
+            return str(exc) or exc.__class__.__name__
+
+    def run_once(self) -> dict:
+        rows = self.claim()
+        stats = {
+            "claimed": len(rows),
+            "sent": 0,
+            "retried": 0,
+            "failed": 0,
+            "deferred": 0,
+        }
+        if not rows:
+            return stats
+
+        futures, deferred = [], []
+        for dest, chunk in self.digests(rows):
+            if self.buckets[dest].take():
+                futures.append((chunk, self.pool.submit(self._send, dest, chunk)))
+            else:
+                deferred.extend(chunk)
+
+        now = timezone.now()
+        sent_ids, failed_rows = [], []
+        for chunk, future in futures:
+            error = future.result()
+            if error is None:
+                sent_ids.extend(r.id for r in chunk)
+                continue
+            failed_rows.extend(chunk)
+            for row in chunk:
+                row.attempts += 1
+                row.last_error = error[:1000]
+                if row.attempts >= self.max_attempts:
+                    row.status = NotificationOutbox.Status.FAILED
+                    stats["failed"] += 1
+                else:
+                    row.next_attempt_at = now + self.backoff(row.attempts)
+                    stats["retried"] += 1
+
+        with transaction.atomic():
+            if sent_ids:
+                NotificationOutbox.objects.filter(id__in=sent_ids).update(
+                    status=NotificationOutbox.Status.SENT, sent_at=now
+                )
+            if failed_rows:
+                NotificationOutbox.objects.bulk_update(
+                    failed_rows,
+                    ["attempts", "last_error", "status", "next_attempt_at"],
+                )
+            # Rate limited: due again once the destination's bucket has a
+            # token, so a throttled destination is not claimed every cycle
+            by_dest = defaultdict(list)
+            for row in deferred:
+                by_dest[row.destination].append(row.id)
+            for dest, ids in by_dest.items():
+                wait = timedelta(seconds=self.buckets[dest].wait_seconds())
+                NotificationOutbox.objects.filter(id__in=ids).update(
+                    next_attempt_at=now + wait
+                )
+
+        stats["sent"] = len(sent_ids)
+        stats["deferred"] = len(deferred)
+        return stats
+
+
+def notifier_stats(window: int = 1000) -> dict:
+    """Backlog + delivery latency (created -> sent) over the last `window` sends."""
+    now = timezone.now()
+    backlog = NotificationOutbox.objects.filter(
+        status=NotificationOutbox.Status.PENDING
+    ).aggregate(count=Count("id"), oldest=Min("created_at"))
+
+    recent_ids = NotificationOutbox.objects.filter(
+        status=NotificationOutbox.Status.SENT
+    ).order_by("-sent_at")[:window]
+    latency = NotificationOutbox.objects.filter(id__in=recent_ids).aggregate(
+        avg=Avg(F("sent_at") - F("created_at")),
+        max=Max(F("sent_at") - F("created_at")),
+    )
+
+    def seconds(value):
+        return round(value.total_seconds(), 3) if value is not None else None
+
+    return {
+        "pending": backlog["count"],
+        "oldest_pending_age": seconds(
+            now - backlog["oldest"] if backlog["oldest"] else None
+        ),
+        "failed": NotificationOutbox.objects.filter(
+            status=NotificationOutbox.Status.FAILED
+        ).count(),
+        "latency_avg": seconds(latency["avg"]),
+        "latency_max": seconds(latency["max"]),
+    }
@@ -25,3 +25,15 @@ class AlertPermissions(BasePermission):
         if request.method in SAFE_METHODS:
             return request.user.is_authenticated
         return request.user.is_authenticated and request.user.is_admin_role
+
+
+class SourcePermissions(BasePermission):
+    """
+    - Any authenticated user can browse sources and their events
+    - Admin only can edit source metadata (site/owner/criticality)
+    """
+
+    def has_permission(self, request, view):
+        if request.method in SAFE_METHODS:
+            return request.user.is_authenticated
+        return request.user.is_authenticated and request.user.is_admin_role
@@ -0,0 +1,212 @@
+import cProfile
+import json
+import logging
+import pstats
+import re
+import time
+import uuid
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from .dashboard_api import IsAdminRole
+
+logger = logging.getLogger("monitoring")
+
+PROFILE_HEADER = "HTTP_X_PROFILE"
+PROFILE_PARAM = "profile"
+PROFILE_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+def profile_requested(request) -> bool:
+    # Plain dict/str lookups: the only cost on unprofiled requests
+    return request.META.get(PROFILE_HEADER) == "1" or (
+        f"{PROFILE_PARAM}=" in request.META.get("QUERY_STRING", "")
+        and request.GET.get(PROFILE_PARAM) == "1"
+    )
+
+
+def is_admin(request) -> bool:
+    """
+    API clients send a JWT, which Django's middleware does not see, so run
+    the DRF authenticators here and apply the same IsAdminRole check.
+    """
+    if IsAdminRole().has_permission(request, None):
+        return True  # session login (Django admin)
+    drf_request = Request(
+        request,
+        authenticators=[a() for a in api_settings.DEFAULT_AUTHENTICATION_CLASSES],
+    )
+    try:
+        return IsAdminRole().has_permission(drf_request, None)
+    except APIException:
+        return False
+
+
+class QueryLog:
+    """connection.execute_wrapper that records every statement with its time."""
+
+    def __init__(self, alias):
+        self.alias = alias
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append(
+                {
+                    "alias": self.alias,
+                    "sql": sql,
+                    "params": params if many else list(params or ()),
+                    "many": many,
+                    "ms": round((time.perf_counter() - start) * 1000, 3),
+                }
+            )
+
+
+def explain(query) -> str:
+    if query["many"] or not query["sql"].lstrip().upper().startswith("SELECT"):
+        return ""
+    conn = connections[query["alias"]]
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                f"{conn.ops.explain_query_prefix()} {query['sql']}", query["params"]
+            )
+            return "\n".join(" ".join(str(c) for c in row) for row in cursor.fetchall())
+    except Exception as exc:
+        return f"EXPLAIN failed: {exc}"
+
+
+def top_functions(profiler, limit=50) -> list:
+    stats = pstats.Stats(profiler).stats
+    rows = sorted(stats.items(), key=lambda kv: kv[1][3], reverse=True)[:limit]
+    return [
+        {
+            "function": f"{filename}:{line}({name})",
+            "calls": ncalls,
+            "tottime_ms": round(tottime * 1000, 3),
+            "cumtime_ms": round(cumtime * 1000, 3),
+        }
+        for (filename, line, name), (_, ncalls, tottime, cumtime, _) in rows
+    ]
+
+
+def store_profile(data: dict) -> None:
+    directory = Path(settings.PROFILE_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / f"{data['id']}.json").write_text(json.dumps(data, default=str))
+
+    # Bounded: keep only the newest PROFILE_MAX_FILES
+    files = sorted(directory.glob("*.json"), key=lambda p: p.stat().st_mtime)
+    for old in files[: max(len(files) - settings.PROFILE_MAX_FILES, 0)]:
+        old.unlink(missing_ok=True)
+
+
+def list_profiles() -> list:
+    summary_keys = (
+        "id",
+        "method",
+        "path",
+        "status",
+        "user",
+        "started_at",
+        "duration_ms",
+        "sql_count",
+        "sql_ms",
+    )
+    directory = Path(settings.PROFILE_DIR)
+    if not directory.exists():
+        return []
+    files = sorted(
+        directory.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True
+    )
+    results = []
+    for path in files:
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        results.append({k: data.get(k) for k in summary_keys})
+    return results
+
+
+def load_profile(profile_id: str):
+    if not PROFILE_ID.match(profile_id):
+        return None
+    path = Path(settings.PROFILE_DIR) / f"{profile_id}.json"
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+class ProfilingMiddleware:
+    """
+    Admin-only, per-request profiling: send `X-Profile: 1` (or `?profile=1`).
+    Captures a cProfile of the whole view (ORM, serializers, permissions),
+    every SQL statement with its time, and EXPLAIN plans for the slowest
+    PROFILE_EXPLAIN_TOP SELECTs. The id comes back in `X-Profile-Id`.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not profile_requested(request) or not is_admin(request):
+            return self.get_response(request)
+        return self.profile(request)
+
+    def profile(self, request):
+        logs = [QueryLog(alias) for alias in connections]
+        profiler = cProfile.Profile()
+        started_at = timezone.now()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for log in logs:
+                stack.enter_context(connections[log.alias].execute_wrapper(log))
+            try:
+                profiler.enable()
+            except ValueError:
+                # Another profiler is active in this thread; keep the SQL part
+                profiler = None
+            try:
+                response = self.get_response(request)
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+        duration_ms = round((time.perf_counter() - start) * 1000, 3)
+
+        queries = [q for log in logs for q in log.queries]
+        slowest = sorted(queries, key=lambda q: q["ms"], reverse=True)[
+            : settings.PROFILE_EXPLAIN_TOP
+        ]
+        data = {
+            "id": uuid.uuid4().hex,
+            "method": request.method,
+            "path": request.get_full_path(),
+            "status": response.status_code,
+            "user": str(getattr(request, "user", "")),
+            "started_at": started_at.isoformat(),
+            "duration_ms": duration_ms,
+            "sql_count": len(queries),
+            "sql_ms": round(sum(q["ms"] for q in queries), 3),
+            "sql": queries,
+            "slowest": [{**q, "plan": explain(q)} for q in slowest],
+            "functions": top_functions(profiler) if profiler is not None else [],
+        }
+        try:
+            store_profile(data)
+        except OSError:
+            logger.exception("Could not store request profile")
+            return response
+        response["X-Profile-Id"] = data["id"]
+        return response
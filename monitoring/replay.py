@@ -0,0 +1,40 @@
+import django
+
+from .rules import should_alert
+
+
+def init_worker():
+    # Spawned workers need the app registry; forked ones already have it.
+    # The parent closes its DB connections before the pool starts, so each
+    # worker lazily opens its own.
+    django.setup()
+
+
+def evaluate_chunk(args):
+    """
+    Evaluate the alert rule for one primary-key chunk of the window.
+
+    Returns (events_scanned, event_ids_needing_alert, stale_alert_count)
+    where stale alerts exist for events the current rule would not alert on.
+    """
+    from .models import Alert, Event
+
+    lo, hi, start, end = args
+    rows = Event.objects.filter(
+        id__gte=lo, id__lt=hi, timestamp__gte=start, timestamp__lt=end
+    ).values_list("id", "severity", "event_type")
+    alerted = set(
+        Alert.objects.filter(event_id__gte=lo, event_id__lt=hi).values_list(
+            "event_id", flat=True
+        )
+    )
+
+    scanned, missing, stale = 0, [], 0
+    for event_id, severity, event_type in rows.iterator(chunk_size=5000):
+        scanned += 1
+        wanted = should_alert(severity, event_type)
+        if wanted and event_id not in alerted:
+            missing.append(event_id)
+        elif not wanted and event_id in alerted:
+            stale += 1
+    return scanned, missing, stale
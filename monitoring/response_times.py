@@ -0,0 +1,91 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import AlertResponseRollup
+from .sketches import LogHistogram
+
+MTTA = AlertResponseRollup.Metrics.MTTA
+MTTR = AlertResponseRollup.Metrics.MTTR
+
+
+def samples_for(created_at, severity, acknowledged_at=None, resolved_at=None):
+    """(day, severity, metric, seconds) tuples for newly set timestamps."""
+    samples = []
+    if acknowledged_at:
+        seconds = (acknowledged_at - created_at).total_seconds()
+        samples.append((acknowledged_at.date(), severity, MTTA, seconds))
+    if resolved_at:
+        seconds = (resolved_at - created_at).total_seconds()
+        samples.append((resolved_at.date(), severity, MTTR, seconds))
+    return samples
+
+
+def record_samples(samples) -> None:
+    """
+    Fold samples into their daily rollup rows: one locked read-modify-write
+    per (day, severity, metric) touched, whatever the number of samples.
+    """
+    grouped = defaultdict(list)
+    for day, severity, metric, seconds in samples:
+        grouped[(day, severity, metric)].append(max(seconds, 0.0))
+
+    with transaction.atomic():
+        for (day, severity, metric), values in sorted(grouped.items()):
+            AlertResponseRollup.objects.get_or_create(
+                day=day, severity=severity, metric=metric
+            )
+            row = AlertResponseRollup.objects.select_for_update().get(
+                day=day, severity=severity, metric=metric
+            )
+            sketch = (
+                LogHistogram.from_dict(row.sketch) if row.sketch else LogHistogram()
+            )
+            for value in values:
+                sketch.add(value)
+            row.count += len(values)
+            row.total_seconds += sum(values)
+            row.sketch = sketch.to_dict()
+            row.save(update_fields=["count", "total_seconds", "sketch"])
+
+
+def summarize(days: int = 7, severity: str = None) -> dict:
+    """
+    Per-day rows plus a merged summary for the range. Reads at most
+    days x severities x 2 rollup rows, independent of alert volume.
+    """
+    since = timezone.now().date() - timedelta(days=days - 1)
+    rows = AlertResponseRollup.objects.filter(day__gte=since)
+    if severity:
+        rows = rows.filter(severity=severity)
+
+    def describe(sketch, count):
+        return {
+            "count": count,
+            "mean_seconds": sketch.mean(),
+            "p50_seconds": sketch.quantile(0.5),
+            "p90_seconds": sketch.quantile(0.9),
+            "p99_seconds": sketch.quantile(0.99),
+        }
+
+    daily, merged = [], {}
+    for row in rows.order_by("day", "metric", "severity"):
+        sketch = LogHistogram.from_dict(row.sketch)
+        daily.append(
+            {
+                "day": row.day,
+                "severity": row.severity,
+                "metric": row.metric,
+                **describe(sketch, row.count),
+            }
+        )
+        merged.setdefault(row.metric, LogHistogram()).merge(sketch)
+
+    return {
+        "days": days,
+        "severity": severity,
+        "summary": {m: describe(s, s.count) for m, s in merged.items()},
+        "daily": daily,
+    }
@@ -0,0 +1,14 @@
+from django.conf import settings
+
+
+def alert_severities() -> frozenset:
+    return frozenset(getattr(settings, "ALERT_SEVERITIES", ("HIGH", "CRITICAL")))
+
+
+def should_alert(severity: str, event_type: str = None) -> bool:
+    """
+    The alerting rule, shared by live ingestion (signals.py) and
+    `manage.py replay_events`, so changing it here and replaying history
+    gives the same result as if the rule had always been in place.
+    """
+    return severity in alert_severities()
@@ -1,11 +1,59 @@
 import logging
 from rest_framework import serializers
-from .models import Event, Alert
+from .models import Source, SourceHeartbeat, Event, Alert, AlertChange
+from .transitions import transition_alert
+from .attributes import MAX_KEYS
 
 logger = logging.getLogger("monitoring")
 
 
+class SourceSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Source
+        fields = [
+            "id",
+            "name",
+            "source_type",
+            "site",
+            "owner",
+            "criticality",
+            "created_at",
+        ]
+        read_only_fields = ["id", "created_at"]
+
+
+class SourceHealthSerializer(serializers.ModelSerializer):
+    source_id = serializers.IntegerField(read_only=True)
+    source_name = serializers.CharField(source="source.name", read_only=True)
+    silent_for = serializers.SerializerMethodField()
+    event_rate = serializers.SerializerMethodField()
+
+    class Meta:
+        model = SourceHeartbeat
+        fields = [
+            "source_id",
+            "source_name",
+            "last_seen",
+            "last_severity",
+            "event_count",
+            "event_rate",
+            "silent_for",
+        ]
+        read_only_fields = fields
+
+    def get_silent_for(self, obj) -> int:
+        return int((self.context["now"] - obj.last_seen).total_seconds())
+
+    def get_event_rate(self, obj) -> float:
+        return round(obj.rate_at(self.context["now"]), 2)
+
+
 class EventIngestSerializer(serializers.ModelSerializer):
+    # Resolved to a Source row by Event.source_name (cached, created on first sight)
+    source_name = serializers.CharField(max_length=120)
+    # Stored once per distinct text by Event.description (hash -> id cache)
+    description = serializers.CharField()
+
     class Meta:
         model = Event
         fields = [
@@ -14,56 +62,153 @@ class EventIngestSerializer(serializers.ModelSerializer):
             "event_type",
             "severity",
             "description",
+            "attributes",
             "timestamp",
         ]
         read_only_fields = ["id", "timestamp"]
 
+    def validate_attributes(self, value):
+        # Flat object of scalars (or lists of scalars), e.g. {"src_ip": "10.0.0.5"}
+        if not isinstance(value, dict):
+            raise serializers.ValidationError("Must be a JSON object.")
+        if len(value) > MAX_KEYS:
+            raise serializers.ValidationError(f"At most {MAX_KEYS} keys.")
+        scalar = (str, int, float, bool, type(None))
+        for key, item in value.items():
+            items = item if isinstance(item, list) else [item]
+            if len(key) > 32 or not all(isinstance(i, scalar) for i in items):
+                raise serializers.ValidationError(
+                    f"{key!r}: keys up to 32 chars, values scalars or lists of scalars."
+                )
+        return value
+
     def create(self, validated_data):
         validated_data["created_by"] = self.context["request"].user
         return super().create(validated_data)
 
 
 class EventSerializer(serializers.ModelSerializer):
+    source_name = serializers.CharField(read_only=True)
+    description = serializers.CharField(read_only=True)
+
     class Meta:
         model = Event
         fields = [
             "id",
+            "source",
             "source_name",
             "event_type",
             "severity",
             "description",
+            "attributes",
             "timestamp",
             "created_by",
         ]
         read_only_fields = fields
 
 
+class EventAggregateSerializer(serializers.Serializer):
+    """One merged bucket of aggregated events (see aggregation.merged_aggregates)."""
+
+    source = serializers.IntegerField()
+    source_name = serializers.CharField(source="source__name")
+    event_type = serializers.CharField()
+    severity = serializers.CharField()
+    bucket = serializers.DateTimeField()
+    count = serializers.IntegerField(source="total")
+    first_seen = serializers.DateTimeField(source="first")
+    last_seen = serializers.DateTimeField(source="last")
+    samples = serializers.ListField(child=serializers.CharField())
+
+
 class AlertSerializer(serializers.ModelSerializer):
     event = EventSerializer(read_only=True)
     severity = serializers.CharField(source="event.severity", read_only=True)
 
     class Meta:
         model = Alert
-        fields = ["id", "event", "severity", "status", "created_at"]
+        fields = [
+            "id",
+            "event",
+            "severity",
+            "status",
+            "created_at",
+            "acknowledged_at",
+            "acknowledged_by",
+            "resolved_at",
+            "resolved_by",
+            "version",
+            "assigned_to",
+            "lease_expires_at",
+        ]
         read_only_fields = fields
 
 
-class AlertStatusUpdateSerializer(serializers.ModelSerializer):
+class AlertChangeSerializer(serializers.ModelSerializer):
+    """
+    One entry of the change feed: the alert's state after the change plus
+    the event fields needed to list it. Clients upsert by `alert` and drop
+    it on DELETED; entries of deleted alerts carry no event fields.
+    """
+
+    event = serializers.IntegerField(
+        source="alert.event_id", read_only=True, default=None
+    )
+    severity = serializers.CharField(
+        source="alert.event.severity", read_only=True, default=None
+    )
+    source_name = serializers.CharField(
+        source="alert.event.source_name", read_only=True, default=None
+    )
+    event_type = serializers.CharField(
+        source="alert.event.event_type", read_only=True, default=None
+    )
+
     class Meta:
-        model = Alert
-        fields = ["status"]
-
-    def update(self, instance, validated_data):
-        old = instance.status
-        instance = super().update(instance, validated_data)
-        user = self.context["request"].user
-        logger.info(
-            "Alert status updated",
-            extra={
-                "alert_id": instance.id,
-                "from": old,
-                "to": instance.status,
-                "by": user.username,
-            },
+        model = AlertChange
+        fields = [
+            "seq",
+            "alert",
+            "kind",
+            "status",
+            "version",
+            "assigned_to",
+            "lease_expires_at",
+            "changed_at",
+            "event",
+            "severity",
+            "source_name",
+            "event_type",
+        ]
+        read_only_fields = fields
+
+
+class AlertStatusUpdateSerializer(serializers.Serializer):
+    """
+    Body of a status change. `expected_status` / `version` make it a
+    compare-and-set: if the alert moved on meanwhile the update is a 409.
+    """
+
+    status = serializers.ChoiceField(choices=Alert.Status.choices)
+    expected_status = serializers.ChoiceField(
+        choices=Alert.Status.choices, required=False
+    )
+    version = serializers.IntegerField(min_value=0, required=False)
+
+    def to_internal_value(self, data):
+        # Dashboard sends lower/mixed case; choices are upper case
+        data = data.copy() if hasattr(data, "copy") else dict(data)
+        for key in ("status", "expected_status"):
+            if isinstance(data.get(key), str):
+                data[key] = data[key].strip().upper()
+        return super().to_internal_value(data)
+
+    def apply(self, alert_id: int):
+        # Timestamps, actor, audit row and MTTA/MTTR rollups live in transitions.py
+        return transition_alert(
+            alert_id,
+            self.validated_data["status"],
+            user=self.context["request"].user,
+            expected_status=self.validated_data.get("expected_status"),
+            expected_version=self.validated_data.get("version"),
         )
-        return instance
@@ -1,9 +1,17 @@
 import logging
 from django.db import transaction
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
+from django.utils import timezone
 
-from .models import Event, Alert
+from .models import Source, Event, Alert, AlertChange
+from .sources import bump_generation, registry
+from .heartbeat import heartbeats
+from .top_talkers import top_talkers
+from .notifications import enqueue_alert_notifications
+from .rules import should_alert
+from .attributes import index_attributes
+from .changes import SNAPSHOT_FIELDS, log_alert_changes
 
 logger = logging.getLogger("monitoring")
 
@@ -13,11 +21,13 @@ def create_alert_on_severe_event(sender, instance: Event, created: bool, **kwarg
     if not created:
         return
 
-    if instance.severity not in (Event.Severity.HIGH, Event.Severity.CRITICAL):
+    if not should_alert(instance.severity, instance.event_type):
         return
 
     def _create():
-        alert, made = Alert.objects.get_or_create(event=instance)
+        # Alert + its notification outbox rows commit together
+        with transaction.atomic():
+            alert, made = Alert.objects.get_or_create(event=instance)
         if made:
             logger.warning(
                 "Alert generated",
@@ -25,3 +35,92 @@ def create_alert_on_severe_event(sender, instance: Event, created: bool, **kwarg
             )
 
     transaction.on_commit(_create)
+
+
+@receiver(post_save, sender=Event)
+def index_event_attributes(sender, instance: Event, created: bool, **kwargs):
+    # Same transaction as the event, so lookups never miss a committed event
+    if not created:
+        instance.indexed_attributes.all().delete()
+    index_attributes([instance])
+
+
+@receiver(post_save, sender=Event)
+def touch_alert_on_event_update(
+    sender, instance: Event, created: bool, using, **kwargs
+):
+    # Alert listings embed event fields; bump the alert's change marker and
+    # tell feed clients to refresh them
+    if not created:
+        with transaction.atomic(using=using):
+            alerts = Alert.objects.using(using).filter(event=instance)
+            if alerts.update(
+                updated_at=timezone.now(),
+                severity_rank=Alert.rank_for(instance.severity),
+            ):
+                log_alert_changes(
+                    alerts.only(*SNAPSHOT_FIELDS),
+                    AlertChange.Kind.EVENT,
+                    using=using,
+                )
+
+
+@receiver(post_save, sender=Alert)
+def enqueue_notifications_on_alert(sender, instance: Alert, created: bool, **kwargs):
+    # Runs inside whatever transaction created the alert; no network I/O here
+    if created:
+        enqueue_alert_notifications(instance)
+
+
+@receiver(post_save, sender=Alert)
+def log_alert_change(sender, instance: Alert, created: bool, using, **kwargs):
+    # Registered after the outbox receiver: the log append goes last, see
+    # changes._serialize_appends. Bulk paths log for themselves.
+    kind = AlertChange.Kind.CREATED if created else AlertChange.Kind.UPDATED
+    log_alert_changes([instance], kind, using=using)
+
+
+@receiver(post_delete, sender=Alert)
+def log_alert_deletion(sender, instance: Alert, using, **kwargs):
+    # Inside the deleting transaction (also for alerts cascaded from their
+    # event); the alert's older entries stay, see AlertChange.alert
+    log_alert_changes([instance], AlertChange.Kind.DELETED, using=using)
+
+
+@receiver(post_save, sender=Event)
+def record_source_heartbeat(sender, instance: Event, created: bool, **kwargs):
+    if not created or not instance.source_id:
+        return
+
+    # In-memory only; written by the periodic batched flush
+    transaction.on_commit(
+        lambda: heartbeats.record(
+            instance.source_id, instance.severity, instance.timestamp
+        )
+    )
+
+
+@receiver(post_save, sender=Event)
+def record_top_talkers(sender, instance: Event, created: bool, **kwargs):
+    if not created:
+        return
+
+    transaction.on_commit(
+        lambda: top_talkers.record(
+            instance.source_name, instance.event_type, instance.timestamp
+        )
+    )
+
+
+@receiver(post_save, sender=Source)
+@receiver(post_delete, sender=Source)
+def invalidate_source_cache(
+    sender, instance: Source, using, created: bool = False, **kwargs
+):
+    # Renames/deletes are rare admin actions: every process drops everything
+    # rather than tracking the old name. The generation moves with the
+    # change; this process re-reads it after commit, others within
+    # SOURCE_CACHE_SYNC_SECONDS.
+    if not created:
+        bump_generation(using=using)
+        transaction.on_commit(registry.invalidate, using=using)
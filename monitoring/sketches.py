@@ -0,0 +1,157 @@
+import math
+
+
+class SpaceSaving:
+    """
+    Space-Saving heavy-hitter summary with at most `k` counters.
+
+    Each tracked item carries (count, error): its true frequency lies in
+    [count - error, count]. Any item whose true frequency exceeds total / k
+    is guaranteed to be tracked. Summaries are mergeable, so per-minute and
+    per-process sketches can be combined into any window.
+    """
+
+    def __init__(self, k: int = 100):
+        self.k = k
+        self.total = 0
+        self.counts = {}
+        self.errors = {}
+
+    def __len__(self):
+        return len(self.counts)
+
+    def add(self, item, n: int = 1) -> None:
+        self.total += n
+        if item in self.counts:
+            self.counts[item] += n
+        elif len(self.counts) < self.k:
+            self.counts[item] = n
+            self.errors[item] = 0
+        else:
+            # Replace the smallest counter; the newcomer inherits its count as error
+            victim = min(self.counts, key=self.counts.get)
+            floor = self.counts.pop(victim)
+            del self.errors[victim]
+            self.counts[item] = floor + n
+            self.errors[item] = floor
+
+    def _floor(self) -> int:
+        # Upper bound for any item this summary is not tracking
+        return min(self.counts.values()) if len(self.counts) >= self.k else 0
+
+    def merge(self, other: "SpaceSaving") -> "SpaceSaving":
+        """Mergeable-summaries combine (Agarwal et al.), truncated back to k."""
+        k = max(self.k, other.k)
+        floor_a, floor_b = self._floor(), other._floor()
+        merged = {}
+        for item in self.counts.keys() | other.counts.keys():
+            merged[item] = (
+                self.counts.get(item, floor_a) + other.counts.get(item, floor_b),
+                self.errors.get(item, floor_a) + other.errors.get(item, floor_b),
+            )
+        keep = sorted(merged.items(), key=lambda kv: kv[1][0], reverse=True)[:k]
+
+        result = SpaceSaving(k)
+        result.total = self.total + other.total
+        result.counts = {item: ce[0] for item, ce in keep}
+        result.errors = {item: ce[1] for item, ce in keep}
+        return result
+
+    def top(self, n: int = 10) -> list:
+        items = sorted(self.counts.items(), key=lambda kv: kv[1], reverse=True)[:n]
+        return [
+            {
+                "item": item,
+                "count": count,
+                "error": self.errors[item],
+                "guaranteed": count - self.errors[item],
+            }
+            for item, count in items
+        ]
+
+    def to_dict(self) -> dict:
+        return {
+            "k": self.k,
+            "total": self.total,
+            "counts": {item: [c, self.errors[item]] for item, c in self.counts.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SpaceSaving":
+        sketch = cls(data["k"])
+        sketch.total = data["total"]
+        for item, (count, error) in data["counts"].items():
+            sketch.counts[item] = count
+            sketch.errors[item] = error
+        return sketch
+
+
+class LogHistogram:
+    """
+    Mergeable quantile sketch over positive values (DDSketch-style).
+
+    Values fall into logarithmic buckets of ratio gamma, so any quantile is
+    returned within `relative_accuracy` of the true value. Merging is a sum
+    of bucket counts, so daily sketches combine exactly into any date range.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.02):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets = {}
+        self.zero = 0
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        if value <= 0:
+            self.zero += 1
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def merge(self, other: "LogHistogram") -> "LogHistogram":
+        for index, n in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + n
+        self.zero += other.zero
+        self.count += other.count
+        self.total += other.total
+        return self
+
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def quantile(self, q: float):
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                # Bucket midpoint (in relative terms) -> within relative_accuracy
+                return 2 * self.gamma**index / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+    def to_dict(self) -> dict:
+        return {
+            "a": self.relative_accuracy,
+            "buckets": {str(i): n for i, n in self.buckets.items()},
+            "zero": self.zero,
+            "count": self.count,
+            "total": self.total,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LogHistogram":
+        sketch = cls(data.get("a", 0.02))
+        sketch.buckets = {int(i): n for i, n in data.get("buckets", {}).items()}
+        sketch.zero = data.get("zero", 0)
+        sketch.count = data.get("count", 0)
+        sketch.total = data.get("total", 0.0)
+        return sketch
@@ -0,0 +1,161 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import IntegrityError, router, transaction
+from django.db.models import F
+
+from .models import Generation, Source
+
+# Generation row bumped whenever a source is renamed / deleted
+GENERATION = "sources"
+
+
+def bump_generation(using: str = None) -> None:
+    """
+    Call inside the transaction that renames / deletes a source: the new
+    value becomes visible to other processes together with the change.
+    """
+    db = using or router.db_for_write(Generation)
+    rows = Generation.objects.using(db).filter(name=GENERATION)
+    if not rows.update(value=F("value") + 1):
+        # Row missing (seeded by migration 0018; gone after a table flush)
+        Generation.objects.using(db).bulk_create(
+            [Generation(name=GENERATION)], ignore_conflicts=True
+        )
+        rows.update(value=F("value") + 1)
+
+
+def read_generation() -> int:
+    return (
+        Generation.objects.filter(name=GENERATION)
+        .values_list("value", flat=True)
+        .first()
+        or 0
+    )
+
+
+class SourceRegistry:
+    """
+    In-process LRU cache: source name -> Source row.
+
+    Ingestion resolves `source_name` through this so that hot sources cost
+    no query per event. Unknown names are created on first sight.
+    Entries are only cached once the creating transaction has committed,
+    so a rolled-back insert can never leave a dangling id in the cache.
+
+    Renames and deletes bump the "sources" Generation row in their
+    transaction (`bump_generation`). Every process re-reads it at most
+    every `sync_seconds` (one primary-key query) and drops its entries when
+    it moved, so another worker maps an old name to a renamed row for at
+    most that long; the renaming process drops its own entries on commit.
+    Entries read before the change are never stored under the new value.
+    """
+
+    def __init__(self, maxsize: int = 1024, sync_seconds: float = 2.0):
+        self.maxsize = maxsize
+        self.sync_seconds = sync_seconds
+        self._cache: "OrderedDict[str, Source]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._token = None
+        self._synced_at = None
+
+    def _sync(self):
+        now = time.monotonic()
+        if self._synced_at is not None and now - self._synced_at < self.sync_seconds:
+            return self._token
+        token = read_generation()
+        with self._lock:
+            if token != self._token:
+                self._cache.clear()
+                self._token = token
+            self._synced_at = now
+        return token
+
+    def invalidate(self) -> None:
+        """Re-read the generation now; call once a rename has committed."""
+        self._synced_at = None
+        self._sync()
+
+    def get(self, name: str):
+        with self._lock:
+            source = self._cache.get(name)
+            if source is not None:
+                self._cache.move_to_end(name)
+            return source
+
+    def put(self, source: Source, token=None) -> None:
+        with self._lock:
+            if token is not None and token != self._token:
+                return  # read before a rename elsewhere; may be stale
+            self._cache[source.name] = source
+            self._cache.move_to_end(source.name)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+
+    def evict(self, name: str) -> None:
+        with self._lock:
+            self._cache.pop(name, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def resolve(self, name: str) -> Source:
+        name = (name or "").strip()
+        if not name:
+            raise ValueError("source name is required")
+
+        token = self._sync()
+        source = self.get(name)
+        if source is not None:
+            return source
+
+        try:
+            with transaction.atomic():
+                source, _ = Source.objects.get_or_create(name=name)
+        except IntegrityError:
+            # Another worker created it between our SELECT and INSERT.
+            source = Source.objects.get(name=name)
+
+        transaction.on_commit(lambda: self.put(source, token))
+        return source
+
+    def resolve_many(self, names) -> dict:
+        """
+        Resolve a batch of names with at most two queries for the misses
+        (one SELECT, one bulk INSERT). Used by bulk/backfill paths.
+        """
+        token = self._sync()
+        resolved = {}
+        missing = set()
+        for name in {(n or "").strip() for n in names} - {""}:
+            source = self.get(name)
+            if source is None:
+                missing.add(name)
+            else:
+                resolved[name] = source
+
+        if missing:
+            found = {s.name: s for s in Source.objects.filter(name__in=missing)}
+            new = [Source(name=n) for n in missing if n not in found]
+            if new:
+                Source.objects.bulk_create(new, ignore_conflicts=True)
+                found.update(
+                    {
+                        s.name: s
+                        for s in Source.objects.filter(name__in=[s.name for s in new])
+                    }
+                )
+            resolved.update(found)
+            fresh = list(found.values())
+            transaction.on_commit(lambda: [self.put(s, token) for s in fresh])
+
+        return resolved
+
+
+registry = SourceRegistry(
+    maxsize=getattr(settings, "SOURCE_CACHE_SIZE", 1024),
+    sync_seconds=getattr(settings, "SOURCE_CACHE_SYNC_SECONDS", 2.0),
+)
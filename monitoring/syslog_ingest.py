@@ -0,0 +1,508 @@
+import asyncio
+import logging
+import re
+import socket
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import close_old_connections, connections, router, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .aggregation import aggregated, event_aggregates
+from .attributes import MAX_KEYS, index_attributes, indexed_keys, indexed_values
+from .changes import log_alert_changes
+from .descriptions import descriptions
+from .heartbeat import heartbeats
+from .models import Alert, AlertChange, Event, EventAttribute
+from .notifications import enqueue_notifications
+from .rules import should_alert
+from .sources import registry
+from .top_talkers import top_talkers
+
+logger = logging.getLogger("monitoring")
+
+# <PRI>1 TIMESTAMP HOSTNAME APP-NAME PROCID MSGID STRUCTURED-DATA [MSG]
+RFC5424 = re.compile(
+    r"<(?P<pri>\d{1,3})>1 (?P<ts>\S+) (?P<host>\S+) (?P<app>\S+) (?P<procid>\S+) "
+    r"(?P<msgid>\S+) (?P<sd>-|(?:\[(?:[^\]\\]|\\.)*\])+)(?: (?P<msg>.*))?$",
+    re.S,
+)
+# <PRI>Mmm dd hh:mm:ss HOSTNAME TAG[PID]: MSG
+RFC3164 = re.compile(
+    r"<(?P<pri>\d{1,3})>(?P<ts>[A-Z][a-z]{2} [ \d]\d \d\d:\d\d:\d\d) (?P<host>\S+) "
+    r"(?:(?P<app>[^\s:\[]+)(?:\[(?P<procid>[^\]]*)\])?: ?)?(?P<msg>.*)$",
+    re.S,
+)
+SD_ELEMENT = re.compile(
+    r"\[(?P<id>[^\s\]]+)(?P<params>(?: [^=\s]+=\"(?:[^\"\\]|\\.)*\")*)\]"
+)
+SD_PARAM = re.compile(r"([^=\s]+)=\"((?:[^\"\\]|\\.)*)\"")
+NIL = "-"
+
+
+class SyslogParseError(ValueError):
+    pass
+
+
+def parse_message(data: bytes) -> dict:
+    """
+    Parse one RFC 5424 or RFC 3164 message into its header fields,
+    the message text and the structured-data params (flattened).
+    """
+    text = data.decode("utf-8", "replace").lstrip("\ufeff").rstrip("\r\n\x00")
+    m = RFC5424.match(text) or RFC3164.match(text)
+    if m is None:
+        raise SyslogParseError("not an RFC 5424 / 3164 message")
+    pri = int(m["pri"])
+    if pri > 191:
+        raise SyslogParseError(f"invalid PRI {pri}")
+
+    params = {}
+    sd = m.groupdict().get("sd")
+    if sd and sd != NIL:
+        for element in SD_ELEMENT.finditer(sd):
+            for key, value in SD_PARAM.findall(element["params"]):
+                params[key[:32]] = re.sub(r"\\(.)", r"\1", value)
+    return {
+        "facility": pri >> 3,
+        "severity": pri & 7,
+        "host": m["host"] if m["host"] != NIL else "",
+        "app": m["app"] if m["app"] and m["app"] != NIL else "",
+        "message": (m["msg"] or "").lstrip("\ufeff").strip(),
+        "params": params,
+    }
+
+
+@lru_cache(maxsize=1)
+def _type_patterns():
+    return [
+        (event_type, re.compile(pattern, re.I))
+        for event_type, pattern in settings.SYSLOG_EVENT_TYPES.items()
+    ]
+
+
+def map_event(parsed: dict, peer: str) -> dict:
+    """
+    Default SYSLOG_EVENT_MAPPER: syslog severity 0..7 through
+    SYSLOG_SEVERITY_MAP, event type from the first SYSLOG_EVENT_TYPES regex
+    found in the message (else SYSLOG_DEFAULT_EVENT_TYPE), source from
+    SYSLOG_SOURCE_FIELD (host / app / peer). Structured-data params become
+    attributes.
+    """
+    event_type = settings.SYSLOG_DEFAULT_EVENT_TYPE
+    for candidate, pattern in _type_patterns():
+        if pattern.search(parsed["message"]):
+            event_type = candidate
+            break
+    field = settings.SYSLOG_SOURCE_FIELD
+    source = (
+        (parsed.get(field) if field != "peer" else "")
+        or parsed["host"]
+        or peer
+        or "syslog"
+    )
+    attributes = dict(list(parsed["params"].items())[: MAX_KEYS - 3])
+    attributes.update(host=parsed["host"] or peer, facility=parsed["facility"])
+    if parsed["app"]:
+        attributes["app"] = parsed["app"]
+    return {
+        "source_name": source[:120],
+        "event_type": event_type,
+        "severity": settings.SYSLOG_SEVERITY_MAP[parsed["severity"]],
+        "description": parsed["message"] or "(empty syslog message)",
+        "attributes": attributes,
+    }
+
+
+def _insert_returning_ids(conn, model, fields, rows) -> list:
+    """
+    Multi-row INSERT ... RETURNING id, the statement bulk_create issues,
+    minus building and preparing a model instance per row (the bulk of
+    bulk_create's time at syslog rates). `rows` are already DB-ready.
+    """
+    qn = conn.ops.quote_name
+    columns = ", ".join(qn(model._meta.get_field(f).column) for f in fields)
+    placeholders = "(" + ", ".join(["%s"] * len(fields)) + ")"
+    per_statement = (conn.features.max_query_params or 2000 * len(fields)) // len(
+        fields
+    )
+    ids = []
+    with conn.cursor() as cursor:
+        for i in range(0, len(rows), per_statement):
+            chunk = rows[i : i + per_statement]
+            cursor.execute(
+                f"INSERT INTO {qn(model._meta.db_table)} ({columns}) "
+                f"VALUES {', '.join([placeholders] * len(chunk))} "
+                f"RETURNING {qn(model._meta.pk.column)}",
+                [value for row in chunk for value in row],
+            )
+            ids += [row[0] for row in cursor.fetchall()]
+    return ids
+
+
+def _store_events(db, items, now) -> list:
+    """Insert the events and their attribute lookup rows; returns the ids."""
+    conn = connections[db]
+    if not conn.features.can_return_rows_from_bulk_insert:
+        events = Event.objects.using(db).bulk_create(
+            Event(
+                source_id=item["source_id"],
+                event_type=item["event_type"],
+                severity=item["severity"],
+                description_ref_id=item["description_id"],
+                attributes=item["attributes"],
+            )
+            for item in items
+        )
+        index_attributes(events)
+        return [event.id for event in events]
+
+    json_field = Event._meta.get_field("attributes")
+    stamp = conn.ops.adapt_datetimefield_value(now)
+    ids = _insert_returning_ids(
+        conn,
+        Event,
+        (
+            "source",
+            "legacy_source_name",
+            "event_type",
+            "severity",
+            "description_ref",
+            "legacy_description",
+            "attributes",
+            "timestamp",
+        ),
+        [
+            (
+                item["source_id"],
+                "",
+                item["event_type"],
+                item["severity"],
+                item["description_id"],
+                "",
+                json_field.get_db_prep_save(item["attributes"], conn),
+                stamp,
+            )
+            for item in items
+        ],
+    )
+    keys = indexed_keys()
+    lookups = [
+        (event_id, key, value, stamp)
+        for event_id, item in zip(ids, items)
+        for key, value in indexed_values(item["attributes"], keys)
+    ]
+    if lookups:
+        qn = conn.ops.quote_name
+        columns = ", ".join(
+            qn(EventAttribute._meta.get_field(f).column)
+            for f in ("event", "key", "value", "timestamp")
+        )
+        with conn.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {qn(EventAttribute._meta.db_table)} ({columns}) "
+                f"VALUES (%s, %s, %s, %s)",
+                lookups,
+            )
+    return ids
+
+
+def write_events(items: list) -> dict:
+    """
+    Store a batch of mapped events with what a single POST would write:
+    events, attribute lookup rows, and alerts (with notification outbox rows)
+    for alerting severities, in one transaction and a few statements.
+    Events in aggregated mode are counted in EventAggregate instead.
+    """
+    sources = registry.resolve_many(item["source_name"] for item in items)
+    now = timezone.now()
+    stored, folded = [], 0
+    for item in items:
+        source = sources[item["source_name"].strip()]
+        item["source_id"] = source.id
+        if aggregated(source.name, item["event_type"], item["severity"]):
+            event_aggregates.record(
+                source.id,
+                item["event_type"],
+                item["severity"],
+                item["description"],
+                seen_at=now,
+            )
+            folded += 1
+        else:
+            stored.append(item)
+
+    texts = descriptions.resolve_many(item["description"] for item in stored)
+    for item in stored:
+        item["description_id"] = texts[item["description"]]
+
+    db = router.db_for_write(Event)
+    with transaction.atomic(using=db):
+        ids = _store_events(db, stored, now) if stored else []
+        alerts = Alert.objects.using(db).bulk_create(
+            Alert(event_id=event_id, severity_rank=Alert.rank_for(item["severity"]))
+            for event_id, item in zip(ids, stored)
+            if should_alert(item["severity"], item["event_type"])
+        )
+        # bulk_create skips post_save: queue notifications and log them here
+        enqueue_notifications(alerts)
+        log_alert_changes(alerts, AlertChange.Kind.CREATED, using=db)
+
+    for item in items:
+        heartbeats.record(item["source_id"], item["severity"], now)
+        top_talkers.record(item["source_name"].strip(), item["event_type"], now)
+    if alerts:
+        logger.warning("Alerts generated", extra={"count": len(alerts)})
+    return {"written": len(ids), "aggregated": folded, "alerts": len(alerts)}
+
+
+def udp_kernel_drops(port: int):
+    """
+    Datagrams the kernel dropped on `port` because the socket buffer was
+    full (the listener never sees those), from /proc/net/udp{,6}; None
+    where that is not available.
+    """
+    total, found = 0, False
+    for path in ("/proc/net/udp", "/proc/net/udp6"):
+        try:
+            with open(path) as f:
+                lines = f.read().splitlines()[1:]
+        except OSError:
+            continue
+        for line in lines:
+            fields = line.split()
+            if int(fields[1].rsplit(":", 1)[1], 16) == port:
+                total += int(fields[-1])
+                found = True
+    return total if found else None
+
+
+class _UDPProtocol(asyncio.DatagramProtocol):
+    def __init__(self, listener):
+        self.listener = listener
+
+    def datagram_received(self, data, addr):
+        self.listener.handle(data, addr[0])
+
+
+class _TCPProtocol(asyncio.Protocol):
+    """
+    RFC 6587 framing on one connection: octet counting ("<len> <msg>")
+    or newline-delimited, detected per frame. Reading is paused instead of
+    dropping while the listener's queue is full.
+    """
+
+    def __init__(self, listener):
+        self.listener = listener
+        self.buffer = b""
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.peer = (transport.get_extra_info("peername") or ("",))[0]
+
+    def connection_lost(self, exc):
+        self.listener.paused.discard(self.transport)
+
+    def data_received(self, data):
+        buffer, pos = self.buffer + data, 0
+        while pos < len(buffer):
+            if buffer[pos : pos + 1].isdigit():
+                space = buffer.find(b" ", pos, pos + 12)
+                if space == -1:
+                    if len(buffer) - pos >= 12:
+                        return self.abort()
+                    break
+                if not buffer[pos:space].isdigit():
+                    return self.abort()
+                end = space + 1 + int(buffer[pos:space])
+                if end > len(buffer):
+                    break
+                frame, pos = buffer[space + 1 : end], end
+            else:
+                newline = buffer.find(b"\n", pos)
+                if newline == -1:
+                    break
+                frame, pos = buffer[pos:newline], newline + 1
+            if frame.strip():
+                self.listener.handle(frame, self.peer, droppable=False)
+        self.buffer = buffer[pos:]
+        if len(self.buffer) > self.listener.max_frame:
+            return self.abort()
+        if self.listener.full():
+            self.transport.pause_reading()
+            self.listener.paused.add(self.transport)
+
+    def abort(self):
+        self.listener.counters["parse_errors"] += 1
+        self.transport.close()
+
+
+class SyslogListener:
+    """
+    asyncio syslog receiver (UDP + TCP) feeding `write_events` in batches.
+
+    Messages are parsed and mapped on the event loop and queued. One writer
+    hands batches of up to `batch_size` (or whatever arrived within
+    `flush_interval`) to a single DB thread, so receiving never waits on the
+    database. When `queue_size` messages are waiting, UDP messages are
+    dropped and counted; TCP connections are paused instead.
+    """
+
+    max_frame = 64 * 1024
+
+    def __init__(
+        self,
+        mapper=None,
+        write=None,
+        batch_size=2000,
+        flush_interval=0.5,
+        queue_size=100000,
+    ):
+        self.mapper = mapper or import_string(settings.SYSLOG_EVENT_MAPPER)
+        self.write = write or write_events
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue_size = queue_size
+        self.pending = deque()
+        self.paused = set()
+        self.addresses = {}
+        self.counters = dict.fromkeys(
+            (
+                "received",
+                "parse_errors",
+                "dropped",
+                "written",
+                "aggregated",
+                "alerts",
+                "batches",
+                "write_errors",
+            ),
+            0,
+        )
+        self._ready = None
+        self._closing = False
+
+    def full(self) -> bool:
+        return len(self.pending) >= self.queue_size
+
+    def handle(self, data: bytes, peer: str, droppable: bool = True) -> None:
+        counters = self.counters
+        counters["received"] += 1
+        try:
+            item = self.mapper(parse_message(data), peer)
+        except (SyslogParseError, LookupError, ValueError, TypeError):
+            counters["parse_errors"] += 1
+            return
+        if droppable and self.full():
+            counters["dropped"] += 1
+            return
+        self.pending.append(item)
+        if len(self.pending) >= self.batch_size:
+            self._ready.set()
+
+    def stats(self) -> dict:
+        stats = {**self.counters, "queued": len(self.pending)}
+        if "udp" in self.addresses:
+            stats["udp_kernel_drops"] = udp_kernel_drops(self.addresses["udp"][1])
+        return stats
+
+    def _write(self, batch) -> dict:
+        close_old_connections()
+        try:
+            return self.write(batch)
+        except Exception:
+            logger.exception("Syslog batch write failed", extra={"size": len(batch)})
+            return None
+
+    async def _writer(self, executor):
+        loop = asyncio.get_running_loop()
+        while not self._closing or self.pending:
+            if len(self.pending) < self.batch_size and not self._closing:
+                try:
+                    await asyncio.wait_for(self._ready.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            self._ready.clear()
+            await self._write_pending(loop, executor)
+
+    async def _write_pending(self, loop, executor):
+        while self.pending:
+            n = min(self.batch_size, len(self.pending))
+            batch = [self.pending.popleft() for _ in range(n)]
+            if not self.full():
+                for transport in self.paused:
+                    transport.resume_reading()
+                self.paused.clear()
+            result = await loop.run_in_executor(executor, self._write, batch)
+            self.counters["batches"] += 1
+            if result is None:
+                self.counters["write_errors"] += len(batch)
+                continue
+            for key in ("written", "aggregated", "alerts"):
+                self.counters[key] += result[key]
+            if len(self.pending) < self.batch_size and not self._closing:
+                return
+
+    async def _report(self, interval, report):
+        while True:
+            await asyncio.sleep(interval)
+            report(self.stats())
+
+    async def serve(
+        self,
+        host,
+        udp_port=None,
+        tcp_port=None,
+        stop=None,
+        stats_interval=None,
+        report=None,
+        reuse_port=False,
+    ):
+        """
+        Listen until `stop` (an asyncio.Event) is set or the task is
+        cancelled, then write out everything queued. Port 0 binds an
+        ephemeral port; None disables that transport. Bound addresses are
+        in `self.addresses`. With `reuse_port` several listener processes
+        can share the ports and the kernel spreads senders across them.
+        """
+        loop = asyncio.get_running_loop()
+        self._ready = asyncio.Event()
+        self._closing = False
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="syslog-db")
+        closers, tasks = [], []
+        writer = asyncio.create_task(self._writer(executor))
+        try:
+            if udp_port is not None:
+                transport, _ = await loop.create_datagram_endpoint(
+                    lambda: _UDPProtocol(self),
+                    local_addr=(host, udp_port),
+                    reuse_port=reuse_port,
+                )
+                sock = transport.get_extra_info("socket")
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 8 * 1024 * 1024)
+                self.addresses["udp"] = sock.getsockname()[:2]
+                closers.append(transport.close)
+            if tcp_port is not None:
+                server = await loop.create_server(
+                    lambda: _TCPProtocol(self), host, tcp_port, reuse_port=reuse_port
+                )
+                self.addresses["tcp"] = server.sockets[0].getsockname()[:2]
+                closers.append(server.close)
+            if stats_interval and report:
+                tasks.append(asyncio.create_task(self._report(stats_interval, report)))
+            await (stop.wait() if stop is not None else asyncio.Future())
+        finally:
+            for close in closers:
+                close()
+            for task in tasks:
+                task.cancel()
+            # The writer drains the queue, then the buffers its writes fed
+            self._closing = True
+            self._ready.set()
+            await writer
+            for flush in (event_aggregates.flush, heartbeats.flush, top_talkers.flush):
+                await loop.run_in_executor(executor, flush)
+            executor.shutdown(wait=True)
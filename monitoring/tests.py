@@ -1,4 +1,6 @@
-from django.test import TestCase
+from datetime import timedelta
+
+from django.test import TestCase, TransactionTestCase, override_settings
 
 # Create your tests here.
 from django.urls import reverse
@@ -97,3 +99,2056 @@ class ThreatPlatformTests(APITestCase):
         self.assertEqual(res.status_code, 200)
         a.refresh_from_db()
         self.assertEqual(a.status, "RESOLVED")
+
+
+class SourceRegistryTests(APITestCase):
+    def setUp(self):
+        from monitoring.sources import registry
+
+        self.registry = registry
+        self.registry.clear()
+        self.admin = User.objects.create_user(
+            username="admin1", password="pass1234", role=User.Roles.ADMIN, is_staff=True
+        )
+
+    def tearDown(self):
+        self.registry.clear()
+
+    def test_ingest_creates_source_on_first_sight(self):
+        self.client.force_authenticate(self.admin)
+        res = self.client.post(
+            "/api/events/",
+            {
+                "source_name": "Camera-01",
+                "event_type": "INTRUSION",
+                "severity": "LOW",
+                "description": "Motion",
+            },
+            format="json",
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["source_name"], "Camera-01")
+        event = Event.objects.get(pk=res.data["id"])
+        self.assertEqual(event.source.name, "Camera-01")
+        self.assertEqual(event.legacy_source_name, "")
+
+    def test_cached_source_costs_no_query(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            source = self.registry.resolve("fw-01")
+        with self.assertNumQueries(0):
+            self.assertEqual(self.registry.resolve("fw-01").pk, source.pk)
+
+    def test_rolled_back_source_is_not_cached(self):
+        self.registry.resolve("fw-02")  # on_commit never fires in TestCase
+        self.assertIsNone(self.registry.get("fw-02"))
+
+    def test_lru_evicts_oldest(self):
+        from monitoring.models import Source
+        from monitoring.sources import SourceRegistry
+
+        small = SourceRegistry(maxsize=2)
+        for name in ("a", "b", "c"):
+            small.put(Source(id=ord(name), name=name))
+        self.assertIsNone(small.get("a"))
+        self.assertIsNotNone(small.get("c"))
+
+    def test_rename_is_noticed_through_the_generation_row(self):
+        from unittest import mock
+        from monitoring.models import Generation
+        from monitoring.sources import GENERATION, SourceRegistry
+
+        # A registry that did not run the rename (stands in for another
+        # worker; only the database is shared with it)
+        other = SourceRegistry(sync_seconds=60)
+        with self.captureOnCommitCallbacks(execute=True):
+            source = other.resolve("cam-9")
+        before = Generation.objects.get(name=GENERATION).value
+        with self.captureOnCommitCallbacks(execute=True):
+            source.name = "cam-9-lobby"
+            source.save()
+        self.assertEqual(Generation.objects.get(name=GENERATION).value, before + 1)
+
+        # Within its sync interval it may still serve the old mapping...
+        with self.assertNumQueries(0):
+            self.assertEqual(other.resolve("cam-9").pk, source.pk)
+        # ...and once the interval has passed it re-reads the row and drops it
+        later = other._synced_at + 61
+        with mock.patch("monitoring.sources.time.monotonic", return_value=later):
+            self.assertNotEqual(other.resolve("cam-9").pk, source.pk)
+
+    def test_sources_are_not_created_or_deleted_over_the_api(self):
+        source = self.registry.resolve("fw-03")
+        self.client.force_authenticate(self.admin)
+        res = self.client.post("/api/sources/", {"name": "x"}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+        res = self.client.delete(f"/api/sources/{source.pk}/")
+        self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    def test_backfill_command_converts_legacy_rows(self):
+        from django.core.management import call_command
+        from io import StringIO
+
+        legacy = [
+            Event.objects.create(
+                legacy_source_name=name,
+                event_type="ANOMALY",
+                severity="LOW",
+                description="legacy",
+            )
+            for name in ("SIEM", "SIEM", "Camera-02")
+        ]
+        call_command("backfill_event_sources", chunk_size=2, stdout=StringIO())
+
+        for e in legacy:
+            e.refresh_from_db()
+            self.assertIsNotNone(e.source_id)
+            self.assertEqual(e.legacy_source_name, "")
+        self.assertEqual(legacy[0].source_id, legacy[1].source_id)
+        self.assertEqual(legacy[2].source_name, "Camera-02")
+
+
+class SourceHeartbeatTests(APITestCase):
+    def setUp(self):
+        from monitoring.heartbeat import HeartbeatBuffer
+        from monitoring.models import Source
+
+        self.buffer = HeartbeatBuffer(flush_interval=3600)
+        self.cam = Source.objects.create(name="Camera-01")
+        self.fw = Source.objects.create(name="fw-01")
+        self.analyst = User.objects.create_user(
+            username="analyst1", password="pass1234", role=User.Roles.ANALYST
+        )
+
+    def test_records_are_coalesced_into_one_flush(self):
+        from django.utils import timezone
+        from monitoring.models import SourceHeartbeat
+
+        now = timezone.now()
+        with self.assertNumQueries(0):
+            for i in range(50):
+                self.buffer.record(self.cam.id, "LOW", now)
+        self.buffer.record(self.cam.id, "CRITICAL", now + timedelta(seconds=1))
+        self.buffer.flush()
+
+        hb = SourceHeartbeat.objects.get(source=self.cam)
+        self.assertEqual(hb.event_count, 51)
+        self.assertEqual(hb.last_severity, "CRITICAL")
+
+        # Placeholder INSERT (cam's conflicts) + a single batched UPDATE
+        self.buffer.record(self.cam.id, "HIGH", now + timedelta(seconds=2))
+        self.buffer.record(self.fw.id, "LOW", now)
+        with self.assertNumQueries(2):
+            self.buffer.flush()
+        hb.refresh_from_db()
+        self.assertEqual(hb.event_count, 52)
+        self.assertEqual(hb.last_severity, "HIGH")
+
+    def test_concurrent_workers_and_late_records_merge(self):
+        from django.utils import timezone
+        from monitoring.heartbeat import HeartbeatBuffer
+        from monitoring.models import SourceHeartbeat
+
+        now = timezone.now()
+        other = HeartbeatBuffer(flush_interval=3600)  # another worker
+        self.buffer.record(self.fw.id, "HIGH", now)
+        other.record(self.fw.id, "LOW", now - timedelta(minutes=1))
+        other.record(self.fw.id, "LOW", now - timedelta(minutes=1))
+        self.buffer.flush()
+        other.flush()  # new-source race: its INSERT conflicts, UPDATE still adds
+
+        hb = SourceHeartbeat.objects.get(source=self.fw)
+        self.assertEqual(hb.event_count, 3)
+        self.assertEqual((hb.last_seen, hb.last_severity), (now, "HIGH"))
+
+    def test_rate_is_the_sources_rate_and_decays(self):
+        from datetime import datetime, timezone as dt_timezone
+        from unittest import mock
+        from monitoring.heartbeat import HeartbeatBuffer
+        from monitoring.models import SourceHeartbeat
+
+        def flush_at(buffer, at):
+            with mock.patch("django.utils.timezone.now", return_value=at):
+                buffer.flush()
+
+        t0 = datetime(2026, 1, 1, 12, 0, 30, tzinfo=dt_timezone.utc)
+        self.buffer.record(self.fw.id, "LOW", t0)
+        flush_at(self.buffer, t0)
+        hb = SourceHeartbeat.objects.get(source=self.fw)
+        # One event flushed right away is one event in the last minute
+        self.assertAlmostEqual(hb.rate_at(t0), 1.0)
+
+        # Two workers with 30 events each in the next minute: the source's rate
+        t1 = t0 + timedelta(minutes=1)
+        other = HeartbeatBuffer(flush_interval=3600)
+        for buffer in (self.buffer, other):
+            for _ in range(30):
+                buffer.record(self.fw.id, "LOW", t1)
+            flush_at(buffer, t1)
+        hb.refresh_from_db()
+        self.assertAlmostEqual(hb.rate_at(t1), 60 + 1 * 0.5)
+
+        # Silent from then on: decays without further writes
+        self.assertAlmostEqual(hb.rate_at(t1 + timedelta(minutes=1)), 30.0)
+        self.assertEqual(hb.rate_at(t1 + timedelta(minutes=2)), 0.0)
+
+    def test_failed_flush_is_retried(self):
+        from unittest import mock
+        from django.utils import timezone
+        from monitoring.models import SourceHeartbeat
+
+        now = timezone.now()
+        self.buffer.record(self.cam.id, "LOW", now)
+        with mock.patch.object(
+            self.buffer, "_write", side_effect=RuntimeError
+        ), self.assertLogs("monitoring", "ERROR"):
+            self.assertEqual(self.buffer.flush(), 0)
+        self.buffer.record(self.cam.id, "HIGH", now + timedelta(seconds=1))
+        self.assertEqual(self.buffer.flush(), 1)
+
+        hb = SourceHeartbeat.objects.get(source=self.cam)
+        self.assertEqual((hb.event_count, hb.last_severity), (2, "HIGH"))
+
+    def test_background_flush_runs_without_further_records(self):
+        import threading
+        from unittest import mock
+        from monitoring.heartbeat import BackgroundFlush
+
+        flushed = threading.Event()
+        timer = BackgroundFlush(flushed.set, 0.01, "test-flush")
+        with mock.patch("monitoring.heartbeat.close_old_connections"):
+            timer.ensure_started()
+            timer.ensure_started()  # once per process
+            self.addCleanup(timer.stop)
+            self.assertTrue(flushed.wait(2))
+
+    def test_health_lists_only_stale_sources(self):
+        from django.utils import timezone
+        from monitoring.models import SourceHeartbeat
+
+        now = timezone.now()
+        SourceHeartbeat.objects.create(
+            source=self.cam, last_seen=now - timedelta(hours=2), last_severity="LOW"
+        )
+        SourceHeartbeat.objects.create(
+            source=self.fw, last_seen=now, last_severity="LOW"
+        )
+
+        self.client.force_authenticate(self.analyst)
+        res = self.client.get("/api/sources/health/?silence=3600")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([r["source_name"] for r in res.data["results"]], ["Camera-01"])
+        self.assertGreaterEqual(res.data["results"][0]["silent_for"], 7200)
+
+
+class _WebhookStandIn:
+    """Local HTTP server standing in for a webhook receiver."""
+
+    def __init__(self, status_code=200):
+        import json
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        received = self.received = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                received.append(json.loads(body))
+                self.send_response(status_code)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/hook"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class NotificationDispatcherTests(APITestCase):
+    def make_alerts(self, n):
+        alerts = []
+        for i in range(n):
+            e = Event.objects.create(
+                source_name=f"fw-{i}",
+                event_type="INTRUSION",
+                severity="CRITICAL",
+                description="Port scan",
+            )
+            alerts.append(Alert.objects.create(event=e))
+        return alerts
+
+    def test_alert_creation_writes_outbox_rows(self):
+        from monitoring.models import NotificationOutbox
+
+        with override_settings(
+            NOTIFY_WEBHOOK_URLS=["http://hook.invalid/"], NOTIFY_EMAILS=["soc@x.io"]
+        ):
+            (alert,) = self.make_alerts(1)
+        self.assertEqual(NotificationOutbox.objects.filter(alert=alert).count(), 2)
+
+    def test_alerts_are_delivered_as_one_digest(self):
+        from monitoring.models import NotificationOutbox
+        from monitoring.notifications import Dispatcher, notifier_stats
+
+        hook = _WebhookStandIn()
+        self.addCleanup(hook.close)
+        with override_settings(NOTIFY_WEBHOOK_URLS=[hook.url], NOTIFY_EMAILS=[]):
+            self.make_alerts(3)
+
+        dispatcher = Dispatcher(workers=2)
+        self.addCleanup(dispatcher.close)
+        stats = dispatcher.run_once()
+
+        self.assertEqual(stats["sent"], 3)
+        self.assertEqual(len(hook.received), 1)
+        self.assertEqual(hook.received[0]["count"], 3)
+        self.assertFalse(NotificationOutbox.objects.exclude(status="SENT").exists())
+        self.assertEqual(notifier_stats()["pending"], 0)
+        self.assertIsNotNone(notifier_stats()["latency_avg"])
+
+    def test_failures_back_off_then_give_up(self):
+        from monitoring.models import NotificationOutbox
+        from monitoring.notifications import Dispatcher
+
+        hook = _WebhookStandIn(status_code=500)
+        self.addCleanup(hook.close)
+        with override_settings(NOTIFY_WEBHOOK_URLS=[hook.url], NOTIFY_EMAILS=[]):
+            self.make_alerts(1)
+
+        dispatcher = Dispatcher(workers=1, max_attempts=2)
+        self.addCleanup(dispatcher.close)
+        self.assertEqual(dispatcher.run_once()["retried"], 1)
+        row = NotificationOutbox.objects.get()
+        self.assertEqual(row.attempts, 1)
+        self.assertGreater(row.next_attempt_at, row.created_at)
+
+        # Not due yet -> nothing claimed; once due, second failure is final
+        self.assertEqual(dispatcher.run_once()["claimed"], 0)
+        NotificationOutbox.objects.update(next_attempt_at=row.created_at)
+        self.assertEqual(dispatcher.run_once()["failed"], 1)
+        self.assertEqual(NotificationOutbox.objects.get().status, "FAILED")
+
+    def test_rate_limit_defers_extra_digests(self):
+        from django.utils import timezone
+        from monitoring.models import NotificationOutbox
+        from monitoring.notifications import Dispatcher
+
+        delivered = []
+        with override_settings(
+            NOTIFY_WEBHOOK_URLS=["http://hook.invalid/"], NOTIFY_EMAILS=[]
+        ):
+            self.make_alerts(3)
+
+        dispatcher = Dispatcher(
+            digest_size=1,
+            rate_per_minute=1,
+            deliver_fn=lambda dest, payload: delivered.append(payload),
+        )
+        self.addCleanup(dispatcher.close)
+        stats = dispatcher.run_once()
+        self.assertEqual((stats["sent"], stats["deferred"]), (1, 2))
+        self.assertEqual(len(delivered), 1)
+
+        # Deferred until the bucket refills (~1 min), not released for the
+        # next cycle to claim and release again
+        self.assertEqual(dispatcher.run_once()["claimed"], 0)
+        row = NotificationOutbox.objects.filter(status="PENDING").first()
+        self.assertGreater(row.next_attempt_at, timezone.now() + timedelta(seconds=50))
+
+
+@override_settings(
+    STORAGES={
+        "staticfiles": {
+            "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+        }
+    }
+)
+class ScalableAdminTests(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.admin = User.objects.create_superuser(username="root", password="pass")
+        self.client.force_login(self.admin)
+
+    def make_alerts(self, n, prefix="cam"):
+        for i in range(n):
+            e = Event.objects.create(
+                source_name=f"{prefix}-{i}",
+                event_type="INTRUSION",
+                severity="HIGH",
+                description="x",
+            )
+            Alert.objects.create(event=e)
+
+    def changelist_queries(self, url):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(url)
+        self.assertEqual(res.status_code, 200)
+        return [q["sql"] for q in ctx.captured_queries]
+
+    def test_alert_changelist_query_count_is_constant(self):
+        self.make_alerts(2, "a")
+        small = self.changelist_queries("/admin/monitoring/alert/")
+        self.make_alerts(10, "b")
+        large = self.changelist_queries("/admin/monitoring/alert/?o=1")
+        self.assertEqual(len(small), len(large))
+
+    def test_counts_are_cached_between_requests(self):
+        self.make_alerts(3)
+        self.changelist_queries("/admin/monitoring/event/")
+        again = self.changelist_queries("/admin/monitoring/event/")
+        self.assertFalse([q for q in again if "COUNT(" in q.upper()])
+
+    def test_search_is_exact_not_icontains(self):
+        self.make_alerts(3)
+        queries = self.changelist_queries("/admin/monitoring/alert/?q=cam-1")
+        self.assertFalse([q for q in queries if " LIKE " in q.upper()])
+        res = self.client.get("/admin/monitoring/alert/?q=cam-1")
+        self.assertEqual(res.context["cl"].result_count, 1)
+
+
+class PrebuiltSchemaTests(APITestCase):
+    @override_settings(DEBUG=False)
+    def test_schema_redirects_to_static_file(self):
+        from unittest import mock
+
+        with mock.patch(
+            "threat_platform.urls.static", return_value="/static/openapi.abc123.json"
+        ):
+            res = self.client.get("/api/schema/")
+        self.assertEqual(res.status_code, 302)
+        self.assertEqual(res["Location"], "/static/openapi.abc123.json")
+
+    @override_settings(DEBUG=False)
+    def test_missing_schema_is_not_generated_live(self):
+        from unittest import mock
+
+        with mock.patch("threat_platform.urls.static", side_effect=ValueError):
+            res = self.client.get("/api/schema/")
+        self.assertEqual(res.status_code, 503)
+
+    @override_settings(DEBUG=False)
+    def test_docs_page_points_at_the_prebuilt_file(self):
+        from unittest import mock
+
+        with mock.patch(
+            "threat_platform.urls.static", return_value="/static/openapi.abc123.json"
+        ):
+            res = self.client.get("/api/docs/")
+        self.assertEqual(res.status_code, 200)
+        self.assertContains(res, "/static/openapi.abc123.json")
+
+    def test_production_workers_never_import_the_generator(self):
+        import os
+        import subprocess
+        import sys
+        from django.conf import settings
+
+        script = (
+            "import sys, django; django.setup();"
+            "from django.test import Client;"
+            "from rest_framework.settings import api_settings;"
+            "Client().get('/api/docs/'); Client().get('/api/alerts/');"
+            "api_settings.DEFAULT_SCHEMA_CLASS;"
+            "print(sorted(m for m in sys.modules if m.startswith('drf_spectacular')))"
+        )
+        env = {
+            **os.environ,
+            "DEBUG": "0",
+            "DJANGO_SETTINGS_MODULE": "threat_platform.settings",
+        }
+        env.pop("OPENAPI_SCHEMA_BUILD", None)
+        done = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        self.assertEqual(done.returncode, 0, done.stderr)
+        self.assertEqual(done.stdout.strip().splitlines()[-1], "[]")
+
+    def test_build_schema_writes_file(self):
+        import json
+        import tempfile
+        from pathlib import Path
+        from io import StringIO
+        from django.core.management import call_command
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "openapi.json"
+            call_command("build_schema", file=str(path), stdout=StringIO())
+            schema = json.loads(path.read_text())
+        self.assertIn("/api/alerts/", schema["paths"])
+
+
+class ConditionalAlertListTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username="admin1", password="pass1234", role=User.Roles.ADMIN, is_staff=True
+        )
+        e = Event.objects.create(
+            source_name="fw-01",
+            event_type="INTRUSION",
+            severity="HIGH",
+            description="x",
+        )
+        self.alert = Alert.objects.create(event=e)
+        self.client.force_authenticate(self.admin)
+
+    def assert_revalidates(self, url):
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        etag = first["ETag"]
+        self.assertFalse(first.has_header("Last-Modified"))
+
+        # 304 costs only the change-marker query
+        with self.assertNumQueries(1):
+            res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 304)
+
+        # Another filter set -> another ETag
+        other = self.client.get(url + "?status=OPEN", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(other.status_code, 200)
+
+        self.client.patch(
+            f"/api/dashboard/alerts/{self.alert.id}/status/",
+            {"status": "ACKNOWLEDGED"},
+            format="json",
+        )
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 200)
+        self.assertNotEqual(res["ETag"], etag)
+
+    def test_dashboard_alerts_conditional_get(self):
+        self.assert_revalidates("/api/dashboard/alerts/")
+
+    def test_alerts_viewset_conditional_get(self):
+        self.assert_revalidates("/api/alerts/")
+
+    def test_deletes_and_late_commits_change_the_etag(self):
+        from unittest import mock
+        from monitoring.transitions import transition_alert
+
+        older = Alert.objects.create(
+            event=Event.objects.create(
+                event_type="INTRUSION", severity="HIGH", description="y"
+            )
+        )
+        Alert.objects.filter(pk=older.pk).update(
+            updated_at=self.alert.updated_at - timedelta(hours=1)
+        )
+        # Holds MAX(updated_at) through both changes below
+        Alert.objects.create(
+            event=Event.objects.create(
+                event_type="INTRUSION", severity="HIGH", description="z"
+            )
+        )
+        etag = self.client.get("/api/alerts/")["ETag"]
+
+        # Not the newest alert: MAX(updated_at) would not move
+        older.delete()
+        res = self.client.get("/api/alerts/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 200)
+
+        # A change stamped before the last one but committed after it
+        etag = res["ETag"]
+        stamp = self.alert.updated_at - timedelta(hours=1)
+        with mock.patch("django.utils.timezone.now", return_value=stamp):
+            transition_alert(self.alert.id, "ACKNOWLEDGED", self.admin)
+        res = self.client.get("/api/alerts/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 200)
+
+    def test_source_rename_changes_the_etag(self):
+        etag = self.client.get("/api/alerts/")["ETag"]
+        source = self.alert.event.source
+        res = self.client.patch(
+            f"/api/sources/{source.pk}/", {"name": "fw-01-dmz"}, format="json"
+        )
+        self.assertEqual(res.status_code, 200)
+
+        res = self.client.get("/api/alerts/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data["results"][0]["event"]["source_name"], "fw-01-dmz")
+
+
+class EventFilterTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username="admin1", password="pass1234", role=User.Roles.ADMIN, is_staff=True
+        )
+        for name, sev, etype in [
+            ("fw-01", "CRITICAL", "INTRUSION"),
+            ("fw-02", "LOW", "ANOMALY"),
+            ("cam-01", "CRITICAL", "INTRUSION"),
+        ]:
+            Event.objects.create(
+                source_name=name, event_type=etype, severity=sev, description="x"
+            )
+
+    def plan(self, params):
+        from monitoring.filters import EventFilter
+
+        qs = EventFilter(params, queryset=Event.objects.all()).qs
+        return qs.explain()
+
+    def test_filters_combine(self):
+        self.client.force_authenticate(self.admin)
+        res = self.client.get(
+            "/api/events/",
+            {
+                "severity": "critical",
+                "source": "fw-*",
+                "timestamp_after": "2000-01-01T00:00:00Z",
+            },
+        )
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([e["source_name"] for e in res.data["results"]], ["fw-01"])
+
+        res = self.client.get("/api/events/", {"severity": "LOW,CRITICAL"})
+        self.assertEqual(res.data["count"], 3)
+
+    def test_explain_uses_composite_indexes(self):
+        from django.db import connection
+
+        if connection.vendor != "sqlite":
+            self.skipTest("plan text below is SQLite's")
+        window = {
+            "timestamp_after": "2000-01-01T00:00:00Z",
+            "timestamp_before": "2100-01-01T00:00:00Z",
+        }
+        cases = {
+            "monitoring__severit_bc9af8_idx": {"severity": "CRITICAL", **window},
+            "monitoring__event_t_09d03c_idx": {"event_type": "INTRUSION", **window},
+            "monitoring__source__831c9a_idx": {"source": "fw-*", **window},
+        }
+        for index, params in cases.items():
+            plan = self.plan(params)
+            self.assertIn(index, plan, params)
+            self.assertNotIn("SCAN monitoring_event", plan)
+
+    def test_brin_index_on_postgres(self):
+        from django.db import connection
+
+        if connection.vendor != "postgresql":
+            self.skipTest("BRIN is PostgreSQL-only")
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT indexdef FROM pg_indexes WHERE indexname = %s",
+                ["monitoring_event_timestamp_brin"],
+            )
+            self.assertIn("brin", cursor.fetchone()[0])
+
+
+class ReplayEventsTests(TestCase):
+    def setUp(self):
+        for sev in ("LOW", "MEDIUM", "MEDIUM", "HIGH"):
+            Event.objects.create(
+                source_name="ids-01",
+                event_type="ANOMALY",
+                severity=sev,
+                description="x",
+            )
+
+    def replay(self, *extra):
+        from io import StringIO
+        from django.core.management import call_command
+
+        out = StringIO()
+        call_command(
+            "replay_events",
+            "--from",
+            "2000-01-01",
+            "--to",
+            "2100-01-01",
+            "--workers",
+            "0",
+            "--chunk-size",
+            "2",
+            *extra,
+            stdout=out,
+        )
+        return out.getvalue()
+
+    @override_settings(ALERT_SEVERITIES=["MEDIUM", "HIGH", "CRITICAL"])
+    def test_dry_run_reports_without_writing(self):
+        out = self.replay("--dry-run")
+        # on_commit never fires in TestCase, so the HIGH event has no alert yet
+        self.assertIn("Would create 3 alerts", out)
+        self.assertEqual(Alert.objects.count(), 0)
+
+    @override_settings(ALERT_SEVERITIES=["MEDIUM", "HIGH", "CRITICAL"])
+    def test_replay_is_idempotent(self):
+        self.assertIn("Created 3 alerts", self.replay())
+        self.assertIn("Created 0 alerts", self.replay())
+        self.assertEqual(Alert.objects.count(), 3)
+
+    def test_reports_alerts_the_rule_no_longer_wants(self):
+        Alert.objects.create(event=Event.objects.filter(severity="LOW").get())
+        self.assertIn("1 existing alerts no longer match", self.replay("--dry-run"))
+
+
+class HeavyHitterTests(APITestCase):
+    def test_space_saving_bounds_and_merge(self):
+        import random
+        from collections import Counter
+        from monitoring.sketches import SpaceSaving
+
+        rng = random.Random(7)
+        stream = ["fw-01"] * 500 + ["cam-01"] * 300
+        stream += [f"noise-{rng.randrange(2000)}" for _ in range(2000)]
+        rng.shuffle(stream)
+        truth = Counter(stream)
+
+        left, right = SpaceSaving(20), SpaceSaving(20)
+        for i, item in enumerate(stream):
+            (left if i % 2 else right).add(item)
+        merged = SpaceSaving.from_dict(left.merge(right).to_dict())
+
+        self.assertEqual(merged.total, len(stream))
+        top = merged.top(2)
+        self.assertEqual([r["item"] for r in top], ["fw-01", "cam-01"])
+        for row in top:
+            self.assertLessEqual(row["guaranteed"], truth[row["item"]])
+            self.assertGreaterEqual(row["count"], truth[row["item"]])
+
+    def test_top_sources_endpoint_reads_merged_worker_buckets(self):
+        import os
+        from monitoring.top_talkers import TopTalkers
+
+        # Two "processes" recording into their own sketches
+        a = TopTalkers(k=10, flush_interval=3600)
+        b = TopTalkers(k=10, flush_interval=3600)
+        b._pid, b._worker = os.getpid(), "other-host:1:abcd"
+        for _ in range(5):
+            a.record("fw-01", "INTRUSION")
+        for _ in range(3):
+            b.record("fw-01", "INTRUSION")
+            b.record("cam-01", "ANOMALY")
+        a.flush()
+        b.flush()
+
+        user = User.objects.create_user(username="analyst1", password="x")
+        self.client.force_authenticate(user)
+        res = self.client.get("/api/stats/top-sources/?window=15m&n=5")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data["total"], 11)
+        first = res.data["results"][0]
+        self.assertEqual(
+            (first["item"], first["count"], first["error"]), ("fw-01", 8, 0)
+        )
+
+        res = self.client.get("/api/stats/top-sources/?window=2h")
+        self.assertEqual(res.status_code, 400)
+
+    def test_idle_worker_is_flushed_under_a_per_process_id(self):
+        import threading
+        from unittest import mock
+        from monitoring.models import TopTalkersBucket
+        from monitoring.top_talkers import TopTalkers
+
+        written = threading.Event()
+        talkers = TopTalkers(k=10, flush_interval=0.01)
+        self.addCleanup(talkers._timer.stop)
+        with mock.patch.object(
+            TopTalkersBucket.objects,
+            "bulk_create",
+            side_effect=lambda *a, **kw: written.set(),
+        ), mock.patch("monitoring.heartbeat.close_old_connections"):
+            talkers.record("fw-01", "INTRUSION")
+            self.assertTrue(written.wait(2))
+
+        # A forked child gets a new id; a restart reusing the pid does too
+        worker = talkers.worker
+        with mock.patch("monitoring.top_talkers.os.getpid", return_value=-1):
+            forked = talkers.worker
+        self.assertNotEqual(worker, forked)
+        self.assertNotEqual(TopTalkers().worker, worker)
+
+
+class AlertLifecycleTests(TestCase):
+    def make_alert(self, severity, alert_status, age_hours):
+        from django.utils import timezone
+
+        e = Event.objects.create(
+            source_name="ids-01",
+            event_type="ANOMALY",
+            severity=severity,
+            description="x",
+        )
+        a = Alert.objects.create(event=e, status=alert_status)
+        Alert.objects.filter(pk=a.pk).update(
+            created_at=timezone.now() - timedelta(hours=age_hours)
+        )
+        return a
+
+    def run_policies(self, *extra):
+        from io import StringIO
+        from django.core.management import call_command
+
+        out = StringIO()
+        call_command(
+            "apply_alert_lifecycle",
+            "--batch-size",
+            "2",
+            "--pause",
+            "0",
+            *extra,
+            stdout=out,
+        )
+        return out.getvalue()
+
+    def test_batches_transition_and_record_changes(self):
+        from monitoring.models import AlertResponseRollup, AlertStatusChange
+
+        old_ack = [self.make_alert("HIGH", "ACKNOWLEDGED", 24 * 8) for _ in range(5)]
+        fresh_ack = self.make_alert("HIGH", "ACKNOWLEDGED", 1)
+        old_low = self.make_alert("LOW", "OPEN", 30)
+        old_high_open = self.make_alert("HIGH", "OPEN", 30)
+
+        out = self.run_policies("--dry-run")
+        self.assertIn("stale-acknowledged: would transition 5", out)
+        self.assertIn("low-origin: would transition 1", out)
+        self.assertFalse(Alert.objects.filter(status="RESOLVED").exists())
+
+        out = self.run_policies()
+        self.assertIn("stale-acknowledged: transitioned 5", out)
+        resolved = set(
+            Alert.objects.filter(status="RESOLVED").values_list("id", flat=True)
+        )
+        self.assertEqual(resolved, {a.id for a in old_ack} | {old_low.id})
+        self.assertNotIn(fresh_ack.id, resolved)
+        self.assertNotIn(old_high_open.id, resolved)
+        self.assertEqual(
+            AlertStatusChange.objects.filter(
+                reason="policy:stale-acknowledged"
+            ).count(),
+            5,
+        )
+        # Policy closures are not analyst response times
+        self.assertFalse(AlertResponseRollup.objects.exists())
+
+    def test_invalid_policy_is_rejected(self):
+        from monitoring.lifecycle import LifecyclePolicy
+
+        with self.assertRaises(ValueError):
+            LifecyclePolicy("bad", "OPEN", "CLOSED", 1)
+
+
+class ResponseTimeTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username="admin1", password="pass1234", role=User.Roles.ADMIN, is_staff=True
+        )
+        self.client.force_authenticate(self.admin)
+
+    def make_alert(self, severity="CRITICAL", minutes_ago=10):
+        from django.utils import timezone
+
+        e = Event.objects.create(
+            source_name="fw-01",
+            event_type="INTRUSION",
+            severity=severity,
+            description="x",
+        )
+        a = Alert.objects.create(event=e)
+        Alert.objects.filter(pk=a.pk).update(
+            created_at=timezone.now() - timedelta(minutes=minutes_ago)
+        )
+        return a
+
+    def test_status_paths_stamp_time_and_actor(self):
+        a = self.make_alert()
+        self.client.patch(
+            f"/api/dashboard/alerts/{a.id}/status/", {"status": "ACKNOWLEDGED"}
+        )
+        self.client.patch(f"/api/alerts/{a.id}/status/", {"status": "RESOLVED"})
+        a.refresh_from_db()
+        self.assertEqual(a.acknowledged_by, self.admin)
+        self.assertEqual(a.resolved_by, self.admin)
+        self.assertLessEqual(a.acknowledged_at, a.resolved_at)
+        self.assertEqual(a.status_changes.count(), 2)
+
+    def test_rollups_serve_mtta_mttr_percentiles(self):
+        from monitoring.models import AlertResponseRollup
+
+        for minutes in (10, 20, 30, 40):
+            a = self.make_alert(minutes_ago=minutes)
+            self.client.patch(f"/api/alerts/{a.id}/status/", {"status": "RESOLVED"})
+        self.assertEqual(AlertResponseRollup.objects.get(metric="MTTR").count, 4)
+
+        with self.assertNumQueries(1):
+            res = self.client.get("/api/stats/response-times/?days=1")
+        mttr = res.data["summary"]["MTTR"]
+        self.assertEqual(mttr["count"], 4)
+        self.assertAlmostEqual(mttr["mean_seconds"], 25 * 60, delta=5)
+        # p50 of {10,20,30,40} min, within the sketch's 2% relative accuracy
+        self.assertAlmostEqual(mttr["p50_seconds"], 20 * 60, delta=20 * 60 * 0.03)
+        self.assertNotIn("MTTA", res.data["summary"])
+
+    def test_log_histogram_merge_matches_single_sketch(self):
+        from monitoring.sketches import LogHistogram
+
+        values = [float(v) for v in range(1, 1001)]
+        whole, a, b = LogHistogram(), LogHistogram(), LogHistogram()
+        for v in values:
+            whole.add(v)
+            (a if v % 2 else b).add(v)
+        merged = LogHistogram.from_dict(a.merge(b).to_dict())
+        for q in (0.5, 0.9, 0.99):
+            self.assertEqual(merged.quantile(q), whole.quantile(q))
+            true = values[int(q * (len(values) - 1))]
+            self.assertLessEqual(abs(merged.quantile(q) - true) / true, 0.02)
+
+
+class ReadReplicaRoutingTests(APITestCase):
+    """A second SQLite file stands in for the replica, with different rows."""
+
+    # Resolved at setUpClass, after the replica alias is registered
+    databases = "__all__"
+
+    @classmethod
+    def setUpClass(cls):
+        import tempfile
+        from django.core.management import call_command
+        from django.db import connections
+
+        cls._replica_dir = tempfile.mkdtemp()
+        connections.settings["replica"] = {
+            **connections.settings["default"],
+            "NAME": f"{cls._replica_dir}/replica.sqlite3",
+        }
+        call_command("migrate", database="replica", verbosity=0)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        import shutil
+        from django.db import connections
+
+        super().tearDownClass()
+        connections["replica"].close()
+        del connections["replica"]
+        del connections.settings["replica"]
+        shutil.rmtree(cls._replica_dir, ignore_errors=True)
+
+    def setUp(self):
+        from django.core.cache import caches
+        from monitoring.models import Source
+
+        caches["shared"].clear()
+        self.admin = User.objects.create_user(
+            username="admin1", password="pass1234", role=User.Roles.ADMIN, is_staff=True
+        )
+        e = Event.objects.create(
+            source_name="fw-01", event_type="INTRUSION", severity="HIGH"
+        )
+        self.alert = Alert.objects.create(event=e)
+
+        src = Source.objects.using("replica").create(name="replica-fw")
+        for _ in range(2):
+            e = Event.objects.using("replica").create(
+                source=src, event_type="MALWARE", severity="CRITICAL"
+            )
+            Alert.objects.using("replica").create(event=e)
+        self.client.force_authenticate(self.admin)
+
+    def test_reads_use_replica_until_client_writes(self):
+        from django.core.cache import caches
+        from django.core.cache.backends.db import DatabaseCache
+
+        self.assertEqual(self.client.get("/api/alerts/").data["count"], 2)
+        self.assertEqual(self.client.get("/api/dashboard/alerts/").data["count"], 2)
+
+        res = self.client.patch(
+            f"/api/alerts/{self.alert.id}/status/", {"status": "ACKNOWLEDGED"}
+        )
+        self.assertEqual(res.status_code, 200)
+        self.assertIn("db_pin", res.cookies)
+
+        # Pinned to the primary: reads its own write
+        res = self.client.get("/api/alerts/")
+        self.assertEqual(res.data["count"], 1)
+        self.assertEqual(res.data["results"][0]["status"], "ACKNOWLEDGED")
+
+        # API clients without cookies are pinned by user, in the database
+        # table every worker reads (a fresh backend instance finds the pin)
+        self.client.cookies.pop("db_pin")
+        self.assertEqual(self.client.get("/api/alerts/").data["count"], 1)
+        elsewhere = DatabaseCache("monitoring_shared_cache", {})
+        self.assertEqual(elsewhere.get(f"db-pin:user:{self.admin.pk}"), 1)
+
+        caches["shared"].clear()
+        self.assertEqual(self.client.get("/api/alerts/").data["count"], 2)
+
+
+class RequestProfilingTests(APITestCase):
+    def setUp(self):
+        import tempfile
+
+        self.admin = User.objects.create_user(
+            username="admin1", password="pass1234", role=User.Roles.ADMIN, is_staff=True
+        )
+        self.analyst = User.objects.create_user(
+            username="analyst1", password="pass1234", role=User.Roles.ANALYST
+        )
+        e = Event.objects.create(
+            source_name="fw-01", event_type="INTRUSION", severity="HIGH"
+        )
+        Alert.objects.create(event=e)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        override = override_settings(PROFILE_DIR=tmp.name, PROFILE_MAX_FILES=2)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_admin_profile_captures_sql_plans_and_functions(self):
+        self.client.force_authenticate(self.admin)
+        res = self.client.get("/api/dashboard/alerts/", HTTP_X_PROFILE="1")
+        self.assertEqual(res.status_code, 200)
+        profile_id = res["X-Profile-Id"]
+
+        listed = self.client.get("/api/profiles/").data
+        self.assertEqual([p["id"] for p in listed], [profile_id])
+        data = self.client.get(f"/api/profiles/{profile_id}/").data
+        self.assertEqual(data["path"], "/api/dashboard/alerts/")
+        self.assertGreater(data["sql_count"], 0)
+        self.assertTrue(data["slowest"][0]["plan"])
+        self.assertTrue(
+            any("dashboard_api.py" in f["function"] for f in data["functions"])
+        )
+
+        # Directory stays bounded
+        for _ in range(3):
+            self.client.get("/api/alerts/?profile=1")
+        self.assertEqual(len(self.client.get("/api/profiles/").data), 2)
+        self.assertEqual(self.client.get("/api/profiles/../x/").status_code, 404)
+
+    def test_off_for_analysts_and_without_flag(self):
+        self.client.force_authenticate(self.admin)
+        self.assertFalse(self.client.get("/api/alerts/").has_header("X-Profile-Id"))
+        for value in ("0", "", "true"):
+            res = self.client.get("/api/alerts/", HTTP_X_PROFILE=value)
+            self.assertFalse(res.has_header("X-Profile-Id"))
+
+        # The middleware authenticates the JWT itself
+        self.client.force_authenticate(None)
+        token = self.client.post(
+            "/api/auth/token/", {"username": "analyst1", "password": "pass1234"}
+        ).data["access"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        res = self.client.get("/api/alerts/", HTTP_X_PROFILE="1")
+        self.assertEqual(res.status_code, 200)
+        self.assertFalse(res.has_header("X-Profile-Id"))
+        self.assertEqual(self.client.get("/api/profiles/").status_code, 403)
+
+        self.client.credentials()
+        self.client.force_authenticate(self.admin)
+        self.assertEqual(self.client.get("/api/profiles/").data, [])
+
+
+class IngestAdmissionTests(APITestCase):
+    def setUp(self):
+        from unittest import mock
+        from monitoring.admission import admission
+
+        self.admin = User.objects.create_user(
+            username="admin1", password="pass1234", role=User.Roles.ADMIN, is_staff=True
+        )
+        self.client.force_authenticate(self.admin)
+        self.admission = admission
+        for attr, value in (("admitted", {}), ("shed", {}), ("in_flight", 0)):
+            patcher = mock.patch.object(admission, attr, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def post(self, severity):
+        return self.client.post(
+            "/api/events/",
+            {
+                "source_name": "fw-01",
+                "event_type": "ANOMALY",
+                "severity": severity,
+                "description": "x",
+            },
+            format="json",
+        )
+
+    def test_sheds_low_priority_when_over_budget(self):
+        self.assertEqual(self.post("LOW").status_code, 201)
+
+        self.admission.in_flight = self.admission.max_in_flight
+        res = self.post("MEDIUM")
+        self.assertEqual(res.status_code, 429)
+        self.assertTrue(res.has_header("Retry-After"))
+        self.assertEqual(self.post("CRITICAL").status_code, 201)
+        self.assertEqual(self.admission.in_flight, self.admission.max_in_flight)
+
+        stats = self.client.get("/api/stats/admission/").data
+        self.assertTrue(stats["overloaded"])
+        self.assertEqual(stats["shed"], {"MEDIUM": 1})
+        self.assertEqual(stats["admitted"], {"LOW": 1, "CRITICAL": 1})
+
+    def test_latency_budget_recovers_once_samples_go_stale(self):
+        import time
+        from monitoring import admission as module
+
+        self.admission.latency_ms = self.admission.latency_budget_ms * 4
+        self.admission._latency_at = time.monotonic()
+        self.assertEqual(self.post("LOW").status_code, 429)
+
+        self.admission._latency_at -= module.LATENCY_STALE_AFTER + 1
+        self.assertEqual(self.post("LOW").status_code, 201)
+
+    def test_time_queued_for_a_worker_counts_against_the_budget(self):
+        import time
+        from monitoring.admission import AdmissionController, queue_ms
+
+        now = 1_700_000_000.5
+        for header in ("t=1700000000.25", "t=1700000000250", "1700000000250000"):
+            self.assertAlmostEqual(
+                queue_ms({"HTTP_X_REQUEST_START": header}, now=now), 250.0, places=3
+            )
+        self.assertEqual(queue_ms({"HTTP_X_REQUEST_START": "t=abc"}, now=now), 0.0)
+        self.assertEqual(queue_ms({}, now=now), 0.0)
+
+        # Other workers' backlog shows up as queue time, even at in_flight 0
+        waited = time.time() - self.admission.latency_budget_ms * 2 / 1000
+        header = {"HTTP_X_REQUEST_START": f"t={waited * 1e6:.0f}"}
+        res = self.client.post(
+            "/api/events/",
+            {
+                "source_name": "fw-01",
+                "event_type": "ANOMALY",
+                "severity": "LOW",
+                "description": "x",
+            },
+            format="json",
+            **header,
+        )
+        self.assertEqual(res.status_code, 429)
+        self.assertEqual(self.admission.in_flight, 0)
+
+        # Admitted requests fold their wait into the latency average
+        controller = AdmissionController(latency_budget_ms=250.0)
+        with controller.ticket("CRITICAL", queued_ms=400.0):
+            pass
+        self.assertGreaterEqual(controller.latency_ms, 400.0)
+        self.assertTrue(controller.overloaded())
+
+    def test_user_throttle_never_blocks_alerting_events(self):
+        from unittest import mock
+        from django.core.cache import cache
+        from rest_framework.throttling import SimpleRateThrottle
+
+        cache.clear()
+        self.addCleanup(cache.clear)
+        rates = {"anon": "30/min", "user": "1/min"}
+        with mock.patch.object(SimpleRateThrottle, "THROTTLE_RATES", rates):
+            self.assertEqual(self.post("LOW").status_code, 201)
+            self.assertEqual(self.post("LOW").status_code, 429)
+            self.assertEqual(self.post("HIGH").status_code, 201)
+
+
+class EventAttributeTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username="admin1", password="pass1234", role=User.Roles.ADMIN, is_staff=True
+        )
+        self.client.force_authenticate(self.admin)
+
+    def ingest(self, attributes):
+        return self.client.post(
+            "/api/events/",
+            {
+                "source_name": "fw-01",
+                "event_type": "INTRUSION",
+                "severity": "LOW",
+                "description": "x",
+                "attributes": attributes,
+            },
+            format="json",
+        )
+
+    def test_hot_keys_are_promoted_and_queryable(self):
+        from django.utils import timezone
+        from monitoring.models import EventAttribute
+
+        res = self.ingest(
+            {"src_ip": "10.0.0.5", "dst_ip": ["10.0.0.9", "10.0.0.10"], "port": 22}
+        )
+        self.assertEqual(res.status_code, 201)
+        self.ingest({"src_ip": "10.0.0.6", "port": 443})
+        self.assertEqual(
+            EventAttribute.objects.filter(event_id=res.data["id"]).count(), 3
+        )
+
+        hour_ago = (timezone.now() - timedelta(hours=1)).isoformat()
+        res = self.client.get(
+            "/api/events/", {"src_ip": "10.0.0.5", "timestamp_after": hour_ago}
+        )
+        self.assertEqual(res.data["count"], 1)
+        self.assertEqual(res.data["results"][0]["attributes"]["port"], 22)
+        res = self.client.get("/api/events/", {"dst_ip": "10.0.0.10"})
+        self.assertEqual(res.data["count"], 1)
+        res = self.client.get(
+            "/api/events/",
+            {"src_ip": "10.0.0.5", "timestamp_before": hour_ago},
+        )
+        self.assertEqual(res.data["count"], 0)
+
+        # Non-promoted keys still work (JSON lookup)
+        self.assertEqual(
+            self.client.get("/api/events/", {"attr": "port:443"}).data["count"], 1
+        )
+        self.assertEqual(
+            self.client.get("/api/events/", {"attr": "port"}).status_code, 400
+        )
+
+    def test_attribute_keys_never_become_lookups(self):
+        self.ingest({"port": 22, "contains": "x"})
+        self.ingest({"port": 443})
+
+        # A literal key named like a lookup, not a contains lookup (500)
+        res = self.client.get("/api/events/", {"attr": "contains:x"})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data["count"], 1)
+        for attr in ("port__gt:1", "a-b:1", "port.x:1"):
+            res = self.client.get("/api/events/", {"attr": attr})
+            self.assertEqual(res.status_code, 400, attr)
+
+    def test_attribute_lookup_uses_index(self):
+        from django.db import connection
+        from monitoring.filters import EventFilter
+
+        if connection.vendor != "sqlite":
+            self.skipTest("plan text below is SQLite's")
+        params = {"src_ip": "10.0.0.5", "timestamp_after": "2000-01-01T00:00:00Z"}
+        plan = EventFilter(params, queryset=Event.objects.all()).qs.explain()
+        self.assertIn("monitoring__key_c44129_idx", plan)
+        self.assertNotIn("SCAN monitoring_eventattribute", plan)
+
+    def test_rejects_nested_attributes(self):
+        res = self.ingest({"src_ip": {"v4": "10.0.0.5"}})
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(self.ingest(["10.0.0.5"]).status_code, 400)
+
+
+class AlertClaimTests(APITestCase):
+    def setUp(self):
+        self.analyst = User.objects.create_user(
+            username="analyst1", password="pass1234", role=User.Roles.ANALYST
+        )
+        self.other = User.objects.create_user(
+            username="analyst2", password="pass1234", role=User.Roles.ANALYST
+        )
+        self.alerts = {}
+        for severity in ("LOW", "CRITICAL", "MEDIUM", "CRITICAL", "HIGH"):
+            e = Event.objects.create(
+                source_name="fw-01",
+                event_type="INTRUSION",
+                severity=severity,
+                description="x",
+            )
+            self.alerts.setdefault(severity, []).append(Alert.objects.create(event=e))
+
+    def claim(self, user, count):
+        self.client.force_authenticate(user)
+        res = self.client.post("/api/alerts/claim/", {"count": count}, format="json")
+        self.assertEqual(res.status_code, 200, res.data)
+        return res.data
+
+    def test_claims_by_severity_then_age_without_overlap(self):
+        first = self.claim(self.analyst, 3)
+        self.assertEqual(
+            [a["id"] for a in first],
+            [
+                self.alerts["CRITICAL"][0].id,
+                self.alerts["CRITICAL"][1].id,
+                self.alerts["HIGH"][0].id,
+            ],
+        )
+        self.assertTrue(all(a["assigned_to"] == self.analyst.id for a in first))
+
+        second = self.claim(self.other, 5)
+        self.assertEqual([a["severity"] for a in second], ["MEDIUM", "LOW"])
+        self.assertEqual(self.claim(self.other, 5), [])
+
+    def test_expired_lease_is_reclaimable(self):
+        from django.utils import timezone
+
+        self.claim(self.analyst, 5)
+        Alert.objects.filter(pk=self.alerts["LOW"][0].pk).update(
+            lease_expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        claimed = self.claim(self.other, 5)
+        self.assertEqual([a["id"] for a in claimed], [self.alerts["LOW"][0].id])
+
+        # Acknowledged alerts leave the queue
+        Alert.objects.update(status="ACKNOWLEDGED", lease_expires_at=None)
+        self.assertEqual(self.claim(self.other, 5), [])
+
+    def test_claim_reads_the_queue_index_in_order(self):
+        from django.db import connection
+        from django.utils import timezone
+        from monitoring.assignment import QUEUE_ORDER, claimable
+
+        if connection.vendor != "sqlite":
+            self.skipTest("plan text below is SQLite's")
+        self.assertEqual(
+            [a.severity_rank for a in Alert.objects.order_by("id")], [3, 0, 2, 0, 1]
+        )
+        plan = claimable(timezone.now()).order_by(*QUEUE_ORDER)[:5].explain()
+        self.assertIn("monitoring__status_7b6c85_idx", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+        self.assertNotIn("monitoring_event", plan)
+
+    def test_count_is_bounded(self):
+        self.client.force_authenticate(self.analyst)
+        for count in (0, "x", 10_000):
+            res = self.client.post(
+                "/api/alerts/claim/", {"count": count}, format="json"
+            )
+            self.assertEqual(res.status_code, 400)
+
+
+def retry_locked(fn, *args, **kwargs):
+    """
+    The in-memory test database (shared cache) fails fast with "table is
+    locked" where a file or server database would wait; retry like a client.
+    """
+    import time
+    from django.db import OperationalError
+
+    for _ in range(200):
+        try:
+            return fn(*args, **kwargs)
+        except OperationalError as exc:
+            if "locked" not in str(exc):
+                raise
+            time.sleep(0.005)
+    raise AssertionError("database stayed locked")
+
+
+class ConcurrentAlertClaimTests(TransactionTestCase):
+    def tearDown(self):
+        # Committed description ids would outlive the flushed tables
+        from monitoring.descriptions import descriptions
+
+        descriptions.clear()
+
+    def test_parallel_claimers_never_double_claim(self):
+        import threading
+        from django.db import connection
+        from monitoring.assignment import claim_alerts
+
+        users = [User.objects.create_user(username=f"u{i}") for i in range(6)]
+        # bulk_create: no post_save, so no on_commit work outlives the test DB
+        events = Event.objects.bulk_create(
+            Event(event_type="INTRUSION", severity="HIGH", description="x")
+            for _ in range(60)
+        )
+        Alert.objects.bulk_create(Alert(event=e) for e in events)
+        claimed, errors = [], []
+
+        def claimer(user):
+            try:
+                while batch := retry_locked(claim_alerts, user, 4):
+                    claimed.extend(a.id for a in batch)
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=claimer, args=(u,)) for u in users]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(claimed), 60)
+        self.assertEqual(len(set(claimed)), 60)
+
+
+class CompareAndSetStatusTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username="admin1", password="pass1234", role=User.Roles.ADMIN, is_staff=True
+        )
+        e = Event.objects.create(
+            source_name="fw-01",
+            event_type="INTRUSION",
+            severity="HIGH",
+            description="x",
+        )
+        self.alert = Alert.objects.create(event=e)
+        self.client.force_authenticate(self.admin)
+
+    def test_state_change_is_one_update_without_a_read(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from monitoring.transitions import transition_alert
+
+        with CaptureQueriesContext(connection) as ctx:
+            alert = transition_alert(
+                self.alert.id, "ACKNOWLEDGED", self.admin, expected_status="OPEN"
+            )
+        touching = [
+            q["sql"]
+            for q in ctx.captured_queries
+            if 'FROM "monitoring_alert"' in q["sql"]
+            or q["sql"].startswith('UPDATE "monitoring_alert"')
+        ]
+        self.assertEqual(len(touching), 1)
+        self.assertTrue(touching[0].startswith("UPDATE"))
+        self.assertEqual((alert.status, alert.version), ("ACKNOWLEDGED", 1))
+        self.assertEqual(alert.acknowledged_by_id, self.admin.id)
+
+    def test_endpoints_serialize_the_returned_row(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        for url, target in (
+            (f"/api/alerts/{self.alert.id}/status/", "ACKNOWLEDGED"),
+            (f"/api/dashboard/alerts/{self.alert.id}/status/", "RESOLVED"),
+        ):
+            with CaptureQueriesContext(connection) as ctx:
+                res = self.client.patch(url, {"status": target})
+            self.assertEqual(res.status_code, 200)
+            reads = [
+                q["sql"]
+                for q in ctx.captured_queries
+                if q["sql"].startswith("SELECT")
+                and 'FROM "monitoring_alert" INNER JOIN' in q["sql"]
+            ]
+            self.assertEqual(reads, [])
+            self.assertEqual(res.data["status"], target)
+            self.assertEqual(res.data["severity"], "HIGH")
+            self.assertEqual(res.data["event"]["source_name"], "fw-01")
+            self.assertEqual(res.data["event"]["description"], "x")
+            self.assertEqual(res.data["event"]["id"], self.alert.event_id)
+            self.assertEqual(res.data["event"]["attributes"], {})
+        self.assertEqual(res.data["version"], 2)
+        self.assertIsNotNone(res.data["resolved_at"])
+
+    def test_stale_expectations_get_409(self):
+        url = f"/api/alerts/{self.alert.id}/status/"
+        res = self.client.patch(
+            url, {"status": "ACKNOWLEDGED", "expected_status": "OPEN", "version": 0}
+        )
+        self.assertEqual(res.data["version"], 1)
+
+        res = self.client.patch(url, {"status": "RESOLVED", "expected_status": "OPEN"})
+        self.assertEqual(res.status_code, 409)
+        self.assertEqual(res.data["status"], "ACKNOWLEDGED")
+        res = self.client.patch(
+            f"/api/dashboard/alerts/{self.alert.id}/status/",
+            {"status": "RESOLVED", "version": 0},
+        )
+        self.assertEqual(res.status_code, 409)
+        self.assertEqual(res.data["version"], 1)
+        self.assertEqual(
+            self.client.patch(
+                "/api/alerts/999/status/", {"status": "RESOLVED"}
+            ).status_code,
+            404,
+        )
+
+        self.alert.refresh_from_db()
+        self.assertEqual(self.alert.status, "ACKNOWLEDGED")
+        self.assertEqual(self.alert.status_changes.count(), 1)
+
+    def test_fallback_without_update_returning(self):
+        from unittest import mock
+
+        with mock.patch(
+            "monitoring.transitions._supports_update_returning", return_value=False
+        ):
+            res = self.client.patch(
+                f"/api/alerts/{self.alert.id}/status/",
+                {"status": "RESOLVED", "expected_status": "OPEN"},
+            )
+            self.assertEqual(res.status_code, 200)
+            res = self.client.patch(
+                f"/api/alerts/{self.alert.id}/status/",
+                {"status": "ACKNOWLEDGED", "expected_status": "OPEN"},
+            )
+            self.assertEqual(res.status_code, 409)
+        self.alert.refresh_from_db()
+        self.assertEqual(self.alert.resolved_by, self.admin)
+        self.assertEqual(self.alert.version, 1)
+
+
+class ConcurrentStatusUpdateTests(TransactionTestCase):
+    def tearDown(self):
+        # Committed description ids would outlive the flushed tables
+        from monitoring.descriptions import descriptions
+
+        descriptions.clear()
+
+    def test_parallel_updaters_exactly_one_wins(self):
+        import threading
+        from django.db import connection
+        from monitoring.models import AlertStatusChange
+        from monitoring.transitions import AlertConflict, transition_alert
+
+        admin = User.objects.create_user(username="admin1", role=User.Roles.ADMIN)
+        event = Event.objects.bulk_create(
+            [Event(event_type="INTRUSION", severity="HIGH", description="x")]
+        )[0]
+        alert = Alert.objects.bulk_create([Alert(event=event)])[0]
+        outcomes = []
+        start = threading.Barrier(8)
+
+        def updater(target):
+            try:
+                start.wait()
+                retry_locked(
+                    transition_alert, alert.id, target, admin, expected_status="OPEN"
+                )
+                outcomes.append("ok")
+            except AlertConflict:
+                outcomes.append("conflict")
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(
+                target=updater, args=(("ACKNOWLEDGED", "RESOLVED")[i % 2],)
+            )
+            for i in range(8)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(sorted(outcomes), ["conflict"] * 7 + ["ok"])
+        alert.refresh_from_db()
+        self.assertEqual(alert.version, 1)
+        self.assertEqual(AlertStatusChange.objects.filter(alert=alert).count(), 1)
+
+
+@override_settings(
+    EVENT_AGGREGATE_SEVERITIES=["LOW"],
+    EVENT_AGGREGATE_SCOPE=["fw-*:ANOMALY"],
+    EVENT_AGGREGATE_SAMPLES=3,
+)
+class EventAggregationTests(APITestCase):
+    def setUp(self):
+        from unittest import mock
+        from monitoring.aggregation import EventAggregator
+        from monitoring.heartbeat import heartbeats
+        from monitoring.top_talkers import top_talkers
+        from monitoring.views import EventViewSet
+
+        self.admin = User.objects.create_user(
+            username="admin1", password="pass1234", role=User.Roles.ADMIN, is_staff=True
+        )
+        self.client.force_authenticate(self.admin)
+        self.aggregator = EventAggregator(max_samples=3, flush_interval=3600)
+        for patcher in (
+            mock.patch("monitoring.views.event_aggregates", self.aggregator),
+            mock.patch.object(EventViewSet, "throttle_classes", []),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        # Aggregated events feed the shared buffers directly (no on_commit):
+        # write them inside the test transaction, not at interpreter exit
+        self.addCleanup(heartbeats.flush)
+        self.addCleanup(top_talkers.flush)
+
+    def post(self, source, severity, description="port scan"):
+        return self.client.post(
+            "/api/events/",
+            {
+                "source_name": source,
+                "event_type": "ANOMALY",
+                "severity": severity,
+                "description": description,
+            },
+            format="json",
+        )
+
+    def test_in_scope_low_events_fold_into_one_row(self):
+        from monitoring.models import EventAggregate
+
+        for i in range(200):
+            res = self.post("fw-01", "LOW", f"port scan {i % 5}")
+            self.assertEqual(res.status_code, 202)
+        self.assertTrue(res.data["aggregated"])
+        # Out of scope source, and a severity that is not aggregated
+        self.assertEqual(self.post("cam-01", "LOW").status_code, 201)
+        self.assertEqual(self.post("fw-01", "HIGH").status_code, 201)
+        self.assertEqual(Event.objects.count(), 2)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.aggregator.flush(), 1)
+        row = EventAggregate.objects.get()
+        self.assertEqual(row.count, 200)
+        self.assertEqual(len(row.samples), 3)
+        self.assertLessEqual(row.first_seen, row.last_seen)
+
+        # Rows hold the worker's running total: a second flush overwrites
+        self.post("fw-01", "LOW")
+        self.aggregator.flush()
+        self.assertEqual(EventAggregate.objects.get().count, 201)
+
+    def test_counts_are_flushed_without_further_records(self):
+        import threading
+        from unittest import mock
+        from monitoring.aggregation import EventAggregator
+        from monitoring.models import EventAggregate
+        from monitoring.sources import registry
+
+        written = threading.Event()
+        aggregator = EventAggregator(flush_interval=0.01)
+        self.addCleanup(aggregator._timer.stop)
+        with mock.patch.object(
+            EventAggregate.objects,
+            "bulk_create",
+            side_effect=lambda *a, **kw: written.set(),
+        ), mock.patch("monitoring.heartbeat.close_old_connections"):
+            aggregator.record(registry.resolve("fw-01").id, "ANOMALY", "LOW")
+            self.assertTrue(written.wait(2))
+
+    def test_aggregates_endpoint_sums_workers(self):
+        import os
+        from monitoring.aggregation import EventAggregator
+        from monitoring.sources import registry
+
+        fw = registry.resolve("fw-01")
+        other = EventAggregator(max_samples=3, flush_interval=3600)
+        other._pid, other._worker = os.getpid(), "other-host:1:abcd"
+        for _ in range(4):
+            self.post("fw-01", "LOW", "from api")
+        for _ in range(6):
+            other.record(fw.id, "ANOMALY", "LOW", "from other")
+        other.flush()
+
+        res = self.client.get("/api/events/aggregates/?severity=low&source=fw-*")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data["count"], 1)
+        row = res.data["results"][0]
+        self.assertEqual((row["source_name"], row["count"]), ("fw-01", 10))
+        self.assertEqual(sorted(row["samples"]), ["from api", "from other"])
+
+        res = self.client.get("/api/events/aggregates/?source=cam-*")
+        self.assertEqual(res.data["count"], 0)
+
+    @override_settings(EVENT_AGGREGATE_SEVERITIES=["LOW", "HIGH"])
+    def test_alerting_severities_are_never_aggregated(self):
+        from monitoring.aggregation import aggregated
+
+        self.assertTrue(aggregated("fw-01", "ANOMALY", "LOW"))
+        self.assertFalse(aggregated("fw-01", "ANOMALY", "HIGH"))
+        self.assertFalse(aggregated("fw-01", "MALWARE", "LOW"))
+
+
+class SyslogIngestTests(APITestCase):
+    def test_parses_rfc5424_and_rfc3164(self):
+        from monitoring.syslog_ingest import (
+            SyslogParseError,
+            map_event,
+            parse_message,
+        )
+
+        parsed = parse_message(
+            b'<34>1 2026-01-01T00:00:00Z fw-01 sshd 42 ID7 [origin ip="10.0.0.5" '
+            b'note="a \\"quoted\\" \\]"][meta seq="9"] Malware blocked\n'
+        )
+        self.assertEqual((parsed["facility"], parsed["severity"]), (4, 2))
+        self.assertEqual(
+            parsed["params"], {"ip": "10.0.0.5", "note": 'a "quoted" ]', "seq": "9"}
+        )
+        event = map_event(parsed, "192.0.2.1")
+        self.assertEqual(
+            (event["source_name"], event["severity"], event["event_type"]),
+            ("fw-01", "CRITICAL", "MALWARE"),
+        )
+        self.assertEqual(event["attributes"]["host"], "fw-01")
+
+        parsed = parse_message(b"<38>Jan  1 00:00:00 cam-01 motion[7]: Door opened")
+        self.assertEqual((parsed["app"], parsed["message"]), ("motion", "Door opened"))
+        event = map_event(parsed, "192.0.2.1")
+        self.assertEqual((event["severity"], event["event_type"]), ("LOW", "ANOMALY"))
+
+        with self.assertRaises(SyslogParseError):
+            parse_message(b"hello world")
+
+    @override_settings(NOTIFY_WEBHOOK_URLS=["https://hooks.example.com/soc"])
+    def test_batch_write_stores_events_attributes_and_alerts(self):
+        from unittest import mock
+        from monitoring.aggregation import EventAggregator
+        from monitoring.heartbeat import HeartbeatBuffer
+        from monitoring.models import EventAttribute, NotificationOutbox
+        from monitoring.sources import registry
+        from monitoring.syslog_ingest import map_event, parse_message, write_events
+        from monitoring.top_talkers import TopTalkers
+
+        # Private buffers: no periodic flush inside the counted queries
+        for name, buffer in (
+            ("heartbeats", HeartbeatBuffer(flush_interval=3600)),
+            ("top_talkers", TopTalkers(flush_interval=3600)),
+        ):
+            patcher = mock.patch(f"monitoring.syslog_ingest.{name}", buffer)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        # Nor a source generation re-check
+        patcher = mock.patch.object(registry, "sync_seconds", 3600)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        registry.invalidate()
+
+        items = [
+            map_event(parse_message(m), "192.0.2.1")
+            for m in (
+                b"<34>1 - fw-01 sshd - - - Intrusion attempt",
+                b"<38>1 - fw-01 sshd - - - login ok",
+                b"<38>1 - cam-01 - - - - motion",
+            )
+        ]
+        # Sources and descriptions SELECT + INSERT + SELECT each, savepoint,
+        # events, attributes, alerts, outbox, change log, release
+        with self.assertNumQueries(13):
+            result = write_events(items)
+        self.assertEqual(result, {"written": 3, "aggregated": 0, "alerts": 1})
+
+        alert = Alert.objects.get()
+        self.assertEqual(alert.event.event_type, "INTRUSION")
+        self.assertEqual(alert.event.source_name, "fw-01")
+        self.assertEqual(NotificationOutbox.objects.get().alert, alert)
+        self.assertEqual(
+            set(EventAttribute.objects.values_list("key", "value")),
+            {("host", "fw-01"), ("host", "cam-01")},
+        )
+
+        with override_settings(EVENT_AGGREGATE_SEVERITIES=["LOW"]):
+            aggregator = EventAggregator(flush_interval=3600)
+            with mock.patch("monitoring.syslog_ingest.event_aggregates", aggregator):
+                result = write_events(items[1:])
+        self.assertEqual(result, {"written": 0, "aggregated": 2, "alerts": 0})
+
+    def test_listener_frames_counts_and_drops(self):
+        import asyncio
+        import socket
+        from monitoring.syslog_ingest import SyslogListener
+
+        batches = []
+
+        def collect(batch):
+            batches.append(batch)
+            return {"written": len(batch), "aggregated": 0, "alerts": 0}
+
+        listener = SyslogListener(write=collect, batch_size=3, flush_interval=0.05)
+
+        async def scenario():
+            stop = asyncio.Event()
+            task = asyncio.create_task(
+                listener.serve("127.0.0.1", udp_port=0, tcp_port=0, stop=stop)
+            )
+            while len(listener.addresses) < 2:
+                await asyncio.sleep(0.01)
+            udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            udp.sendto(b"<13>1 - udp-host app - - - one", listener.addresses["udp"])
+            udp.sendto(b"not syslog", listener.addresses["udp"])
+            udp.close()
+            frame = b"<13>1 - tcp-host app - - - two"
+            # Octet counting, newline framing, then a frame split across writes
+            reader, writer = await asyncio.open_connection(*listener.addresses["tcp"])
+            writer.write(b"%d %s" % (len(frame), frame) + frame + b"\n" + frame[:10])
+            await writer.drain()
+            await asyncio.sleep(0.05)
+            writer.write(frame[10:] + b"\n")
+            await writer.drain()
+            writer.close()
+            while listener.counters["received"] < 5:
+                await asyncio.sleep(0.01)
+            stop.set()
+            await task
+
+        asyncio.run(scenario())
+        stats = listener.stats()
+        self.assertEqual(
+            (stats["received"], stats["parse_errors"], stats["written"]), (5, 1, 4)
+        )
+        self.assertEqual(
+            sorted(i["source_name"] for b in batches for i in b),
+            ["tcp-host", "tcp-host", "tcp-host", "udp-host"],
+        )
+
+        # Queue full: UDP is dropped and counted, TCP (paused instead) is kept
+        listener = SyslogListener(write=collect, batch_size=100, queue_size=1)
+        listener._ready = asyncio.Event()
+        for _ in range(2):
+            listener.handle(b"<13>1 - h a - - - x", "192.0.2.1")
+        listener.handle(b"<13>1 - h a - - - x", "192.0.2.1", droppable=False)
+        self.assertEqual((listener.counters["dropped"], len(listener.pending)), (1, 2))
+
+
+class EventDescriptionTests(APITestCase):
+    def setUp(self):
+        from monitoring.descriptions import descriptions
+
+        self.descriptions = descriptions
+        self.descriptions.clear()
+        self.admin = User.objects.create_user(
+            username="admin1", password="pass1234", role=User.Roles.ADMIN, is_staff=True
+        )
+
+    def tearDown(self):
+        self.descriptions.clear()
+
+    def test_repeated_descriptions_are_stored_once(self):
+        from monitoring.models import EventDescription
+
+        self.client.force_authenticate(self.admin)
+        ids = []
+        for _ in range(3):
+            res = self.client.post(
+                "/api/events/",
+                {
+                    "source_name": "Camera-01",
+                    "event_type": "INTRUSION",
+                    "severity": "LOW",
+                    "description": "Motion at gate 3",
+                },
+                format="json",
+            )
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+            self.assertEqual(res.data["description"], "Motion at gate 3")
+            ids.append(res.data["id"])
+
+        self.assertEqual(EventDescription.objects.count(), 1)
+        events = Event.objects.filter(pk__in=ids)
+        self.assertEqual(len({e.description_ref_id for e in events}), 1)
+        self.assertEqual({e.legacy_description for e in events}, {""})
+
+        res = self.client.get(f"/api/events/{ids[0]}/")
+        self.assertEqual(res.data["description"], "Motion at gate 3")
+
+    def test_cached_description_costs_no_query(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            row = self.descriptions.resolve("Port scan")
+        with self.assertNumQueries(0):
+            self.assertEqual(self.descriptions.resolve("Port scan").pk, row.pk)
+            self.assertEqual(
+                self.descriptions.resolve_many(["Port scan"]), {"Port scan": row.pk}
+            )
+
+    def test_compaction_command_converts_legacy_rows(self):
+        from django.core.management import call_command
+        from io import StringIO
+
+        legacy = [
+            Event.objects.create(
+                legacy_source_name="SIEM",
+                event_type="ANOMALY",
+                severity="LOW",
+                legacy_description=text,
+            )
+            for text in ("old text", "old text", "other")
+        ]
+        call_command("compact_event_descriptions", chunk_size=2, stdout=StringIO())
+
+        for e in legacy:
+            e.refresh_from_db()
+            self.assertIsNotNone(e.description_ref_id)
+            self.assertEqual(e.legacy_description, "")
+        self.assertEqual(legacy[0].description_ref_id, legacy[1].description_ref_id)
+        self.assertEqual(legacy[2].description, "other")
+
+
+class AlertChangeFeedTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username="admin1", password="pass1234", role=User.Roles.ADMIN, is_staff=True
+        )
+        self.analyst = User.objects.create_user(
+            username="analyst1", password="pass1234", role=User.Roles.ANALYST
+        )
+        self.alerts = [
+            Alert.objects.create(
+                event=Event.objects.create(
+                    event_type="INTRUSION", severity="LOW", description=f"e{i}"
+                )
+            )
+            for i in range(3)
+        ]
+
+    def feed(self, **params):
+        self.client.force_authenticate(self.analyst)
+        res = self.client.get("/api/alerts/changes/", params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data
+
+    def test_feed_returns_changes_after_cursor_in_order(self):
+        from monitoring.assignment import claim_alerts
+        from monitoring.transitions import transition_alert
+
+        start = self.feed()
+        self.assertEqual([c["kind"] for c in start["changes"]], ["CREATED"] * 3)
+        self.assertEqual(start["changes"][0]["severity"], "LOW")
+
+        transition_alert(self.alerts[0].id, "ACKNOWLEDGED", self.admin)
+        claim_alerts(self.admin, 1)
+        Alert.objects.filter(pk=self.alerts[2].pk).update(status="RESOLVED")  # unlogged
+
+        data = self.feed(since=start["last_seq"])
+        self.assertEqual(
+            [(c["alert"], c["kind"], c["status"]) for c in data["changes"]],
+            [
+                (self.alerts[0].id, "STATUS", "ACKNOWLEDGED"),
+                (self.alerts[1].id, "ASSIGNED", "OPEN"),
+            ],
+        )
+        self.assertEqual(data["changes"][0]["version"], 1)
+        self.assertFalse(data["more"])
+        self.assertEqual(self.feed(since=data["last_seq"])["changes"], [])
+
+    @override_settings(ALERT_CHANGES_MAX_PAGE=2)
+    def test_responses_are_capped_and_resumable(self):
+        first = self.feed(limit=100)
+        self.assertEqual((len(first["changes"]), first["more"]), (2, True))
+        rest = self.feed(since=first["last_seq"])
+        self.assertEqual((len(rest["changes"]), rest["more"]), (1, False))
+        self.assertEqual(rest["changes"][0]["alert"], self.alerts[2].id)
+
+        self.client.force_authenticate(self.analyst)
+        res = self.client.get("/api/alerts/changes/", {"since": "-1"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_lifecycle_and_event_edits_are_logged(self):
+        from django.utils import timezone
+        from monitoring.lifecycle import LifecyclePolicy
+        from monitoring.models import AlertChange
+
+        cursor = AlertChange.objects.order_by("-seq").first().seq
+        policy = LifecyclePolicy("low", "OPEN", "RESOLVED", 0, severities=["LOW"])
+        self.assertEqual(policy.apply(now=timezone.now() + timedelta(hours=1)), 3)
+        event = self.alerts[0].event
+        event.severity = "MEDIUM"
+        event.save()
+
+        kinds = [
+            (c["kind"], c["status"], c["severity"])
+            for c in self.feed(since=cursor)["changes"]
+        ]
+        self.assertEqual(
+            kinds,
+            [("STATUS", "RESOLVED", "MEDIUM")]
+            + [("STATUS", "RESOLVED", "LOW")] * 2
+            + [("EVENT", "RESOLVED", "MEDIUM")],
+        )
+
+    def test_deletions_and_leases_reach_the_feed(self):
+        from monitoring.assignment import claim_alerts
+
+        cursor = self.feed()["last_seq"]
+        gone = [self.alerts[1].id, self.alerts[2].id]
+        claimed = claim_alerts(self.admin, 1)[0]
+        self.alerts[1].delete()
+        self.alerts[2].event.delete()  # cascades to the alert
+
+        changes = self.feed(since=cursor)["changes"]
+        self.assertEqual(
+            [(c["alert"], c["kind"]) for c in changes],
+            [
+                (claimed.id, "ASSIGNED"),
+                (gone[0], "DELETED"),
+                (gone[1], "DELETED"),
+            ],
+        )
+        self.assertIsNotNone(changes[0]["lease_expires_at"])
+        self.assertIsNone(changes[1]["event"])
+        self.assertIsNone(changes[2]["severity"])
+        # Earlier entries of a deleted alert are kept, not cascaded
+        self.assertEqual(
+            [c["kind"] for c in self.feed()["changes"] if c["alert"] == gone[0]],
+            ["CREATED", "DELETED"],
+        )
+
+    def test_compaction_keeps_each_alerts_newest_entry(self):
+        from django.core.management import call_command
+        from django.utils import timezone
+        from io import StringIO
+        from monitoring.models import AlertChange
+        from monitoring.transitions import transition_alert
+
+        for target in ("ACKNOWLEDGED", "RESOLVED"):
+            transition_alert(self.alerts[0].id, target, self.admin)
+        AlertChange.objects.update(changed_at=timezone.now() - timedelta(days=30))
+        # Recent, but still supersedes the old CREATED entry of alerts[1]
+        transition_alert(self.alerts[1].id, "RESOLVED", self.admin)
+
+        call_command(
+            "compact_alert_changes", keep_hours=24, chunk_size=2, stdout=StringIO()
+        )
+        self.assertEqual(
+            [(c["alert"], c["status"]) for c in self.feed()["changes"]],
+            [
+                (self.alerts[2].id, "OPEN"),
+                (self.alerts[0].id, "RESOLVED"),
+                (self.alerts[1].id, "RESOLVED"),
+            ],
+        )
+
+    def test_compaction_resumes_and_drops_old_tombstones(self):
+        from django.core.management import call_command
+        from django.utils import timezone
+        from io import StringIO
+        from monitoring.changes import COMPACTED
+        from monitoring.models import AlertChange, Generation
+        from monitoring.transitions import transition_alert
+
+        def compact():
+            call_command(
+                "compact_alert_changes",
+                keep_hours=24,
+                tombstone_hours=24 * 30,
+                chunk_size=2,
+                stdout=StringIO(),
+            )
+
+        cursor = self.feed()["last_seq"]
+        gone = self.alerts[2].id
+        self.alerts[2].delete()
+        AlertChange.objects.update(changed_at=timezone.now() - timedelta(days=7))
+        compact()
+        mark = Generation.objects.get(name=COMPACTED).value
+        self.assertEqual(mark, AlertChange.objects.order_by("-seq").first().seq + 1)
+        # The tombstone is recent enough to keep
+        self.assertIn(
+            (gone, "DELETED"),
+            [(c["alert"], c["kind"]) for c in self.feed(since=cursor)["changes"]],
+        )
+
+        # Next run starts at the mark, yet still reaches back for alerts[0]'s
+        # CREATED entry once a newer one is compacted
+        transition_alert(self.alerts[0].id, "RESOLVED", self.admin)
+        AlertChange.objects.filter(seq__gte=mark).update(
+            changed_at=timezone.now() - timedelta(days=2)
+        )
+        # Ages follow seq order: everything up to the tombstone is old
+        AlertChange.objects.filter(
+            seq__lte=AlertChange.objects.get(alert_id=gone, kind="DELETED").seq
+        ).update(changed_at=timezone.now() - timedelta(days=60))
+        compact()
+        self.assertEqual(
+            list(AlertChange.objects.values_list("alert_id", "kind")),
+            [(self.alerts[1].id, "CREATED"), (self.alerts[0].id, "STATUS")],
+        )
+
+        # A cursor from before the dropped tombstone must reload
+        res = self.client.get("/api/alerts/changes/", {"since": cursor})
+        self.assertEqual(res.status_code, 410)
+        self.assertEqual(self.feed()["last_seq"], AlertChange.objects.last().seq)
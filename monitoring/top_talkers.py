@@ -0,0 +1,140 @@
+import atexit
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .heartbeat import BackgroundFlush
+from .models import TopTalkersBucket
+from .sketches import SpaceSaving
+
+logger = logging.getLogger("monitoring")
+
+DIMENSIONS = ("source", "event_type")
+WINDOWS = {"1m": 1, "15m": 15, "1h": 60}
+RETENTION_MINUTES = max(WINDOWS.values()) + 1
+
+
+def minute_floor(dt):
+    return dt.replace(second=0, microsecond=0)
+
+
+class TopTalkers:
+    """
+    Per-process Space-Saving sketches per (dimension, minute).
+
+    Ingestion calls `record()` (in memory). Every `flush_interval` seconds a
+    background thread upserts the open minutes as this worker's rows in
+    TopTalkersBucket, one query for all of them, so an idle worker's last
+    burst still reaches the 1m window. Readers merge the rows of all workers for the last
+    1/15/60 minutes, so memory and read cost are bounded by k, not by traffic.
+    """
+
+    def __init__(self, k: int = 100, flush_interval: float = 5.0):
+        self.k = k
+        self.flush_interval = flush_interval
+        self._sketches = {}
+        self._dirty = set()
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._pid = None
+        self._worker = ""
+        self._timer = BackgroundFlush(self.flush, flush_interval, "top-talkers-flush")
+
+    @property
+    def worker(self) -> str:
+        # Rows are upserted by worker: a restarted (or forked) worker with a
+        # reused pid must not overwrite the previous one's sketches
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._worker = (
+                f"{socket.gethostname()[:40]}:{self._pid}:{uuid.uuid4().hex[:8]}"
+            )
+        return self._worker
+
+    def record(self, source_name: str, event_type: str, seen_at=None) -> None:
+        minute = minute_floor(seen_at or timezone.now())
+        self._timer.ensure_started()
+        with self._lock:
+            for dimension, item in (
+                ("source", source_name),
+                ("event_type", event_type),
+            ):
+                key = (dimension, minute)
+                sketch = self._sketches.get(key)
+                if sketch is None:
+                    sketch = self._sketches[key] = SpaceSaving(self.k)
+                sketch.add(item)
+                self._dirty.add(key)
+            due = time.monotonic() - self._last_flush >= self.flush_interval
+
+        if due:
+            self.flush()
+
+    def flush(self) -> int:
+        now_minute = minute_floor(timezone.now())
+        with self._lock:
+            rows = [
+                TopTalkersBucket(
+                    dimension=dimension,
+                    minute=minute,
+                    worker=self.worker,
+                    sketch=self._sketches[(dimension, minute)].to_dict(),
+                )
+                for dimension, minute in self._dirty
+            ]
+            self._dirty.clear()
+            # Older minutes are persisted and closed. The previous minute stays
+            # in memory so a late commit adds to it instead of overwriting it.
+            keep_from = now_minute - timedelta(minutes=1)
+            for key in [k for k in self._sketches if k[1] < keep_from]:
+                del self._sketches[key]
+            self._last_flush = time.monotonic()
+
+        if not rows:
+            return 0
+        try:
+            TopTalkersBucket.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=["dimension", "minute", "worker"],
+                update_fields=["sketch"],
+            )
+            TopTalkersBucket.objects.filter(
+                minute__lt=now_minute - timedelta(minutes=RETENTION_MINUTES)
+            ).delete()
+        except Exception:
+            logger.exception("Top-talkers flush failed")
+            return 0
+        return len(rows)
+
+    def query(self, dimension: str, window: str, n: int = 10) -> dict:
+        minutes = WINDOWS[window]
+        since = minute_floor(timezone.now()) - timedelta(minutes=minutes - 1)
+        merged = SpaceSaving(self.k)
+        buckets = TopTalkersBucket.objects.filter(
+            dimension=dimension, minute__gte=since
+        ).values_list("sketch", flat=True)
+        for data in buckets:
+            merged = merged.merge(SpaceSaving.from_dict(data))
+        return {
+            "dimension": dimension,
+            "window": window,
+            "total": merged.total,
+            # Every item with a true count above this is in the list
+            "max_error": merged.total // merged.k if merged.total else 0,
+            "results": merged.top(n),
+        }
+
+
+top_talkers = TopTalkers(
+    k=getattr(settings, "TOP_TALKERS_CAPACITY", 100),
+    flush_interval=getattr(settings, "TOP_TALKERS_FLUSH_INTERVAL", 5.0),
+)
+atexit.register(top_talkers.flush)
@@ -0,0 +1,308 @@
+import logging
+
+from django.db import connections, router, transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotFound
+
+from .changes import log_alert_changes
+from .models import (
+    Alert,
+    AlertChange,
+    AlertStatusChange,
+    Event,
+    EventDescription,
+    Source,
+)
+from .response_times import record_samples, samples_for
+
+logger = logging.getLogger("monitoring")
+
+
+class AlertConflict(APIException):
+    """409: the alert is no longer in the status / version the client expected."""
+
+    status_code = status.HTTP_409_CONFLICT
+    default_code = "conflict"
+
+    default_detail = "Alert was changed by someone else; reload and retry."
+
+    def __init__(self, current: dict):
+        super().__init__()
+        # Set directly so `version` stays an integer in the response body
+        self.detail = {
+            "detail": self.default_detail,
+            "status": current["status"],
+            "version": current["version"],
+        }
+
+
+def _supports_update_returning(conn) -> bool:
+    # PostgreSQL, and SQLite >= 3.35 (the same gate Django uses for INSERT)
+    return conn.vendor in ("postgresql", "sqlite") and (
+        conn.features.can_return_columns_from_insert
+    )
+
+
+ALERT_COLUMNS = (
+    "id",
+    "event_id",
+    "status",
+    "version",
+    "created_at",
+    "updated_at",
+    "acknowledged_at",
+    "acknowledged_by_id",
+    "resolved_at",
+    "resolved_by_id",
+    "assigned_to_id",
+    "lease_expires_at",
+)
+# What AlertSerializer embeds, so the caller can answer without a re-read
+EVENT_COLUMNS = (
+    "id",
+    "source_id",
+    "legacy_source_name",
+    "event_type",
+    "severity",
+    "description_ref_id",
+    "legacy_description",
+    "attributes",
+    "timestamp",
+    "created_by_id",
+)
+
+
+def _from_row(conn, db, model, columns, values):
+    # Apply the backend and field converters a queryset would, then build
+    # the instance (unlisted fields stay deferred; from_db wants the values
+    # in field order)
+    by_name = dict(zip(columns, values))
+    fields = [f for f in model._meta.concrete_fields if f.attname in by_name]
+    converted = []
+    for field in fields:
+        value, col = by_name[field.attname], field.get_col(model._meta.db_table)
+        for converter in conn.ops.get_db_converters(col) + field.get_db_converters(
+            conn
+        ):
+            value = converter(value, col, conn)
+        converted.append(value)
+    return model.from_db(db, [f.attname for f in fields], converted)
+
+
+def _compare_and_set(db, alert_id, new_status, expected_status, version, actor, now):
+    """
+    One conditional UPDATE:
+      UPDATE alert SET status = new, version = version + 1, ...
+      WHERE id = ? AND status = expected [AND version = ?]
+      RETURNING ..., (SELECT <event column> FROM event WHERE ...), ...
+    Returns the updated Alert with .severity set and .event (with its
+    source name and description text) loaded, or None if nothing matched.
+    RETURNING may not name joined tables on SQLite, hence one scalar
+    subselect per column; each is a primary-key lookup.
+    First-acknowledgement / resolution stamps are kept via COALESCE, so the
+    returned timestamp equals `now` only when this update set it.
+    """
+    conn = connections[db]
+    qn = conn.ops.quote_name
+    stamp = conn.ops.adapt_datetimefield_value(now)
+    actor_id = actor.pk if actor is not None else None
+
+    sets = [f"{qn('status')} = %s", f"{qn('version')} = {qn('version')} + 1"]
+    params = [new_status]
+    for target, at, by in (
+        (Alert.Status.ACKNOWLEDGED, "acknowledged_at", "acknowledged_by_id"),
+        (Alert.Status.RESOLVED, "resolved_at", "resolved_by_id"),
+    ):
+        if new_status == target:
+            # Every SET expression sees the old row, so the order is irrelevant
+            sets += [
+                f"{qn(by)} = CASE WHEN {qn(at)} IS NULL THEN %s ELSE {qn(by)} END",
+                f"{qn(at)} = COALESCE({qn(at)}, %s)",
+            ]
+            params += [actor_id, stamp]
+    sets.append(f"{qn('updated_at')} = %s")
+    params.append(stamp)
+
+    where = f"{qn('id')} = %s AND {qn('status')} = %s"
+    params += [alert_id, expected_status]
+    if version is not None:
+        where += f" AND {qn('version')} = %s"
+        params.append(version)
+
+    alert_table, event_table = qn(Alert._meta.db_table), qn(Event._meta.db_table)
+    of_event = (
+        f"FROM {event_table} "
+        f"WHERE {event_table}.{qn('id')} = {alert_table}.{qn('event_id')}"
+    )
+
+    def related(model, column, fk):
+        table = qn(model._meta.db_table)
+        return (
+            f"(SELECT {table}.{qn(column)} FROM {table} "
+            f"WHERE {table}.{qn('id')} = (SELECT {event_table}.{qn(fk)} {of_event}))"
+        )
+
+    returning = [qn(c) for c in ALERT_COLUMNS]
+    returning += [f"(SELECT {event_table}.{qn(c)} {of_event})" for c in EVENT_COLUMNS]
+    returning += [
+        related(Source, "name", "source_id"),
+        related(EventDescription, "text", "description_ref_id"),
+    ]
+    sql = (
+        f"UPDATE {alert_table} SET {', '.join(sets)} WHERE {where} "
+        f"RETURNING {', '.join(returning)}"
+    )
+    with conn.cursor() as cursor:
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+    if row is None:
+        return None
+
+    split = len(ALERT_COLUMNS) + len(EVENT_COLUMNS)
+    alert = _from_row(conn, db, Alert, ALERT_COLUMNS, row[: len(ALERT_COLUMNS)])
+    event = _from_row(conn, db, Event, EVENT_COLUMNS, row[len(ALERT_COLUMNS) : split])
+    source_name, description = row[split:]
+    if event.source_id is not None:
+        event.source = Source(id=event.source_id, name=source_name)
+    if event.description_ref_id is not None:
+        event.description_ref = EventDescription(
+            id=event.description_ref_id, text=description
+        )
+    alert.event = event
+    alert.severity = event.severity
+    return alert
+
+
+def _compare_and_set_fallback(
+    db, alert_id, new_status, expected_status, version, actor, now
+):
+    # Backends without UPDATE ... RETURNING: same condition, then one SELECT
+    changes = {"status": new_status, "version": F("version") + 1, "updated_at": now}
+    if new_status == Alert.Status.ACKNOWLEDGED:
+        changes["acknowledged_by"] = Case(
+            When(acknowledged_at__isnull=True, then=Value(actor and actor.pk)),
+            default=F("acknowledged_by"),
+            output_field=IntegerField(),
+        )
+        changes["acknowledged_at"] = Coalesce("acknowledged_at", Value(now))
+    if new_status == Alert.Status.RESOLVED:
+        changes["resolved_by"] = Case(
+            When(resolved_at__isnull=True, then=Value(actor and actor.pk)),
+            default=F("resolved_by"),
+            output_field=IntegerField(),
+        )
+        changes["resolved_at"] = Coalesce("resolved_at", Value(now))
+    qs = Alert.objects.using(db).filter(pk=alert_id, status=expected_status)
+    if version is not None:
+        qs = qs.filter(version=version)
+    if not qs.update(**changes):
+        return None
+    alert = (
+        Alert.objects.using(db)
+        .select_related("event", "event__source", "event__description_ref")
+        .get(pk=alert_id)
+    )
+    alert.severity = alert.event.severity
+    return alert
+
+
+def transition_alert(
+    alert_id: int,
+    new_status: str,
+    user=None,
+    reason: str = "",
+    expected_status: str = None,
+    expected_version: int = None,
+) -> Alert:
+    """
+    Single entry point for user-driven status changes (dashboard + API).
+
+    Compare-and-set: the row changes only if it is still in
+    `expected_status` (and at `expected_version`, when given). Otherwise
+    AlertConflict (409) is raised and nothing is written. With
+    `expected_status` the state change is one UPDATE ... RETURNING and
+    there is no read first. Without it, the current status is read and
+    used as the expectation, so a concurrent change is still a 409 and is
+    never silently overwritten.
+
+    Stamps the first acknowledgement / resolution with time and actor,
+    writes the audit row, folds MTTA / MTTR into the daily rollups and
+    appends to the alert change feed, all in one transaction. The returned
+    alert has its event, source and description text loaded, so it can be
+    serialized without another query.
+    """
+    now = timezone.now()
+    actor = user if user is not None and user.is_authenticated else None
+    db = router.db_for_write(Alert)
+
+    with transaction.atomic(using=db):
+        if expected_status is None or expected_status == new_status:
+            current = (
+                Alert.objects.using(db)
+                .filter(pk=alert_id)
+                .values("status", "version")
+                .first()
+            )
+            if current is None:
+                raise NotFound("Alert not found")
+            if (expected_status or current["status"]) != current["status"] or (
+                expected_version is not None and expected_version != current["version"]
+            ):
+                raise AlertConflict(current)
+            if current["status"] == new_status:
+                return (
+                    Alert.objects.using(db)
+                    .select_related("event", "event__source", "event__description_ref")
+                    .get(pk=alert_id)
+                )
+            expected_status = current["status"]
+
+        cas = (
+            _compare_and_set
+            if _supports_update_returning(connections[db])
+            else _compare_and_set_fallback
+        )
+        alert = cas(
+            db, alert_id, new_status, expected_status, expected_version, actor, now
+        )
+        if alert is None:
+            current = (
+                Alert.objects.using(db)
+                .filter(pk=alert_id)
+                .values("status", "version")
+                .first()
+            )
+            if current is None:
+                raise NotFound("Alert not found")
+            raise AlertConflict(current)
+
+        AlertStatusChange.objects.using(db).create(
+            alert_id=alert.id,
+            from_status=expected_status,
+            to_status=new_status,
+            changed_by=actor,
+            reason=reason,
+        )
+        record_samples(
+            samples_for(
+                alert.created_at,
+                alert.severity,
+                acknowledged_at=now if alert.acknowledged_at == now else None,
+                resolved_at=now if alert.resolved_at == now else None,
+            )
+        )
+        log_alert_changes([alert], AlertChange.Kind.STATUS, using=db)
+
+    logger.info(
+        "Alert status updated",
+        extra={
+            "alert_id": alert.id,
+            "from": expected_status,
+            "to": new_status,
+            "by": actor.username if actor else None,
+        },
+    )
+    return alert
@@ -1,7 +1,17 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
-from .views import EventViewSet, AlertViewSet
+from .views import (
+    SourceViewSet,
+    EventViewSet,
+    AlertViewSet,
+    NotificationStatsView,
+    AdmissionStatsView,
+    TopSourcesView,
+    ResponseTimeStatsView,
+    ProfileListView,
+    ProfileDetailView,
+)
 from .dashboard_api import (
     CreateAnalystView,
     TestApiView,
@@ -10,12 +20,31 @@ from .dashboard_api import (
 )
 
 router = DefaultRouter()
+router.register(r"sources", SourceViewSet, basename="sources")
 router.register(r"events", EventViewSet, basename="events")
 router.register(r"alerts", AlertViewSet, basename="alerts")
 
 urlpatterns = [
-    # /api/events/  /api/alerts/
+    # /api/sources/  /api/events/  /api/alerts/
     path("", include(router.urls)),
+    path(
+        "notifications/stats/",
+        NotificationStatsView.as_view(),
+        name="notification-stats",
+    ),
+    path("stats/admission/", AdmissionStatsView.as_view(), name="stats-admission"),
+    path("stats/top-sources/", TopSourcesView.as_view(), name="stats-top-sources"),
+    path(
+        "stats/response-times/",
+        ResponseTimeStatsView.as_view(),
+        name="stats-response-times",
+    ),
+    path("profiles/", ProfileListView.as_view(), name="profiles"),
+    path(
+        "profiles/<str:profile_id>/",
+        ProfileDetailView.as_view(),
+        name="profile-detail",
+    ),
     # Dashboard helper APIs
     path(
         "dashboard/create-analyst/",
@@ -1,42 +1,365 @@
+from datetime import timedelta
+
+from django.conf import settings
 from django.shortcuts import render
+from django.utils import timezone
 
 # Create your views here.
-from rest_framework import viewsets
+from rest_framework import mixins, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.response import Response
+from rest_framework.throttling import AnonRateThrottle
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
 
-from .models import Event, Alert
+from .models import Source, SourceHeartbeat, Event, EventAggregate, Alert
+from .heartbeat import heartbeats
+from .aggregation import (
+    aggregated,
+    attach_samples,
+    event_aggregates,
+    merged_aggregates,
+)
+from .sources import registry
+from .top_talkers import top_talkers, DIMENSIONS, WINDOWS
+from .response_times import summarize as summarize_response_times
+from .conditional import alert_list_conditional
+from .notifications import notifier_stats
+from .profiling import list_profiles, load_profile
+from .admission import admission, queue_ms, PriorityUserRateThrottle
+from .dashboard_api import IsAdminRole
+from .db_routing import ReplicaReadMixin
+from .assignment import claim_alerts
+from .changes import changes_since, tombstones_dropped_below
 from .serializers import (
+    SourceSerializer,
+    SourceHealthSerializer,
     EventIngestSerializer,
     EventSerializer,
+    EventAggregateSerializer,
     AlertSerializer,
+    AlertChangeSerializer,
     AlertStatusUpdateSerializer,
 )
-from .permissions import EventPermissions, AlertPermissions
-from .filters import AlertFilter
+from .permissions import EventPermissions, AlertPermissions, SourcePermissions
+from .filters import AlertFilter, EventFilter, EventAggregateFilter
+
+
+class SourceViewSet(
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.UpdateModelMixin,
+    viewsets.GenericViewSet,
+):
+    # Sources are created on first sight at ingestion and referenced by
+    # events (PROTECT): no POST / DELETE here
+    queryset = Source.objects.all()
+    serializer_class = SourceSerializer
+    permission_classes = [SourcePermissions]
+    ordering_fields = ["name", "criticality", "created_at"]
+
+    @action(methods=["get"], detail=True, permission_classes=[EventPermissions])
+    def events(self, request, pk=None):
+        # Served by the (source, timestamp) index
+        source = self.get_object()
+        qs = (
+            Event.objects.select_related("created_by", "source", "description_ref")
+            .filter(source=source)
+            .order_by("-timestamp")
+        )
+        page = self.paginate_queryset(qs)
+        return self.get_paginated_response(EventSerializer(page, many=True).data)
+
+    @action(methods=["get"], detail=False)
+    def health(self, request):
+        """
+        Stale sources: /api/sources/health/?silence=600 (seconds).
+        Read from the heartbeat table via its last_seen index, never from Event.
+        """
+        try:
+            silence = int(
+                request.query_params.get("silence", settings.SOURCE_SILENCE_THRESHOLD)
+            )
+        except ValueError:
+            raise ValidationError({"silence": "Must be an integer (seconds)."})
+
+        heartbeats.flush()  # publish this worker's pending updates first
+        now = timezone.now()
+        qs = (
+            SourceHeartbeat.objects.select_related("source")
+            .filter(last_seen__lt=now - timedelta(seconds=silence))
+            .order_by("last_seen")
+        )
+        page = self.paginate_queryset(qs)
+        data = SourceHealthSerializer(page, many=True, context={"now": now}).data
+        return self.get_paginated_response(data)
 
 
 class EventViewSet(viewsets.ModelViewSet):
-    queryset = Event.objects.select_related("created_by").all()
+    queryset = Event.objects.select_related(
+        "created_by", "source", "description_ref"
+    ).all()
     permission_classes = [EventPermissions]
+    throttle_classes = [AnonRateThrottle, PriorityUserRateThrottle]
+    admission = admission
+    filterset_class = EventFilter
+    ordering_fields = ["timestamp"]
 
     def get_serializer_class(self):
         return EventIngestSerializer if self.action == "create" else EventSerializer
 
+    def create(self, request, *args, **kwargs):
+        # Under overload LOW/MEDIUM get 429 + Retry-After; alerting severities pass
+        data = request.data
+        severity = str(data.get("severity", "")) if hasattr(data, "get") else ""
+        with self.admission.ticket(severity, queued_ms=queue_ms(request.META)):
+            serializer = self.get_serializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            fields = serializer.validated_data
+            if aggregated(
+                fields["source_name"], fields["event_type"], fields["severity"]
+            ):
+                return Response(self.aggregate(fields), status=202)
+            self.perform_create(serializer)
+            headers = self.get_success_headers(serializer.data)
+            return Response(serializer.data, status=201, headers=headers)
+
+    def aggregate(self, fields) -> dict:
+        """
+        Count the event in its (source, event_type, severity) bucket instead
+        of storing it (EVENT_AGGREGATE_SEVERITIES / _SCOPE). Heartbeats and
+        top talkers still see it; its attributes are not kept.
+        """
+        source = registry.resolve(fields["source_name"])
+        now = timezone.now()
+        bucket = event_aggregates.record(
+            source.id,
+            fields["event_type"],
+            fields["severity"],
+            fields.get("description", ""),
+            seen_at=now,
+        )
+        heartbeats.record(source.id, fields["severity"], now)
+        top_talkers.record(source.name, fields["event_type"], now)
+        return {
+            "aggregated": True,
+            "source_name": source.name,
+            "event_type": fields["event_type"],
+            "severity": fields["severity"],
+            **bucket,
+        }
+
+    @action(
+        methods=["get"],
+        detail=False,
+        filterset_class=EventAggregateFilter,
+        ordering_fields=["bucket"],
+    )
+    def aggregates(self, request):
+        """
+        GET /api/events/aggregates/?severity=LOW&source=fw-*&bucket_after=...
+        Events stored in aggregated mode: per bucket the count, first / last
+        seen and up to EVENT_AGGREGATE_SAMPLES sample descriptions, summed
+        over all workers, newest bucket first. Other workers' counts lag by
+        up to EVENT_AGGREGATE_FLUSH_INTERVAL seconds (their background flush).
+        """
+        event_aggregates.flush()  # publish this worker's pending counts first
+        qs = merged_aggregates(self.filter_queryset(EventAggregate.objects.all()))
+        page = attach_samples(
+            self.paginate_queryset(qs), settings.EVENT_AGGREGATE_SAMPLES
+        )
+        return self.get_paginated_response(
+            EventAggregateSerializer(page, many=True).data
+        )
 
-class AlertViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Alert.objects.select_related("event").all()  # avoids N+1
+
+class AlertViewSet(ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = Alert.objects.select_related(
+        "event", "event__source", "event__description_ref"
+    ).all()  # avoids N+1
     serializer_class = AlertSerializer
     permission_classes = [AlertPermissions]
     filterset_class = AlertFilter
     ordering_fields = ["created_at", "status", "event__severity"]
+    # A replica applies commits in order, so it serves a consistent feed prefix
+    replica_actions = ("list", "retrieve", "changes")
+
+    @alert_list_conditional
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @action(methods=["get"], detail=False)
+    def changes(self, request):
+        """
+        GET /api/alerts/changes/?since=<seq>&limit=<n>
+        Alert changes after `since` (0 or absent: from the start), oldest
+        first, at most ALERT_CHANGES_MAX_PAGE per response. Clients keep
+        `last_seq` and pass it back as `since`; `more` means another page
+        is already waiting. A cursor older than the retained deletions
+        (ALERT_CHANGES_TOMBSTONE_HOURS) gets 410: reload the list and
+        restart from 0.
+        """
+        params = {}
+        for name, default in (
+            ("since", 0),
+            ("limit", settings.ALERT_CHANGES_MAX_PAGE),
+        ):
+            value = request.query_params.get(name, default)
+            try:
+                params[name] = int(value)
+            except (TypeError, ValueError):
+                raise ValidationError({name: "Must be an integer."})
+            if params[name] < 0:
+                raise ValidationError({name: "Must not be negative."})
+        limit = max(1, min(params["limit"], settings.ALERT_CHANGES_MAX_PAGE))
+        if params["since"] and params["since"] + 1 < tombstones_dropped_below():
+            return Response(
+                {"detail": "Cursor too old; deletions since it were compacted."},
+                status=410,
+            )
+
+        rows, more = changes_since(params["since"], limit)
+        return Response(
+            {
+                "changes": AlertChangeSerializer(rows, many=True).data,
+                "last_seq": rows[-1].seq if rows else params["since"],
+                "more": more,
+            }
+        )
 
     @action(
         methods=["patch"], detail=True, serializer_class=AlertStatusUpdateSerializer
     )
     def status(self, request, pk=None):
-        alert = self.get_object()
-        serializer = self.get_serializer(alert, data=request.data, partial=True)
+        """
+        PATCH /api/alerts/<id>/status/
+          body: {"status": "RESOLVED", "expected_status": "OPEN", "version": 3}
+        expected_status / version are optional; a mismatch is a 409.
+        """
+        serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
-        return Response(AlertSerializer(alert).data)
+        if not str(pk).isdigit():
+            raise NotFound("Alert not found")
+        # The RETURNING row carries the embedded event fields; no re-read
+        return Response(AlertSerializer(serializer.apply(int(pk))).data)
+
+    @action(methods=["post"], detail=False, permission_classes=[IsAuthenticated])
+    def claim(self, request):
+        """
+        POST /api/alerts/claim/  body: {"count": 5}
+        Assigns the next N OPEN alerts (most severe, then oldest) that are
+        unassigned or whose lease expired. Concurrent claimers never get
+        the same alert.
+        """
+        try:
+            count = int(request.data.get("count", 1))
+        except (TypeError, ValueError):
+            raise ValidationError({"count": "Must be an integer."})
+        if not 1 <= count <= settings.ALERT_CLAIM_MAX:
+            raise ValidationError(
+                {"count": f"Between 1 and {settings.ALERT_CLAIM_MAX}."}
+            )
+        alerts = claim_alerts(request.user, count)
+        return Response(AlertSerializer(alerts, many=True).data)
+
+
+class NotificationStatsView(ReplicaReadMixin, APIView):
+    """
+    Admin-only: outbox backlog and delivery latency
+      GET /api/notifications/stats/
+    """
+
+    permission_classes = [IsAdminRole]
+
+    def get(self, request):
+        return Response(notifier_stats())
+
+
+class AdmissionStatsView(APIView):
+    """
+    Admin-only: ingestion admission control for this worker process
+      GET /api/stats/admission/
+    In-flight ingest requests, write latency (EWMA) vs budget, admitted/shed
+    counts per severity.
+    """
+
+    permission_classes = [IsAdminRole]
+
+    def get(self, request):
+        return Response(admission.stats())
+
+
+class TopSourcesView(ReplicaReadMixin, APIView):
+    """
+    Authenticated users (Admin + Analyst):
+      GET /api/stats/top-sources/?window=15m&n=10&dimension=source|event_type
+    Answered from merged per-minute heavy-hitter sketches, not from Event.
+    Each count is an upper bound; `guaranteed` = count - error is a lower bound.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        window = request.query_params.get("window", "15m")
+        dimension = request.query_params.get("dimension", "source")
+        if window not in WINDOWS:
+            raise ValidationError({"window": f"One of {sorted(WINDOWS)}"})
+        if dimension not in DIMENSIONS:
+            raise ValidationError({"dimension": f"One of {list(DIMENSIONS)}"})
+        try:
+            n = min(max(int(request.query_params.get("n", 10)), 1), 100)
+        except ValueError:
+            raise ValidationError({"n": "Must be an integer."})
+
+        top_talkers.flush()
+        return Response(top_talkers.query(dimension, window, n))
+
+
+class ResponseTimeStatsView(ReplicaReadMixin, APIView):
+    """
+    Authenticated users (Admin + Analyst):
+      GET /api/stats/response-times/?days=7&severity=CRITICAL
+    MTTA / MTTR (mean + p50/p90/p99) from the daily rollups.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            days = min(max(int(request.query_params.get("days", 7)), 1), 90)
+        except ValueError:
+            raise ValidationError({"days": "Must be an integer."})
+        severity = (request.query_params.get("severity") or "").strip().upper()
+        if severity and severity not in Event.Severity.values:
+            raise ValidationError({"severity": f"One of {Event.Severity.values}"})
+
+        return Response(summarize_response_times(days, severity or None))
+
+
+class ProfileListView(APIView):
+    """
+    Admin-only: stored request profiles, newest first
+      GET /api/profiles/
+    Record one by sending `X-Profile: 1` (or `?profile=1`) on any request.
+    """
+
+    permission_classes = [IsAdminRole]
+
+    def get(self, request):
+        return Response(list_profiles())
+
+
+class ProfileDetailView(APIView):
+    """
+    Admin-only: one profile (SQL with timings, EXPLAIN plans, cProfile top functions)
+      GET /api/profiles/<id>/
+    """
+
+    permission_classes = [IsAdminRole]
+
+    def get(self, request, profile_id):
+        data = load_profile(profile_id)
+        if data is None:
+            raise NotFound("Profile not found.")
+        return Response(data)
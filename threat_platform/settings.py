@@ -17,6 +17,12 @@ ALLOWED_HOSTS = [
     if h.strip()
 ]
 
+# drf-spectacular (the schema generator) is loaded only where a schema is
+# generated: live in DEBUG, and by `manage.py build_schema` at deploy time,
+# which sets OPENAPI_SCHEMA_BUILD=1. Production workers serve the prebuilt
+# file and never import it.
+OPENAPI_SCHEMA_GENERATION = DEBUG or os.getenv("OPENAPI_SCHEMA_BUILD", "0") == "1"
+
 INSTALLED_APPS = [
     "django.contrib.admin",
     "django.contrib.auth",
@@ -28,7 +34,7 @@ INSTALLED_APPS = [
     "rest_framework",
     "rest_framework_simplejwt",
     "django_filters",
-    "drf_spectacular",
+    *(["drf_spectacular"] if OPENAPI_SCHEMA_GENERATION else []),
     # Local apps
     "accounts.apps.AccountsConfig",
     "monitoring.apps.MonitoringConfig",
@@ -41,8 +47,10 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "monitoring.db_routing.PrimaryPinMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "monitoring.profiling.ProfilingMiddleware",
 ]
 
 ROOT_URLCONF = "threat_platform.urls"
@@ -77,6 +85,37 @@ else:
         }
     }
 
+# ✅ Optional read replica. Alert lists/details, the dashboard list and stats
+# endpoints read from it; a client that just wrote is pinned to the primary
+# for REPLICA_PIN_SECONDS so it reads its own writes.
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL", "").strip()
+if DATABASE_REPLICA_URL:
+    DATABASES["replica"] = dj_database_url.parse(DATABASE_REPLICA_URL, conn_max_age=60)
+    DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+DATABASE_ROUTERS = ["monitoring.db_routing.ReplicaRouter"]
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", "5"))
+
+# ✅ Caches. "default" is per process. "shared" holds state every worker must
+# see (replica pins of cookie-less API clients): Redis when REDIS_URL is set
+# (needs `pip install redis`), otherwise a table in the primary database
+# created by `python manage.py createcachetable` (build.sh runs it).
+REDIS_URL = os.getenv("REDIS_URL", "").strip()
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "shared": (
+        {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+        if REDIS_URL
+        else {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": "monitoring_shared_cache",
+        }
+    ),
+}
+REPLICA_PIN_CACHE = "shared"
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"
@@ -93,6 +132,17 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
+# ✅ OpenAPI schema generated at deploy time (`manage.py build_schema`) and
+# served by whitenoise as a hashed, compressed static file.
+OPENAPI_SCHEMA_DIR = BASE_DIR / "openapi"
+OPENAPI_SCHEMA_FILE = OPENAPI_SCHEMA_DIR / "openapi.json"
+STATICFILES_DIRS = [d for d in [OPENAPI_SCHEMA_DIR] if d.exists()]
+
+# ✅ On-demand request profiles (admins send `X-Profile: 1` or `?profile=1`),
+# kept as JSON in a bounded local directory: GET /api/profiles/
+PROFILE_DIR = os.getenv("PROFILE_DIR", str(BASE_DIR / "profiles"))
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "50"))
+PROFILE_EXPLAIN_TOP = int(os.getenv("PROFILE_EXPLAIN_TOP", "5"))
 STORAGES = {
     "staticfiles": {
         "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage"
@@ -115,7 +165,6 @@ REST_FRAMEWORK = {
     ),
     "DEFAULT_PAGINATION_CLASS": "monitoring.pagination.StandardResultsSetPagination",
     "PAGE_SIZE": 20,
-    "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     # ⭐ BONUS: basic rate limiting
     "DEFAULT_THROTTLE_CLASSES": [
         "rest_framework.throttling.AnonRateThrottle",
@@ -127,6 +176,9 @@ REST_FRAMEWORK = {
     },
 }
 
+if OPENAPI_SCHEMA_GENERATION:
+    REST_FRAMEWORK["DEFAULT_SCHEMA_CLASS"] = "drf_spectacular.openapi.AutoSchema"
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=15),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
@@ -137,8 +189,145 @@ SPECTACULAR_SETTINGS = {
     "TITLE": "Threat Monitoring API",
     "DESCRIPTION": "Threat/Event ingestion + alert management (JWT + RBAC).",
     "VERSION": "1.0.0",
+    # Source.Criticality reuses the severity levels
+    "ENUM_NAME_OVERRIDES": {"SeverityEnum": "monitoring.models.Event.Severity"},
 }
 
+# ✅ Ingestion admission control (per worker process): above this many
+# in-flight POST /api/events/ or this latency (including time queued before a
+# worker, from X-Request-Start), events below ALERT_SEVERITIES get 429 +
+# Retry-After. Alerting events are always admitted. In-flight needs threaded
+# workers and must stay below gunicorn's --threads (8 in render.yaml).
+ADMISSION_MAX_IN_FLIGHT = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "6"))
+ADMISSION_LATENCY_BUDGET_MS = float(os.getenv("ADMISSION_LATENCY_BUDGET_MS", "250"))
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", "2"))
+
+# Severities that raise an alert (see monitoring/rules.py, `manage.py replay_events`)
+ALERT_SEVERITIES = [
+    s.strip().upper()
+    for s in os.getenv("ALERT_SEVERITIES", "HIGH,CRITICAL").split(",")
+    if s.strip()
+]
+
+# Analyst work queue: POST /api/alerts/claim/ holds alerts for this long
+ALERT_CLAIM_LEASE_SECONDS = int(os.getenv("ALERT_CLAIM_LEASE_SECONDS", "900"))
+ALERT_CLAIM_MAX = int(os.getenv("ALERT_CLAIM_MAX", "50"))
+
+# Alert change feed (GET /api/alerts/changes/?since=<seq>): entries per response,
+# and how long superseded entries are kept before `compact_alert_changes`
+ALERT_CHANGES_MAX_PAGE = int(os.getenv("ALERT_CHANGES_MAX_PAGE", "500"))
+ALERT_CHANGES_RETENTION_HOURS = int(os.getenv("ALERT_CHANGES_RETENTION_HOURS", "168"))
+# DELETED entries are dropped after this; older feed cursors get 410
+ALERT_CHANGES_TOMBSTONE_HOURS = int(os.getenv("ALERT_CHANGES_TOMBSTONE_HOURS", "720"))
+
+# Auto-transitions applied by `manage.py apply_alert_lifecycle` (e.g. from cron)
+ALERT_LIFECYCLE_POLICIES = [
+    {
+        "name": "stale-acknowledged",
+        "status": "ACKNOWLEDGED",
+        "to": "RESOLVED",
+        "older_than_hours": int(os.getenv("ALERT_AUTO_RESOLVE_ACK_HOURS", "168")),
+    },
+    {
+        "name": "low-origin",
+        "status": "OPEN",
+        "to": "RESOLVED",
+        "older_than_hours": int(os.getenv("ALERT_AUTO_RESOLVE_LOW_HOURS", "24")),
+        "severities": ["LOW"],
+    },
+]
+
+# Event.attributes keys copied into the indexed EventAttribute lookup table
+EVENT_INDEXED_ATTRIBUTES = [
+    k.strip()
+    for k in os.getenv(
+        "EVENT_INDEXED_ATTRIBUTES", "src_ip,dst_ip,host,user,file_hash"
+    ).split(",")
+    if k.strip()
+]
+
+# Aggregated storage: events at these severities (e.g. "LOW" or "LOW,MEDIUM")
+# whose "source_glob:event_type_glob" matches a scope entry are counted per
+# time bucket in EventAggregate instead of stored one row each. Off when empty.
+EVENT_AGGREGATE_SEVERITIES = [
+    s.strip().upper()
+    for s in os.getenv("EVENT_AGGREGATE_SEVERITIES", "").split(",")
+    if s.strip()
+]
+EVENT_AGGREGATE_SCOPE = [
+    s.strip() for s in os.getenv("EVENT_AGGREGATE_SCOPE", "*:*").split(",") if s.strip()
+]
+EVENT_AGGREGATE_BUCKET_SECONDS = int(os.getenv("EVENT_AGGREGATE_BUCKET_SECONDS", "300"))
+EVENT_AGGREGATE_SAMPLES = int(os.getenv("EVENT_AGGREGATE_SAMPLES", "3"))
+EVENT_AGGREGATE_FLUSH_INTERVAL = float(os.getenv("EVENT_AGGREGATE_FLUSH_INTERVAL", "5"))
+
+# Syslog listener (`manage.py run_syslog_listener`, RFC 5424 / 3164 over UDP + TCP)
+SYSLOG_HOST = os.getenv("SYSLOG_HOST", "0.0.0.0")
+SYSLOG_UDP_PORT = int(os.getenv("SYSLOG_UDP_PORT", "5514"))
+SYSLOG_TCP_PORT = int(os.getenv("SYSLOG_TCP_PORT", "5514"))
+SYSLOG_BATCH_SIZE = int(os.getenv("SYSLOG_BATCH_SIZE", "2000"))
+SYSLOG_FLUSH_INTERVAL = float(os.getenv("SYSLOG_FLUSH_INTERVAL", "0.5"))
+# Messages waiting for the DB; beyond this UDP is dropped (counted), TCP paused
+SYSLOG_QUEUE_SIZE = int(os.getenv("SYSLOG_QUEUE_SIZE", "100000"))
+# Parsed message -> Event fields; replace with your own callable(parsed, peer)
+SYSLOG_EVENT_MAPPER = os.getenv(
+    "SYSLOG_EVENT_MAPPER", "monitoring.syslog_ingest.map_event"
+)
+# Event severity for syslog severity 0 (emerg) .. 7 (debug)
+SYSLOG_SEVERITY_MAP = [
+    s.strip().upper()
+    for s in os.getenv(
+        "SYSLOG_SEVERITY_MAP", "CRITICAL,CRITICAL,CRITICAL,HIGH,MEDIUM,LOW,LOW,LOW"
+    ).split(",")
+]
+# TYPE=regex pairs, ";" separated, tried in order against the message text
+SYSLOG_EVENT_TYPES = dict(
+    pair.split("=", 1)
+    for pair in os.getenv(
+        "SYSLOG_EVENT_TYPES",
+        "MALWARE=malware|virus|trojan|ransom;INTRUSION=intrusion|exploit|brute.?force|denied",
+    ).split(";")
+    if "=" in pair
+)
+SYSLOG_DEFAULT_EVENT_TYPE = os.getenv("SYSLOG_DEFAULT_EVENT_TYPE", "ANOMALY")
+# Source name from the syslog "host" or "app" field, or the sender "peer" address
+SYSLOG_SOURCE_FIELD = os.getenv("SYSLOG_SOURCE_FIELD", "host")
+
+# Source registry + heartbeat tracking
+SOURCE_CACHE_SIZE = int(os.getenv("SOURCE_CACHE_SIZE", "1024"))
+# How often each process re-checks the source generation row (one PK query);
+# other workers pick up a source rename within this many seconds
+SOURCE_CACHE_SYNC_SECONDS = float(os.getenv("SOURCE_CACHE_SYNC_SECONDS", "2"))
+# Deduplicated event descriptions: hash -> id entries kept per process
+EVENT_DESCRIPTION_CACHE_SIZE = int(os.getenv("EVENT_DESCRIPTION_CACHE_SIZE", "4096"))
+HEARTBEAT_FLUSH_INTERVAL = float(os.getenv("HEARTBEAT_FLUSH_INTERVAL", "5"))
+# Sources silent for longer than this (seconds) are reported as stale
+SOURCE_SILENCE_THRESHOLD = int(os.getenv("SOURCE_SILENCE_THRESHOLD", "900"))
+
+# Top-N noisy sources / event types (Space-Saving sketches, k counters each)
+TOP_TALKERS_CAPACITY = int(os.getenv("TOP_TALKERS_CAPACITY", "100"))
+TOP_TALKERS_FLUSH_INTERVAL = float(os.getenv("TOP_TALKERS_FLUSH_INTERVAL", "5"))
+
+# Alert notifications (outbox drained by `manage.py run_notifier`)
+NOTIFY_WEBHOOK_URLS = [
+    u.strip() for u in os.getenv("NOTIFY_WEBHOOK_URLS", "").split(",") if u.strip()
+]
+NOTIFY_EMAILS = [
+    e.strip() for e in os.getenv("NOTIFY_EMAILS", "").split(",") if e.strip()
+]
+NOTIFIER_WORKERS = int(os.getenv("NOTIFIER_WORKERS", "4"))
+NOTIFIER_BATCH_SIZE = int(os.getenv("NOTIFIER_BATCH_SIZE", "500"))
+NOTIFIER_DIGEST_SIZE = int(os.getenv("NOTIFIER_DIGEST_SIZE", "50"))
+NOTIFIER_MAX_ATTEMPTS = int(os.getenv("NOTIFIER_MAX_ATTEMPTS", "8"))
+NOTIFIER_BACKOFF_BASE = float(os.getenv("NOTIFIER_BACKOFF_BASE", "5"))
+NOTIFIER_RATE_PER_MINUTE = float(os.getenv("NOTIFIER_RATE_PER_MINUTE", "30"))
+NOTIFIER_POLL_INTERVAL = float(os.getenv("NOTIFIER_POLL_INTERVAL", "2"))
+
+# Admin changelists: exact COUNT(*) only below this many (estimated) rows;
+# non-Postgres backends cache the count instead.
+ADMIN_EXACT_COUNT_THRESHOLD = int(os.getenv("ADMIN_EXACT_COUNT_THRESHOLD", "10000"))
+ADMIN_COUNT_CACHE_SECONDS = int(os.getenv("ADMIN_COUNT_CACHE_SECONDS", "60"))
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
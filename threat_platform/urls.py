@@ -1,13 +1,18 @@
+from functools import lru_cache
+from importlib import import_module
+
+from django.conf import settings
 from django.contrib import admin
-from django.urls import path, include
-from django.shortcuts import render
+from django.http import HttpResponse
+from django.urls import path, include, reverse
+from django.shortcuts import redirect, render
+from django.templatetags.static import static
 
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
     TokenVerifyView,
 )
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 
 
 def home(request):
@@ -15,6 +20,43 @@ def home(request):
     return render(request, "monitoring/dashboard.html")
 
 
+@lru_cache(maxsize=None)
+def _spectacular_view(name, **initkwargs):
+    # drf_spectacular.views pulls in the whole schema generator; import it on
+    # first use, and only in DEBUG (the app is not installed otherwise).
+    view_class = getattr(import_module("drf_spectacular.views"), name)
+    return view_class.as_view(**initkwargs)
+
+
+def _prebuilt_schema_url():
+    """Hashed whitenoise URL of the schema written by `manage.py build_schema`."""
+    try:
+        return static(settings.OPENAPI_SCHEMA_FILE.name)
+    except ValueError:  # not in the staticfiles manifest -> not built
+        return None
+
+
+def schema(request):
+    if settings.DEBUG:
+        return _spectacular_view("SpectacularAPIView")(request)
+    url = _prebuilt_schema_url()
+    if url is None:
+        return HttpResponse(
+            "OpenAPI schema not built; run `python manage.py build_schema`.",
+            status=503,
+            content_type="text/plain",
+        )
+    return redirect(url)
+
+
+def swagger_ui(request):
+    if settings.DEBUG:
+        return _spectacular_view("SpectacularSwaggerView", url_name="schema")(request)
+    # Static page around the prebuilt file (or the 503 from `schema`)
+    url = _prebuilt_schema_url() or reverse("schema")
+    return render(request, "monitoring/swagger_ui.html", {"schema_url": url})
+
+
 urlpatterns = [
     # ✅ Home dashboard
     path("", home, name="home"),
@@ -25,11 +67,7 @@ urlpatterns = [
     path("api/auth/token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("api/auth/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path("api/auth/token/verify/", TokenVerifyView.as_view(), name="token_verify"),
-    # Swagger/OpenAPI
-    path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
-    path(
-        "api/docs/",
-        SpectacularSwaggerView.as_view(url_name="schema"),
-        name="swagger-ui",
-    ),
+    # Swagger/OpenAPI: prebuilt static file in production, live in DEBUG
+    path("api/schema/", schema, name="schema"),
+    path("api/docs/", swagger_ui, name="swagger-ui"),
 ]